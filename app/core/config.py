@@ -30,6 +30,17 @@ class Settings(BaseSettings):
     azure_openai_deployment: Optional[str] = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME") or os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
     azure_openai_api_version: Optional[str] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
     
+    # Azure OpenAI Quota Scheduling (0 disables the scheduler)
+    azure_openai_tpm_limit: int = int(os.getenv("AZURE_OPENAI_TPM_LIMIT", "120000"))
+    azure_openai_rpm_limit: int = int(os.getenv("AZURE_OPENAI_RPM_LIMIT", "720"))
+    azure_openai_rate_limits: str = os.getenv("AZURE_OPENAI_RATE_LIMITS", "{}")  # JSON: {"deployment": {"tpm": N, "rpm": N}}
+    
+    # LLM Response Cache Configuration
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    llm_cache_max_bytes: int = int(os.getenv("LLM_CACHE_MAX_BYTES", "67108864"))  # 64MB
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite3")
+    llm_cache_ttl_seconds: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))  # Only for temperature > 0
+    
     # Google Search API Configuration
     google_search_api_key: Optional[str] = os.getenv("GOOGLE_API_KEY") or os.getenv("GOOGLE_SEARCH_API_KEY")
     google_search_engine_id: Optional[str] = os.getenv("GOOGLE_CSE_ID") or os.getenv("GOOGLE_SEARCH_ENGINE_ID")
@@ -80,6 +91,55 @@ class Settings(BaseSettings):
     
     # PatentsView API Configuration (optional)
     patentsview_api_key: Optional[str] = os.getenv("PATENTSVIEW_API_KEY")
+    patentsview_http2: bool = os.getenv("PATENTSVIEW_HTTP2", "true").lower() == "true"
+    patentsview_max_connections: int = int(os.getenv("PATENTSVIEW_MAX_CONNECTIONS", "20"))
+    patentsview_max_keepalive_connections: int = int(os.getenv("PATENTSVIEW_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    patentsview_keepalive_expiry: float = float(os.getenv("PATENTSVIEW_KEEPALIVE_EXPIRY", "60"))
+    patentsview_max_concurrency: int = int(os.getenv("PATENTSVIEW_MAX_CONCURRENCY", "5"))
+    patentsview_requests_per_minute: int = int(os.getenv("PATENTSVIEW_REQUESTS_PER_MINUTE", "45"))
+    patentsview_page_size: int = int(os.getenv("PATENTSVIEW_PAGE_SIZE", "25"))
+    query_plan_cache_ttl_seconds: int = int(os.getenv("QUERY_PLAN_CACHE_TTL_SECONDS", "86400"))  # Generated query sets per normalized query
+    query_plan_cache_max_entries: int = int(os.getenv("QUERY_PLAN_CACHE_MAX_ENTRIES", "1024"))  # 0 disables
+    patentsview_fused_queries: bool = os.getenv("PATENTSVIEW_FUSED_QUERIES", "true").lower() == "true"  # One _or request for all generated queries
+    patentsview_refine_queries: bool = os.getenv("PATENTSVIEW_REFINE_QUERIES", "true").lower() == "true"  # Count-probe refinement before fetching
+    patentsview_target_hits_min: int = int(os.getenv("PATENTSVIEW_TARGET_HITS_MIN", "50"))
+    patentsview_target_hits_max: int = int(os.getenv("PATENTSVIEW_TARGET_HITS_MAX", "200"))
+    patentsview_refine_max_probes: int = int(os.getenv("PATENTSVIEW_REFINE_MAX_PROBES", "4"))  # Count probes per query
+    patentsview_max_pages_per_query: int = int(os.getenv("PATENTSVIEW_MAX_PAGES_PER_QUERY", "4"))
+    patentsview_rank_candidates: int = int(os.getenv("PATENTSVIEW_RANK_CANDIDATES", "100"))  # Unique patents ranked locally before truncation to max_results
+    patentsview_early_admit_score: float = float(os.getenv("PATENTSVIEW_EARLY_ADMIT_SCORE", "0.6"))  # Query coverage that sends a top candidate on before the search ends (0 disables)
+    patentsview_collapse_families: bool = os.getenv("PATENTSVIEW_COLLAPSE_FAMILIES", "true").lower() == "true"  # Fold near-duplicate patents
+    patentsview_family_similarity: float = float(os.getenv("PATENTSVIEW_FAMILY_SIMILARITY", "0.8"))  # Estimated Jaccard of abstract + first claim shingles
+    patentsview_relevance_gate: bool = os.getenv("PATENTSVIEW_RELEVANCE_GATE", "true").lower() == "true"  # Prune off-topic candidates before claims
+    patentsview_gate_drop_score: float = float(os.getenv("PATENTSVIEW_GATE_DROP_SCORE", "0.15"))  # Query coverage of title/abstract (0-1)
+    patentsview_gate_defer_score: float = float(os.getenv("PATENTSVIEW_GATE_DEFER_SCORE", "0.3"))  # Kept, but claims only from the local store
+    patentsview_gate_min_results: int = int(os.getenv("PATENTSVIEW_GATE_MIN_RESULTS", "5"))  # Top-ranked patents never dropped
+    patentsview_claims_batch_size: int = int(os.getenv("PATENTSVIEW_CLAIMS_BATCH_SIZE", "25"))  # Patent IDs per g_claim query
+    patentsview_claims_page_size: int = int(os.getenv("PATENTSVIEW_CLAIMS_PAGE_SIZE", "1000"))
+    patentsview_search_cache_ttl_seconds: int = int(os.getenv("PATENTSVIEW_SEARCH_CACHE_TTL_SECONDS", "604800"))  # 1 week
+    patentsview_search_cache_max_entries: int = int(os.getenv("PATENTSVIEW_SEARCH_CACHE_MAX_ENTRIES", "2048"))  # 0 disables
+    claim_summary_token_budget: int = int(os.getenv("CLAIM_SUMMARY_TOKEN_BUDGET", "400"))  # Query-relevant claims sent per patent summary
+    report_prompt_token_budget: int = int(os.getenv("REPORT_PROMPT_TOKEN_BUDGET", "12000"))  # Input tokens of the prior art report prompt
+    claims_store_path: str = os.getenv("CLAIMS_STORE_PATH", "cache/patent_claims.sqlite3")  # Empty disables the store
+    
+    # Circuit Breakers (per backend: Azure OpenAI, PatentsView, Google CSE)
+    circuit_breaker_failure_rate: float = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))  # Failed or slow share that opens the circuit
+    circuit_breaker_window_size: int = int(os.getenv("CIRCUIT_BREAKER_WINDOW_SIZE", "20"))  # Recent calls considered
+    circuit_breaker_min_calls: int = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+    circuit_breaker_open_seconds: float = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))  # Cool-down before probing
+    circuit_breaker_half_open_probes: int = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_PROBES", "2"))
+    azure_openai_slow_call_seconds: float = float(os.getenv("AZURE_OPENAI_SLOW_CALL_SECONDS", "120"))
+    patentsview_slow_call_seconds: float = float(os.getenv("PATENTSVIEW_SLOW_CALL_SECONDS", "20"))
+    google_search_slow_call_seconds: float = float(os.getenv("GOOGLE_SEARCH_SLOW_CALL_SECONDS", "10"))
+    
+    # Retries (Azure OpenAI and PatentsView; only 408/429/5xx, timeouts and connection errors)
+    retry_max_attempts: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))  # Including the first attempt
+    retry_base_delay: float = float(os.getenv("RETRY_BASE_DELAY", "1.0"))  # Backoff cap of the first retry, doubled per attempt
+    retry_max_delay: float = float(os.getenv("RETRY_MAX_DELAY", "20"))
+    retry_max_retry_after: float = float(os.getenv("RETRY_MAX_RETRY_AFTER", "60"))  # Longer Retry-After values are not waited for
+    retry_budget_ratio: float = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))  # Process-wide retries per request
+    retry_budget_min_per_second: float = float(os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "0.5"))
+    retry_budget_window_seconds: float = float(os.getenv("RETRY_BUDGET_WINDOW_SECONDS", "10"))
     
     # FastAPI Configuration
     enable_swagger: bool = os.getenv("ENABLE_SWAGGER", "true").lower() == "true"
@@ -149,3 +209,25 @@ def get_azure_openai_config() -> dict:
 
 
 
+
+
+def get_circuit_breaker_config(slow_call_seconds: float) -> dict:
+    """Get circuit breaker thresholds for a backend with the given slow-call threshold."""
+    return {
+        'failure_rate_threshold': settings.circuit_breaker_failure_rate,
+        'slow_call_seconds': slow_call_seconds,
+        'window_size': settings.circuit_breaker_window_size,
+        'min_calls': settings.circuit_breaker_min_calls,
+        'open_seconds': settings.circuit_breaker_open_seconds,
+        'half_open_probes': settings.circuit_breaker_half_open_probes
+    }
+
+
+def get_retry_policy_config() -> dict:
+    """Get retry policy settings (attempts and backoff) shared by every backend."""
+    return {
+        'max_attempts': settings.retry_max_attempts,
+        'base_delay': settings.retry_base_delay,
+        'max_delay': settings.retry_max_delay,
+        'max_retry_after': settings.retry_max_retry_after
+    }
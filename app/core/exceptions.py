@@ -43,5 +43,15 @@ class ConfigurationError(MCPError):
     pass
 
 
+class DeadlineExceededError(MCPError):
+    """Raised when a request's latency budget runs out."""
+    pass
+
+
+class CircuitOpenError(MCPError):
+    """Raised when a backend's circuit breaker is open and calls fail fast."""
+    pass
+
+
 
 
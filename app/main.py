@@ -19,6 +19,10 @@ from app.mcp_tools.web_search import WebSearchTool
 from app.mcp_tools.prior_art_search import PriorArtSearchTool
 from app.mcp_tools.claim_drafting import ClaimDraftingTool
 from app.mcp_tools.claim_analysis import ClaimAnalysisTool
+from app.services.llm_client import close_llm_clients
+from app.services.claims_store import get_claims_store
+from app.utils.circuit_breaker import get_circuit_breaker_stats
+from app.utils.retry import get_retry_stats
 
 logger = structlog.get_logger()
 
@@ -351,11 +355,19 @@ async def mcp_endpoint(request: Request):
 @app.get("/health")
 async def health_check():
     """Health check for MCP server."""
+    claims_store = get_claims_store()
     return {
         "status": "healthy",
         "server": "Novitai Patent MCP Server",
         "tools_count": len(tools),
-        "tools": list(tools.keys())
+        "tools": list(tools.keys()),
+        "patentsview_pool": tools["prior_art_search_tool"].patent_service.get_pool_stats(),
+        "patentsview_search_cache": tools["prior_art_search_tool"].patent_service.get_search_cache_stats(),
+        "query_plan_cache": tools["prior_art_search_tool"].patent_service.get_query_plan_cache_stats(),
+        "patentsview_query_compiler": tools["prior_art_search_tool"].patent_service.get_query_compiler_stats(),
+        "claims_store": claims_store.get_stats() if claims_store else None,
+        "circuit_breakers": get_circuit_breaker_stats(),
+        "retries": get_retry_stats()
     }
 
 # Startup event
@@ -370,6 +382,8 @@ async def startup_event():
 async def shutdown_event():
     """Shutdown event for MCP server."""
     logger.info("Novitai Patent MCP Server shutting down...")
+    await tools["prior_art_search_tool"].patent_service.aclose()
+    await close_llm_clients()
 
 if __name__ == "__main__":
     import uvicorn
@@ -55,6 +55,11 @@ class ClaimAnalysisTool(BaseMCPTool):
                     "description": "Specific areas to focus analysis on",
                     "items": {"type": "string"},
                     "maxItems": 10
+                },
+                "budget_seconds": {
+                    "type": "number",
+                    "description": "Optional latency budget in seconds; slower stages degrade to fit it",
+                    "minimum": 1
                 }
             },
             "required": ["claims"]
@@ -120,6 +125,7 @@ class ClaimAnalysisTool(BaseMCPTool):
             claims = parameters.get("claims", [])
             analysis_type = parameters.get("analysis_type", "comprehensive")
             focus_areas = parameters.get("focus_areas", [])
+            budget_seconds = parameters.get("budget_seconds")
             
             logger.info(f"Executing claim analysis tool for {len(claims)} claims")
             
@@ -136,7 +142,8 @@ class ClaimAnalysisTool(BaseMCPTool):
                     analysis_result, generated_criteria = await analysis_service.analyze_claims(
                         claims=claims,
                         analysis_type=analysis_type,
-                        focus_areas=focus_areas
+                        focus_areas=focus_areas,
+                        budget_seconds=budget_seconds
                     )
                     
                     logger.info(f"Received {len(generated_criteria)} generated criteria from analysis service")
@@ -42,6 +42,11 @@ class ClaimDraftingTool(BaseMCPTool):
                     "type": "string",
                     "description": "Reference to existing document content",
                     "maxLength": 10000
+                },
+                "budget_seconds": {
+                    "type": "number",
+                    "description": "Optional latency budget in seconds; slower stages degrade to fit it",
+                    "minimum": 1
                 }
             },
             "required": ["user_query"]
@@ -110,6 +115,7 @@ class ClaimDraftingTool(BaseMCPTool):
             user_query = parameters.get("user_query", "")
             conversation_context = parameters.get("conversation_context")
             document_reference = parameters.get("document_reference")
+            budget_seconds = parameters.get("budget_seconds")
             
             logger.info(f"Executing claim drafting tool for query: {user_query[:100]}...")
             
@@ -126,7 +132,8 @@ class ClaimDraftingTool(BaseMCPTool):
                     drafting_result, generated_criteria = await drafting_service.draft_claims(
                         user_query=user_query,
                         conversation_context=conversation_context,
-                        document_reference=document_reference
+                        document_reference=document_reference,
+                        budget_seconds=budget_seconds
                     )
                     
                     logger.info(f"Received {len(generated_criteria)} generated criteria from drafting service")
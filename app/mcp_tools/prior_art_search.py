@@ -51,6 +51,22 @@ class PriorArtSearchTool(BaseMCPTool):
                     "default": 20,
                     "minimum": 1,
                     "maximum": 100
+                },
+                "mode": {
+                    "type": "string",
+                    "description": "fast: keyword queries, stored claims only and a templated report - no LLM calls or claims fetch, so latency is that of the PatentsView searches (seconds when cached); deep: full AI analysis",
+                    "enum": ["fast", "deep"],
+                    "default": "deep"
+                },
+                "budget_seconds": {
+                    "type": "number",
+                    "description": "Optional latency budget in seconds; slower stages degrade to fit it",
+                    "minimum": 1
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Regenerate the search queries instead of reusing a cached plan",
+                    "default": False
                 }
             },
             "required": ["query"]
@@ -91,6 +107,14 @@ class PriorArtSearchTool(BaseMCPTool):
                     "max_results": 10
                 }
             },
+            {
+                "name": "Fast Keyword Search",
+                "description": "Quick keyword search without AI analysis",
+                "input": {
+                    "query": "5G handover",
+                    "mode": "fast"
+                }
+            },
             {
                 "name": "Blockchain Smart Contracts",
                 "description": "Search for blockchain and smart contract patents",
@@ -113,6 +137,9 @@ class PriorArtSearchTool(BaseMCPTool):
         context = parameters.get("context")
         conversation_history = parameters.get("conversation_history")
         max_results = parameters.get("max_results", 20)
+        refresh = parameters.get("refresh", False)
+        mode = parameters.get("mode", "deep")
+        budget_seconds = parameters.get("budget_seconds")
         
         logger.info(f"Executing prior art search for query: {query}")
         
@@ -122,7 +149,10 @@ class PriorArtSearchTool(BaseMCPTool):
                 query=query,
                 context=context,
                 conversation_history=conversation_history,
-                max_results=max_results
+                max_results=max_results,
+                refresh_plan=refresh,
+                mode=mode,
+                budget_seconds=budget_seconds
             )
             
             logger.info(f"Prior art search completed for '{query}' - {search_result['results_found']} results")
@@ -8,14 +8,18 @@ import asyncio
 import json
 import time
 import logging
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Callable, Awaitable
 from datetime import datetime
 import re
 
 from app.services.llm_client import LLMClient
+from app.utils.deadline import deadline_scope, has_time
 
 logger = logging.getLogger(__name__)
 
+# Minimum seconds left in a latency budget to spend an LLM call on analysis criteria
+MIN_SECONDS_FOR_CRITERIA = 20.0
+
 
 class ClaimAnalysisService:
     """Service for analyzing patent claims using LLM."""
@@ -41,48 +45,68 @@ class ClaimAnalysisService:
         pass
     
     async def analyze_claims(self, claims: List[Dict[str, Any]], analysis_type: str = "comprehensive",
-                           focus_areas: Optional[List[str]] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-        """Analyze patent claims for validity, quality, and improvement opportunities."""
-        try:
-            logger.info(f"Starting claim analysis for {len(claims)} claims")
-            
-            # Generate LLM analysis criteria
-            llm_criteria = await self._generate_llm_analysis_criteria(claims, analysis_type, focus_areas)
-            
-            # Perform comprehensive claim analysis
-            analysis_result = await self._analyze_claims_with_llm(claims, analysis_type, focus_areas)
-            
-            # Generate analysis report
-            analysis_report = await self._generate_analysis_report(analysis_result, claims)
-            
-            # Create result
-            result = {
-                "claims_analyzed": len(claims),
-                "analysis_type": analysis_type,
-                "analysis": analysis_result,
-                "quality_assessment": analysis_result.get("quality_assessment", {}),
-                "recommendations": analysis_result.get("recommendations", {}),
-                "risk_assessment": analysis_result.get("risk_assessment", {}),
-                "analysis_report": analysis_report,
-                "analysis_metadata": {
-                    "timestamp": datetime.now().isoformat(),
+                           focus_areas: Optional[List[str]] = None,
+                           on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+                           budget_seconds: Optional[float] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Analyze patent claims for validity, quality, and improvement opportunities.
+        
+        on_token optionally receives the main analysis text as it is generated.
+        budget_seconds optionally bounds every LLM call; when it runs low the
+        criteria call is skipped and a failed analysis falls back to defaults.
+        """
+        with deadline_scope(budget_seconds):
+            try:
+                logger.info(f"Starting claim analysis for {len(claims)} claims")
+                
+                # Generate LLM analysis criteria and perform comprehensive claim analysis
+                # concurrently - the two LLM calls are independent of each other.
+                # Under a tight budget the criteria call is skipped so the analysis gets the quota.
+                degraded = []
+                if has_time(MIN_SECONDS_FOR_CRITERIA):
+                    llm_criteria, analysis_result = await asyncio.gather(
+                        self._generate_llm_analysis_criteria(claims, analysis_type, focus_areas),
+                        self._analyze_claims_with_llm(claims, analysis_type, focus_areas, on_token)
+                    )
+                else:
+                    degraded.append("analysis_criteria")
+                    llm_criteria = self._fallback_analysis_criteria(claims, analysis_type)
+                    analysis_result = await self._analyze_claims_with_llm(claims, analysis_type, focus_areas, on_token)
+                if analysis_result.get("fallback"):
+                    degraded.append("llm_analysis")
+                
+                # Generate analysis report
+                analysis_report = await self._generate_analysis_report(analysis_result, claims)
+                
+                # Create result
+                result = {
+                    "claims_analyzed": len(claims),
                     "analysis_type": analysis_type,
-                    "focus_areas": focus_areas or [],
-                    "execution_time": time.time()
+                    "analysis": analysis_result,
+                    "quality_assessment": analysis_result.get("quality_assessment", {}),
+                    "recommendations": analysis_result.get("recommendations", {}),
+                    "risk_assessment": analysis_result.get("risk_assessment", {}),
+                    "analysis_report": analysis_report,
+                    "analysis_metadata": {
+                        "timestamp": datetime.now().isoformat(),
+                        "analysis_type": analysis_type,
+                        "focus_areas": focus_areas or [],
+                        "execution_time": time.time(),
+                        "budget_seconds": budget_seconds,
+                        "degraded": degraded
+                    }
                 }
-            }
-            
-            logger.info(f"Claim analysis completed: {len(claims)} claims analyzed")
-            
-            # Prepare LLM criteria for return
-            generated_criteria = [llm_criteria]
-            logger.info(f"Returning analysis result with {len(generated_criteria)} generated criteria")
-            
-            return result, generated_criteria
-            
-        except Exception as e:
-            logger.error(f"Claim analysis failed for {len(claims)} claims: {str(e)}")
-            raise
+                
+                logger.info(f"Claim analysis completed: {len(claims)} claims analyzed")
+                
+                # Prepare LLM criteria for return
+                generated_criteria = [llm_criteria]
+                logger.info(f"Returning analysis result with {len(generated_criteria)} generated criteria")
+                
+                return result, generated_criteria
+                
+            except Exception as e:
+                logger.error(f"Claim analysis failed for {len(claims)} claims: {str(e)}")
+                raise
     
     async def _generate_llm_analysis_criteria(self, claims: List[Dict[str, Any]], analysis_type: str,
                                             focus_areas: Optional[List[str]]) -> Dict[str, Any]:
@@ -128,7 +152,7 @@ Return a JSON response with these fields:
 Focus on creating a comprehensive analysis framework for patent claim evaluation.
 """
             
-            response_data = self.llm_client.generate_text(
+            response_data = await self.llm_client.generate_text(
                 prompt=prompt,
                 max_tokens=800,
                 temperature=0.3
@@ -170,7 +194,8 @@ Focus on creating a comprehensive analysis framework for patent claim evaluation
         }
     
     async def _analyze_claims_with_llm(self, claims: List[Dict[str, Any]], analysis_type: str,
-                                     focus_areas: Optional[List[str]]) -> Dict[str, Any]:
+                                     focus_areas: Optional[List[str]],
+                                     on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict[str, Any]:
         """Analyze claims using LLM integration."""
         try:
             # Load prompts
@@ -178,13 +203,18 @@ Focus on creating a comprehensive analysis framework for patent claim evaluation
             user_prompt = self._load_user_prompt(claims, analysis_type, focus_areas)
             
             # Call LLM for analysis
-            response_data = self.llm_client.generate_text(
+            response_data = await self.llm_client.generate_text(
                 prompt=user_prompt,
                 system_message=system_prompt,
                 max_tokens=4000,
-                temperature=0.3
+                temperature=0.3,
+                on_token=on_token
             )
             
+            if not response_data.get("success"):
+                logger.warning(f"LLM claim analysis unavailable: {response_data.get('error')}")
+                return self._create_fallback_analysis(claims, analysis_type)
+            
             # Parse response
             response_text = response_data.get("text", "")
             
@@ -300,7 +330,8 @@ Focus on creating a comprehensive analysis framework for patent claim evaluation
             "quality_assessment": self._create_default_quality_assessment(claims),
             "recommendations": self._create_default_recommendations(claims),
             "risk_assessment": self._create_default_risk_assessment(claims),
-            "analysis_notes": "Fallback analysis generated due to LLM processing issues"
+            "analysis_notes": "Fallback analysis generated due to LLM processing issues",
+            "fallback": True
         }
     
     def _load_system_prompt(self) -> str:
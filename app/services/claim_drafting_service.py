@@ -8,14 +8,20 @@ import asyncio
 import json
 import time
 import logging
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Callable, Awaitable
 from datetime import datetime
 import os
 
 from app.services.llm_client import LLMClient
+from app.utils.deadline import deadline_scope, remaining_time
 
 logger = logging.getLogger(__name__)
 
+# Completion size of a full draft, and the throughput used to shrink it under a tight budget
+DRAFT_MAX_TOKENS = 4000
+MIN_DRAFT_TOKENS = 500
+ESTIMATED_TOKENS_PER_SECOND = 40
+
 
 class ClaimDraftingService:
     """Service for drafting patent claims using LLM."""
@@ -42,36 +48,52 @@ class ClaimDraftingService:
         pass
     
     async def draft_claims(self, user_query: str, conversation_context: Optional[str] = None, 
-                          document_reference: Optional[str] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-        """Draft patent claims based on user query."""
-        try:
-            logger.info(f"Starting claim drafting for query: {user_query[:100]}...")
-            
-            # Draft claims using LLM - return simple markdown
-            claims_markdown = await self._draft_claims_with_llm_simple(
-                user_query, conversation_context, document_reference
-            )
-            
-            # Create simple result
-            result = {
-                "user_query": user_query,
-                "drafting_report": claims_markdown,
-                "drafting_metadata": {
-                    "timestamp": datetime.now().isoformat()
+                          document_reference: Optional[str] = None,
+                          on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+                          budget_seconds: Optional[float] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Draft patent claims based on user query, optionally streaming the markdown via on_token.
+        
+        budget_seconds optionally bounds the LLM call; a tight budget shortens the draft.
+        """
+        with deadline_scope(budget_seconds):
+            try:
+                logger.info(f"Starting claim drafting for query: {user_query[:100]}...")
+                
+                # Shrink the completion so it can finish within the budget
+                max_tokens = DRAFT_MAX_TOKENS
+                remaining = remaining_time()
+                if remaining is not None:
+                    max_tokens = max(MIN_DRAFT_TOKENS, min(DRAFT_MAX_TOKENS, int(remaining * ESTIMATED_TOKENS_PER_SECOND)))
+                
+                # Draft claims using LLM - return simple markdown
+                claims_markdown = await self._draft_claims_with_llm_simple(
+                    user_query, conversation_context, document_reference, on_token, max_tokens
+                )
+                
+                # Create simple result
+                result = {
+                    "user_query": user_query,
+                    "drafting_report": claims_markdown,
+                    "drafting_metadata": {
+                        "timestamp": datetime.now().isoformat(),
+                        "budget_seconds": budget_seconds,
+                        "degraded": ["shortened_draft"] if max_tokens < DRAFT_MAX_TOKENS else []
+                    }
                 }
-            }
-            
-            logger.info(f"Claim drafting completed: markdown report generated")
-            
-            # Return empty criteria list
-            return result, []
-            
-        except Exception as e:
-            logger.error(f"Claim drafting failed for query '{user_query[:50]}': {str(e)}")
-            raise
+                
+                logger.info(f"Claim drafting completed: markdown report generated")
+                
+                # Return empty criteria list
+                return result, []
+                
+            except Exception as e:
+                logger.error(f"Claim drafting failed for query '{user_query[:50]}': {str(e)}")
+                raise
     
     async def _draft_claims_with_llm_simple(self, user_query: str, conversation_context: Optional[str], 
-                                          document_reference: Optional[str]) -> str:
+                                          document_reference: Optional[str],
+                                          on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+                                          max_tokens: int = DRAFT_MAX_TOKENS) -> str:
         """Draft claims using LLM and return simple markdown string."""
         try:
             # Load prompts
@@ -86,11 +108,12 @@ class ClaimDraftingService:
             )
             
             # Call LLM
-            response_data = self.llm_client.generate_text(
+            response_data = await self.llm_client.generate_text(
                 prompt=formatted_user_prompt,
                 system_message=system_prompt,
-                max_tokens=4000,
-                temperature=0.3
+                max_tokens=max_tokens,
+                temperature=0.3,
+                on_token=on_token
             )
             
             # Return raw response as markdown
@@ -0,0 +1,165 @@
+"""
+Claim Selection
+
+Picks the claims of a patent that matter for a user's query and packs them
+into a fixed token budget for LLM prompts. Claims are scored locally by how
+much of the query they cover, and dependent claims are only sent together
+with the independent claim they build on.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from app.utils.text import content_terms, extract_key_phrases, stem, stem_tokens
+from app.utils.tokens import count_tokens, truncate_to_tokens
+
+# "The method of claim 1", "as claimed in claims 3", "according to claim 12"
+_CLAIM_REFERENCE = re.compile(r"\bclaims?\s+(\d+)", re.IGNORECASE)
+
+# Characters at the start of a dependent claim searched for its parent reference
+_REFERENCE_WINDOW = 200
+
+# Score bonus for each query phrase found in a claim
+PHRASE_BONUS = 0.5
+
+# Smallest useful share of a long claim (tokens) when it has to be shortened to fit
+MIN_CLAIM_TOKENS = 40
+
+
+def parse_claim_structure(claims: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Annotate claims with their dependency structure.
+
+    Adds ``depends_on`` (the number of the referenced claim, or None for
+    independent claims) and ``root`` (the number of the independent claim at
+    the top of the chain) to a copy of each claim.
+
+    Args:
+        claims: Parsed claims with number / text / type
+
+    Returns:
+        Annotated copies of the claims, in their original order
+    """
+    structured = []
+    numbers = {str(claim.get("number", "")) for claim in claims}
+    for claim in claims:
+        claim = dict(claim)
+        depends_on = None
+        if claim.get("type") == "dependent":
+            match = _CLAIM_REFERENCE.search(claim.get("text", "")[:_REFERENCE_WINDOW])
+            if match and match.group(1) in numbers and match.group(1) != str(claim.get("number")):
+                depends_on = match.group(1)
+        claim["depends_on"] = depends_on
+        structured.append(claim)
+
+    parents = {str(claim.get("number")): claim["depends_on"] for claim in structured}
+    for claim in structured:
+        root, seen = str(claim.get("number")), set()
+        while parents.get(root) and root not in seen:
+            seen.add(root)
+            root = parents[root]
+        claim["root"] = root
+    return structured
+
+
+def score_claim(query: str, claim_text: str) -> float:
+    """
+    Score a claim by the share of query terms it contains, plus phrase bonuses.
+
+    Args:
+        query: User query
+        claim_text: Claim text
+
+    Returns:
+        Non-negative score (1.0 means every query term is present)
+    """
+    terms = {stem(term) for term in content_terms(query)}
+    if not terms:
+        return 0.0
+    tokens = stem_tokens(claim_text)
+    token_set = set(tokens)
+    score = sum(1 for term in terms if term in token_set) / len(terms)
+    joined = " ".join(tokens)
+    for phrase in extract_key_phrases(query):
+        if " ".join(stem_tokens(phrase)) in joined:
+            score += PHRASE_BONUS
+    return round(score, 4)
+
+
+def select_claims(query: Optional[str], claims: List[Dict[str, Any]], token_budget: int) -> List[Dict[str, Any]]:
+    """
+    Choose the claims most relevant to the query that fit a token budget.
+
+    The best-scoring independent claim is always included (shortened if it
+    alone exceeds the budget). Other claims sharing terms with the query are
+    added best-first; a dependent claim is only added once the independent
+    claim it builds on is in (which is pulled in with it when both fit).
+    Without a query, claims are taken in order until the budget is used.
+
+    Args:
+        query: User query (None keeps the original claim order as priority)
+        claims: Parsed claims of one patent
+        token_budget: Maximum tokens of the formatted claim lines
+
+    Returns:
+        Selected claims in claim order, each with ``score``, ``depends_on`` and ``root``
+    """
+    structured = [claim for claim in parse_claim_structure(claims) if (claim.get("text") or "").strip()]
+    if not structured:
+        return []
+    for position, claim in enumerate(structured):
+        claim["score"] = score_claim(query, claim["text"]) if query else 0.0
+        claim["_position"] = position
+
+    by_number = {str(claim.get("number")): claim for claim in structured}
+    ranked = sorted(structured, key=lambda claim: (-claim["score"], claim.get("type") != "independent",
+                                                    claim["_position"]))
+    selected: Dict[int, Dict[str, Any]] = {}
+    remaining = token_budget
+
+    def add(claim: Dict[str, Any]) -> bool:
+        nonlocal remaining
+        cost = count_tokens(format_claim(claim))
+        if cost > remaining:
+            return False
+        selected[claim["_position"]] = claim
+        remaining -= cost
+        return True
+
+    # Anchor: the most relevant independent claim, shortened if it alone is too long
+    anchor = next((claim for claim in ranked if claim.get("type") == "independent"), ranked[0])
+    if not add(anchor):
+        # One token of slack: the joined line may tokenize slightly differently
+        room = remaining - count_tokens(format_claim({**anchor, "text": ""})) - 1
+        if room >= MIN_CLAIM_TOKENS:
+            add({**anchor, "text": truncate_to_tokens(anchor["text"], room)})
+
+    for claim in ranked:
+        if remaining <= 0:
+            break
+        if claim["_position"] in selected:
+            continue
+        if query and claim["score"] <= 0:
+            break  # Ranked best-first: nothing further mentions the query
+        root = by_number.get(claim["root"])
+        if root is not None and root is not claim and root["_position"] not in selected:
+            if count_tokens(format_claim(root)) + count_tokens(format_claim(claim)) > remaining:
+                continue
+            add(root)
+        add(claim)
+
+    result = []
+    for position in sorted(selected):
+        claim = dict(selected[position])
+        claim.pop("_position", None)
+        result.append(claim)
+    return result
+
+
+def format_claim(claim: Dict[str, Any]) -> str:
+    """Render a claim as one prompt line: "Claim 3 (dependent on claim 1): ..."."""
+    if claim.get("depends_on"):
+        kind = f"dependent on claim {claim['depends_on']}"
+    else:
+        kind = claim.get("type") or "unknown"
+    return f"Claim {claim.get('number', '')} ({kind}): {claim.get('text', '')}"
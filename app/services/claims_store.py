@@ -0,0 +1,177 @@
+"""
+Patent Claims Store
+
+Persistent SQLite (WAL) store of parsed patent claims keyed by patent_id.
+Granted claims never change, so once fetched they are served locally forever.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_MAX_LOOKUP_BATCH = 500
+
+
+class ClaimsStore:
+    """Local persistent store of parsed claim records."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self._open()
+
+    async def get_many(self, patent_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Look up claims for many patents at once.
+
+        Args:
+            patent_ids: Patent IDs to look up
+
+        Returns:
+            Mapping of patent_id to claims for the patents that are stored
+        """
+        ids = list(dict.fromkeys(patent_id for patent_id in patent_ids if patent_id))
+        if not ids or self._db is None:
+            self.misses += len(ids)
+            return {}
+
+        found = await asyncio.to_thread(self._select, ids)
+        self.hits += len(found)
+        self.misses += len(ids) - len(found)
+        return found
+
+    async def put_many(self, claims_by_patent: Dict[str, List[Dict[str, Any]]]):
+        """
+        Store claims for many patents.
+
+        Patents without any claims are skipped - an empty result is more likely
+        a transient API gap than a patent that genuinely has no claims.
+        """
+        records = {patent_id: claims for patent_id, claims in claims_by_patent.items() if claims}
+        if not records or self._db is None:
+            return
+        await asyncio.to_thread(self._upsert, records)
+        self.writes += len(records)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store size and hit-ratio statistics."""
+        lookups = self.hits + self.misses
+        stats = {
+            "path": self.db_path,
+            "available": self._db is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "patents": 0,
+            "size_bytes": 0
+        }
+        if self._db is not None:
+            with self._lock:
+                try:
+                    stats["patents"] = self._db.execute("SELECT COUNT(*) FROM patent_claims").fetchone()[0]
+                except sqlite3.Error as e:
+                    logger.warning(f"Claims store stats query failed: {e}")
+            for suffix in ("", "-wal"):
+                try:
+                    stats["size_bytes"] += os.path.getsize(self.db_path + suffix)
+                except OSError:
+                    pass
+        return stats
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _open(self):
+        """Open (and create if needed) the database."""
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS patent_claims ("
+                "patent_id TEXT PRIMARY KEY, claims TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Claims store opened at {self.db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open claims store {self.db_path}: {e}")
+            self._db = None
+
+    def _select(self, patent_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Bulk read (runs in a worker thread)."""
+        found = {}
+        with self._lock:
+            if self._db is None:
+                return found
+            try:
+                for i in range(0, len(patent_ids), _MAX_LOOKUP_BATCH):
+                    chunk = patent_ids[i:i + _MAX_LOOKUP_BATCH]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._db.execute(
+                        f"SELECT patent_id, claims FROM patent_claims WHERE patent_id IN ({placeholders})",
+                        chunk
+                    ).fetchall()
+                    for patent_id, claims in rows:
+                        found[patent_id] = json.loads(claims)
+            except sqlite3.Error as e:
+                logger.warning(f"Claims store read failed: {e}")
+        return found
+
+    def _upsert(self, records: Dict[str, List[Dict[str, Any]]]):
+        """Bulk write (runs in a worker thread)."""
+        now = time.time()
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO patent_claims (patent_id, claims, fetched_at) VALUES (?, ?, ?)",
+                    [(patent_id, json.dumps(claims, ensure_ascii=False), now)
+                     for patent_id, claims in records.items()]
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Claims store write failed: {e}")
+
+
+# Lazy-loaded process-wide store
+_claims_store_instance = None
+
+def get_claims_store() -> Optional[ClaimsStore]:
+    """Get the shared claims store, or None when it is disabled."""
+    global _claims_store_instance
+    if _claims_store_instance is None:
+        from app.core.config import settings
+        if not settings.claims_store_path:
+            return None
+        _claims_store_instance = ClaimsStore(settings.claims_store_path)
+    return _claims_store_instance
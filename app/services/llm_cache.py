@@ -0,0 +1,216 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for LLM completions with two tiers:
+1. In-memory LRU bounded by total bytes
+2. Persistent SQLite tier that survives restarts
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """Two-tier (memory + SQLite) cache for LLM responses keyed by the full request."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, db_path: Optional[str] = None,
+                 ttl_seconds: Optional[float] = 86400.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the serialized size of the memory tier
+            db_path: Path of the SQLite file for the disk tier (None disables it)
+            ttl_seconds: Lifetime of entries generated with temperature > 0
+                (None keeps them forever); deterministic entries never expire
+        """
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (value, size_in_bytes, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int, Optional[float]]]" = OrderedDict()
+        self._current_bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._open_db(db_path)
+
+    @staticmethod
+    def make_key(deployment: Optional[str], system_message: Optional[str], prompt: str,
+                 max_tokens: int, temperature: float) -> str:
+        """Build the content address of a request."""
+        payload = json.dumps(
+            [deployment, system_message, prompt, max_tokens, round(float(temperature), 4)],
+            ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, temperature: float) -> Optional[float]:
+        """Get the TTL for a request - only non-deterministic outputs expire."""
+        return self.ttl_seconds if temperature > 0 else None
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response, falling back to the disk tier."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, size, expires_at = entry
+            if expires_at is None or expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._remove(key)
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._db_get, key)
+            if row is not None:
+                value, expires_at = row
+                self._store_in_memory(key, value, expires_at)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None):
+        """Store a response in both tiers."""
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._store_in_memory(key, value, expires_at)
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, value, expires_at)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._entries),
+            "memory_bytes": self._current_bytes,
+            "max_bytes": self.max_bytes,
+            "disk_enabled": self._db is not None
+        }
+
+    def close(self):
+        """Close the disk tier."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _store_in_memory(self, key: str, value: Dict[str, Any], expires_at: Optional[float]):
+        """Insert into the LRU tier, evicting least recently used entries past the byte budget."""
+        size = len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, expires_at)
+        self._current_bytes += size
+
+        while self._current_bytes > self.max_bytes and self._entries:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._current_bytes -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        """Remove an entry from the memory tier."""
+        _, size, _ = self._entries.pop(key)
+        self._current_bytes -= size
+
+    def _open_db(self, db_path: str):
+        """Open (and create if needed) the SQLite tier."""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL)"
+            )
+            self._db.execute(
+                "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),)
+            )
+            self._db.commit()
+            logger.info(f"LLM response cache disk tier opened at {db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open LLM cache database {db_path}: {e}")
+            self._db = None
+
+    def _db_get(self, key: str) -> Optional[Tuple[Dict[str, Any], Optional[float]]]:
+        """Read an unexpired entry from SQLite (runs in a worker thread)."""
+        with self._db_lock:
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache read failed: {e}")
+                return None
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return json.loads(value), expires_at
+
+    def _db_set(self, key: str, value: Dict[str, Any], expires_at: Optional[float]):
+        """Write an entry to SQLite (runs in a worker thread)."""
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), time.time(), expires_at)
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache write failed: {e}")
+
+
+# Lazy-loaded process-wide cache shared by every LLMClient
+_llm_cache_instance = None
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get the shared LLM response cache, or None when caching is disabled."""
+    global _llm_cache_instance
+    if _llm_cache_instance is None:
+        from app.core.config import settings
+        if not settings.llm_cache_enabled:
+            return None
+        _llm_cache_instance = LLMResponseCache(
+            max_bytes=settings.llm_cache_max_bytes,
+            db_path=settings.llm_cache_path or None,
+            ttl_seconds=settings.llm_cache_ttl_seconds or None
+        )
+    return _llm_cache_instance
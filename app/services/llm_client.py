@@ -7,14 +7,84 @@ Provides a unified interface for text generation, summarization, and analysis.
 
 import os
 import logging
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, AsyncIterator, Awaitable, Callable, Mapping, Tuple
 from datetime import datetime
 import openai
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI
 import json
 
+from app.services.llm_cache import LLMResponseCache, get_llm_cache
+from app.services.llm_scheduler import LLMRequestScheduler, LLMReservation, get_llm_scheduler
+from app.core.config import get_circuit_breaker_config, get_retry_policy_config, settings
+from app.core.exceptions import CircuitOpenError, DeadlineExceededError, LLMError
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.deadline import bounded_timeout, remaining_time, within_deadline
+from app.utils.retry import RETRYABLE_STATUSES, RetryPolicy, parse_retry_after
+from app.utils.tokens import count_chat_tokens, count_tokens
+from app.utils.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Default per-request timeout (seconds), capped by the request deadline when one is set
+REQUEST_TIMEOUT = 300.0
+
+
+def _is_backend_failure(error: Exception) -> bool:
+    """Whether an OpenAI error reflects Azure OpenAI health (5xx, timeout, connection) rather than the request."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+# Fails Azure OpenAI calls fast during outages; 4xx errors and 429 throttling do not count
+_llm_breaker = CircuitBreaker(
+    "azure_openai",
+    is_failure=_is_backend_failure,
+    **get_circuit_breaker_config(settings.azure_openai_slow_call_seconds)
+)
+
+
+def _classify_llm_error(error: Exception) -> Tuple[bool, Optional[float]]:
+    """Retry 408/429/5xx, timeouts and connection errors (honouring Retry-After); never other 4xx."""
+    if isinstance(error, openai.APIConnectionError):
+        return True, None
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUSES, parse_retry_after(_error_headers(error))
+    return False, None
+
+
+# Retries transient Azure OpenAI failures under the process-wide retry budget
+_llm_retry = RetryPolicy("azure_openai", _classify_llm_error, **get_retry_policy_config())
+
+# Coalesces identical in-flight completions across every LLMClient instance
+_llm_flights = SingleFlight("azure_openai")
+
+# Azure OpenAI clients shared across LLMClient instances, keyed by (endpoint, api_key).
+# Coalesced calls may outlive the service that started them, so the underlying
+# connection pool is process-wide and only closed on shutdown.
+_shared_clients: Dict[tuple, AsyncAzureOpenAI] = {}
+
+
+def _get_shared_client(api_key: str, endpoint: str) -> AsyncAzureOpenAI:
+    """Get (or create) the shared Azure OpenAI client for an endpoint."""
+    key = (endpoint, api_key)
+    if key not in _shared_clients:
+        _shared_clients[key] = AsyncAzureOpenAI(
+            api_key=api_key,
+            api_version="2024-02-15-preview",
+            azure_endpoint=endpoint,
+            timeout=REQUEST_TIMEOUT,
+            max_retries=0  # Retries are handled by the shared retry policy (app.utils.retry)
+        )
+    return _shared_clients[key]
+
+
+async def close_llm_clients():
+    """Close all shared Azure OpenAI clients (call on application shutdown)."""
+    while _shared_clients:
+        _, client = _shared_clients.popitem()
+        await client.close()
+
 
 class LLMClient:
     """Client for interacting with Large Language Models."""
@@ -22,7 +92,9 @@ class LLMClient:
     def __init__(self, azure_openai_api_key: Optional[str] = None,
                  azure_openai_endpoint: Optional[str] = None,
                  azure_openai_deployment: Optional[str] = None,
-                 model_name: str = "gpt-4"):
+                 model_name: str = "gpt-4",
+                 cache: Optional[LLMResponseCache] = None,
+                 scheduler: Optional[LLMRequestScheduler] = None):
         """
         Initialize the LLM client.
         
@@ -31,21 +103,20 @@ class LLMClient:
             azure_openai_endpoint: Azure OpenAI endpoint URL
             azure_openai_deployment: Azure OpenAI deployment name
             model_name: Model name to use
+            cache: Response cache (defaults to the shared process-wide cache)
+            scheduler: TPM/RPM scheduler (defaults to the shared process-wide scheduler)
         """
         self.azure_openai_api_key = azure_openai_api_key
         self.azure_openai_endpoint = azure_openai_endpoint
         self.azure_openai_deployment = azure_openai_deployment
         self.model_name = model_name
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.scheduler = scheduler if scheduler is not None else get_llm_scheduler()
         
         # Initialize Azure OpenAI client
         if azure_openai_api_key and azure_openai_endpoint:
             try:
-                self.client = AzureOpenAI(
-                    api_key=azure_openai_api_key,
-                    api_version="2024-02-15-preview",
-                    azure_endpoint=azure_openai_endpoint,
-                    timeout=300.0
-                )
+                self.client = _get_shared_client(azure_openai_api_key, azure_openai_endpoint)
                 self.azure_deployment = azure_openai_deployment or "gpt-4o-mini"
                 self.llm_available = True
                 logger.info(f"Azure OpenAI client initialized with deployment: {self.azure_deployment}")
@@ -58,76 +129,281 @@ class LLMClient:
             self.llm_available = False
             logger.warning("Azure OpenAI not configured - LLM features disabled")
     
-    def generate_text(self, prompt: str, max_tokens: int = 1000, 
-                     temperature: float = 0.7, system_message: Optional[str] = None, 
-                     max_retries: int = 3) -> Dict[str, Any]:
+    async def generate_text(self, prompt: str, max_tokens: int = 1000, 
+                            temperature: float = 0.7, system_message: Optional[str] = None, 
+                            max_retries: int = 3, use_cache: bool = True,
+                            on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict[str, Any]:
         """
         Generate text using the LLM.
         
+        The request is awaited on the event loop, so concurrent callers
+        overlap instead of blocking each other. Timeouts, rate-limit queueing
+        and retries are bounded by the request deadline (app.utils.deadline);
+        a call shared with identical requests runs without one, and this
+        caller stops waiting for it at its own deadline.
+        
         Args:
             prompt: User prompt
             max_tokens: Maximum tokens to generate
             temperature: Creativity level (0.0 to 2.0)
             system_message: Optional system message
+            max_retries: Number of attempts before giving up (only transient errors are retried)
+            use_cache: Serve/store the response through the response cache and
+                coalesce it with identical in-flight requests
+            on_token: Optional callback receiving text deltas as they are generated
+                (switches to a streaming request, which is not coalesced)
             
         Returns:
-            Dictionary containing generated text and metadata
+            Dictionary containing generated text and metadata (an error result
+            without calling the LLM while the Azure OpenAI circuit is open)
         """
         try:
             if not self.llm_available:
                 return self._create_error_result("LLM not available")
             
-            # Prepare messages
-            messages = []
-            if system_message:
-                messages.append({"role": "system", "content": system_message})
-            messages.append({"role": "user", "content": prompt})
+            if on_token is not None:
+                return await self._generate_streaming(prompt, max_tokens, temperature, system_message,
+                                                      max_retries, use_cache, on_token)
             
-            # Make API call with retry logic
-            last_error = None
-            for attempt in range(max_retries):
-                try:
-                    response = self.client.chat.completions.create(
-                        model=self.azure_openai_deployment,
-                        messages=messages,
-                        max_tokens=max_tokens,
-                        temperature=temperature
-                    )
-                    break  # Success, exit retry loop
-                except Exception as e:
-                    last_error = e
-                    if attempt < max_retries - 1:
-                        logger.warning(f"LLM API call failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                        import time
-                        time.sleep(2 ** attempt)  # Exponential backoff
-                    else:
-                        raise e
+            if not use_cache:
+                return await self._generate_uncached(prompt, max_tokens, temperature,
+                                                     system_message, max_retries)
+            
+            request_key = LLMResponseCache.make_key(self.azure_deployment, system_message, prompt,
+                                                    max_tokens, temperature)
+            if self.cache is not None:
+                cached = await self.cache.get(request_key)
+                if cached is not None:
+                    logger.info(f"LLM cache hit for key {request_key[:12]}")
+                    return {**cached, "cached": True}
+            
+            # Identical concurrent requests share a single Azure OpenAI call
+            result = await _llm_flights.do(
+                request_key,
+                lambda: self._generate_and_cache(request_key, prompt, max_tokens, temperature,
+                                                 system_message, max_retries)
+            )
+            return {**result, "cached": False}
             
-            # Debug logging
-            logger.info(f"Azure OpenAI response type: {type(response)}")
-            logger.info(f"Response choices: {response.choices}")
-            logger.info(f"First choice message content type: {type(response.choices[0].message.content)}")
-            logger.info(f"First choice message content: {response.choices[0].message.content}")
+        except Exception as e:
+            logger.error(f"Error generating text: {str(e)}")
+            return self._create_error_result(f"Text generation failed: {str(e)}")
+    
+    async def stream_text(self, prompt: str, max_tokens: int = 1000,
+                          temperature: float = 0.7, system_message: Optional[str] = None,
+                          max_retries: int = 3, use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Generate text using the LLM, yielding text deltas as they arrive.
+        
+        A cached response is yielded as a single delta. Retries only happen
+        before the first token has been received.
+        
+        Args:
+            prompt: User prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Creativity level (0.0 to 2.0)
+            system_message: Optional system message
+            max_retries: Number of attempts to open the stream
+            use_cache: Serve/store the response through the response cache
             
-            # Extract response
-            generated_text = response.choices[0].message.content
-            usage = response.usage
+        Yields:
+            Generated text fragments in order
             
-            return {
+        Raises:
+            LLMError: If the LLM is unavailable or the stream fails
+            DeadlineExceededError: If the request deadline passes first
+            CircuitOpenError: If the Azure OpenAI circuit is open
+        """
+        if not self.llm_available:
+            raise LLMError("LLM not available")
+        
+        request_key = None
+        if use_cache and self.cache is not None:
+            request_key = LLMResponseCache.make_key(self.azure_deployment, system_message, prompt,
+                                                    max_tokens, temperature)
+            cached = await self.cache.get(request_key)
+            if cached is not None:
+                logger.info(f"LLM cache hit for streamed key {request_key[:12]}")
+                yield cached["text"]
+                return
+        
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        messages.append({"role": "user", "content": prompt})
+        
+        prompt_tokens = count_chat_tokens(prompt, system_message)
+        
+        async def open_stream():
+            reservation = await self._reserve(prompt_tokens + max_tokens)
+            try:
+                with _llm_breaker.track():
+                    stream = await self.client.chat.completions.create(
+                        model=self.azure_deployment,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        stream=True,
+                        timeout=bounded_timeout(REQUEST_TIMEOUT)
+                    )
+            except openai.RateLimitError as e:
+                self._record_throttle(reservation, e)
+                raise
+            return stream, reservation
+        
+        try:
+            stream, reservation = await _llm_retry.call(open_stream, max_attempts=max_retries)
+        except (DeadlineExceededError, CircuitOpenError):
+            raise
+        except Exception as e:
+            raise LLMError(f"Text streaming failed: {str(e)}") from e
+        
+        text_parts = []
+        try:
+            async for chunk in stream:
+                if remaining_time() == 0:
+                    raise DeadlineExceededError(f"Request deadline exceeded after {len(text_parts)} streamed chunks")
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    text_parts.append(delta)
+                    yield delta
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            raise LLMError(f"Text streaming interrupted: {str(e)}") from e
+        finally:
+            await stream.close()
+        
+        generated_text = "".join(text_parts)
+        completion_tokens = count_tokens(generated_text)
+        if reservation is not None:
+            self.scheduler.record_response(reservation, prompt_tokens + completion_tokens)
+        
+        if request_key is not None and generated_text:
+            result = {
                 "success": True,
                 "text": generated_text,
                 "usage": {
-                    "prompt_tokens": usage.prompt_tokens,
-                    "completion_tokens": usage.completion_tokens,
-                    "total_tokens": usage.total_tokens
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
                 },
-                "model": self.azure_openai_deployment,
+                "model": self.azure_deployment,
                 "timestamp": datetime.now().isoformat()
             }
-            
-        except Exception as e:
-            logger.error(f"Error generating text: {str(e)}")
-            return self._create_error_result(f"Text generation failed: {str(e)}")
+            await self.cache.set(request_key, result, ttl=self.cache.ttl_for(temperature))
+    
+    async def _generate_streaming(self, prompt: str, max_tokens: int, temperature: float,
+                                  system_message: Optional[str], max_retries: int, use_cache: bool,
+                                  on_token: Callable[[str], Awaitable[None]]) -> Dict[str, Any]:
+        """Consume stream_text, forwarding deltas, and return a generate_text style result."""
+        text_parts = []
+        async for delta in self.stream_text(prompt, max_tokens, temperature, system_message,
+                                            max_retries, use_cache):
+            text_parts.append(delta)
+            await on_token(delta)
+        
+        generated_text = "".join(text_parts)
+        prompt_tokens = count_chat_tokens(prompt, system_message)
+        completion_tokens = count_tokens(generated_text)
+        return {
+            "success": True,
+            "text": generated_text,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            },
+            "model": self.azure_deployment,
+            "timestamp": datetime.now().isoformat(),
+            "streamed": True
+        }
+    
+    async def _generate_and_cache(self, request_key: str, prompt: str, max_tokens: int,
+                                  temperature: float, system_message: Optional[str],
+                                  max_retries: int) -> Dict[str, Any]:
+        """Call the LLM and store a successful response in the cache."""
+        result = await self._generate_uncached(prompt, max_tokens, temperature,
+                                               system_message, max_retries)
+        if self.cache is not None and result.get("text"):
+            await self.cache.set(request_key, result, ttl=self.cache.ttl_for(temperature))
+        return result
+    
+    async def _generate_uncached(self, prompt: str, max_tokens: int, temperature: float,
+                                 system_message: Optional[str], max_retries: int) -> Dict[str, Any]:
+        """Call Azure OpenAI with retry logic, bypassing the cache."""
+        # Prepare messages
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        messages.append({"role": "user", "content": prompt})
+        
+        # Reserve TPM/RPM capacity so bursts queue locally instead of hitting 429s
+        estimated_tokens = count_chat_tokens(prompt, system_message) + max_tokens
+        
+        async def attempt():
+            reservation = await self._reserve(estimated_tokens)
+            try:
+                with _llm_breaker.track():
+                    raw_response = await self.client.chat.completions.with_raw_response.create(
+                        model=self.azure_deployment,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=bounded_timeout(REQUEST_TIMEOUT)
+                    )
+            except openai.RateLimitError as e:
+                self._record_throttle(reservation, e)
+                raise
+            response = raw_response.parse()
+            if reservation is not None:
+                self.scheduler.record_response(
+                    reservation,
+                    response.usage.total_tokens if response.usage else None,
+                    raw_response.headers
+                )
+            return response
+        
+        # Make API call, retrying transient failures under the shared retry policy
+        response = await _llm_retry.call(attempt, max_attempts=max_retries)
+        
+        # Debug logging
+        logger.info(f"Azure OpenAI response type: {type(response)}")
+        logger.info(f"Response choices: {response.choices}")
+        logger.info(f"First choice message content type: {type(response.choices[0].message.content)}")
+        logger.info(f"First choice message content: {response.choices[0].message.content}")
+        
+        # Extract response
+        generated_text = response.choices[0].message.content
+        usage = response.usage
+        
+        result = {
+            "success": True,
+            "text": generated_text,
+            "usage": {
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens
+            },
+            "model": self.azure_deployment,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        return result
+    
+    async def _reserve(self, estimated_tokens: int) -> Optional[LLMReservation]:
+        """Fail fast on an open circuit, then reserve TPM/RPM capacity within the deadline."""
+        _llm_breaker.check()
+        if self.scheduler is None:
+            return None
+        return await within_deadline(self.scheduler.acquire(self.azure_deployment, estimated_tokens))
+    
+    def _record_throttle(self, reservation: Optional[LLMReservation], error: openai.RateLimitError):
+        """Pause the scheduler after a 429 for the Retry-After delay."""
+        if reservation is not None:
+            self.scheduler.record_throttle(reservation, parse_retry_after(_error_headers(error)))
     
     def is_available(self) -> bool:
         """Check if LLM is available."""
@@ -139,7 +415,12 @@ class LLMClient:
             "available": self.llm_available,
             "provider": "Azure OpenAI" if self.llm_available else "None",
             "model": self.azure_openai_deployment if self.llm_available else "None",
-            "endpoint": self.azure_openai_endpoint if self.llm_available else "None"
+            "endpoint": self.azure_openai_endpoint if self.llm_available else "None",
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "coalescing": _llm_flights.get_stats(),
+            "scheduler": self.scheduler.get_stats() if self.scheduler is not None else None,
+            "circuit_breaker": _llm_breaker.get_stats(),
+            "retries": _llm_retry.get_stats()
         }
     
     def _create_error_result(self, error_message: str) -> Dict[str, Any]:
@@ -151,6 +432,12 @@ class LLMClient:
         }
 
 
+def _error_headers(error: Exception) -> Optional[Mapping[str, str]]:
+    """Get the response headers attached to an OpenAI API error, if any."""
+    response = getattr(error, "response", None)
+    return response.headers if response is not None else None
+
+
 # Global instance for easy access
 def create_llm_client():
     """Create LLM client with environment configuration."""
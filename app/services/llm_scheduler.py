@@ -0,0 +1,179 @@
+"""
+LLM Request Scheduler
+
+Process-wide admission control for Azure OpenAI. Every completion reserves its
+estimated prompt + completion tokens and one request against per-deployment
+TPM/RPM token buckets before it is sent, so bursts queue locally instead of
+being throttled with 429s. Reservations are reconciled with the actual usage
+and the x-ratelimit-remaining-* response headers after each call.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Mapping, Optional
+
+from app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class _DeploymentBudget:
+    """TPM and RPM buckets of a single deployment."""
+
+    def __init__(self, tokens_per_minute: int, requests_per_minute: int):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+
+        # Statistics
+        self.admitted = 0
+        self.queued = 0
+        self.total_wait_seconds = 0.0
+        self.throttled = 0
+        self.header_corrections = 0
+
+
+class LLMReservation:
+    """Capacity reserved for one in-flight request."""
+
+    def __init__(self, deployment: str, estimated_tokens: int, wait_seconds: float):
+        self.deployment = deployment
+        self.estimated_tokens = estimated_tokens
+        self.wait_seconds = wait_seconds
+
+
+class LLMRequestScheduler:
+    """Token-bucket scheduler honoring per-deployment TPM/RPM quotas."""
+
+    def __init__(self, default_tpm: int, default_rpm: int,
+                 deployment_limits: Optional[Dict[str, Dict[str, int]]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            default_tpm: Tokens-per-minute budget for deployments without an override
+            default_rpm: Requests-per-minute budget for deployments without an override
+            deployment_limits: Per-deployment overrides, e.g. {"gpt-4o": {"tpm": 30000, "rpm": 180}}
+        """
+        self.default_tpm = default_tpm
+        self.default_rpm = default_rpm
+        self.deployment_limits = deployment_limits or {}
+        self._budgets: Dict[str, _DeploymentBudget] = {}
+
+    async def acquire(self, deployment: str, estimated_tokens: int) -> LLMReservation:
+        """
+        Wait until the deployment has room for a request of the estimated size.
+
+        Args:
+            deployment: Azure OpenAI deployment name
+            estimated_tokens: Prompt tokens plus max_tokens of the request
+
+        Returns:
+            Reservation to pass to record_response / record_throttle
+        """
+        budget = self._get_budget(deployment)
+        wait = await budget.requests.acquire(1)
+        wait += await budget.tokens.acquire(estimated_tokens)
+
+        budget.admitted += 1
+        if wait > 0.01:
+            budget.queued += 1
+            budget.total_wait_seconds += wait
+            logger.info(f"LLM request for {deployment} queued {wait:.2f}s for TPM/RPM budget")
+        return LLMReservation(deployment, estimated_tokens, wait)
+
+    def record_response(self, reservation: LLMReservation, actual_tokens: Optional[int],
+                        headers: Optional[Mapping[str, str]] = None):
+        """
+        Reconcile a reservation after a successful call.
+
+        Unused estimated tokens are returned to the bucket, and the buckets are
+        lowered to the remaining quota reported by Azure when it is smaller than
+        the local view (e.g. because other workers share the deployment).
+        """
+        budget = self._get_budget(reservation.deployment)
+        if actual_tokens is not None and actual_tokens < reservation.estimated_tokens:
+            budget.tokens.refund(reservation.estimated_tokens - actual_tokens)
+
+        if headers:
+            remaining_tokens = _parse_header_number(headers, "x-ratelimit-remaining-tokens")
+            remaining_requests = _parse_header_number(headers, "x-ratelimit-remaining-requests")
+            if remaining_tokens is not None and remaining_tokens < budget.tokens.level:
+                budget.tokens.limit_to(remaining_tokens)
+                budget.header_corrections += 1
+            if remaining_requests is not None and remaining_requests < budget.requests.level:
+                budget.requests.limit_to(remaining_requests)
+                budget.header_corrections += 1
+
+    def record_throttle(self, reservation: LLMReservation, retry_after: Optional[float] = None):
+        """Pause the deployment after Azure answered with a 429."""
+        budget = self._get_budget(reservation.deployment)
+        budget.throttled += 1
+        pause = retry_after if retry_after is not None else 60.0 * reservation.estimated_tokens / budget.tokens_per_minute
+        budget.tokens.penalize(pause)
+        budget.requests.penalize(pause)
+        logger.warning(f"Azure OpenAI throttled {reservation.deployment}; pausing admissions for {pause:.1f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-deployment scheduler statistics."""
+        return {
+            deployment: {
+                "tokens_per_minute": budget.tokens_per_minute,
+                "requests_per_minute": budget.requests_per_minute,
+                "available_tokens": round(budget.tokens.level),
+                "available_requests": round(budget.requests.level),
+                "admitted": budget.admitted,
+                "queued": budget.queued,
+                "total_wait_seconds": round(budget.total_wait_seconds, 3),
+                "throttled": budget.throttled,
+                "header_corrections": budget.header_corrections
+            }
+            for deployment, budget in self._budgets.items()
+        }
+
+    def _get_budget(self, deployment: str) -> _DeploymentBudget:
+        """Get (or create) the buckets of a deployment."""
+        budget = self._budgets.get(deployment)
+        if budget is None:
+            limits = self.deployment_limits.get(deployment, {})
+            budget = _DeploymentBudget(
+                tokens_per_minute=int(limits.get("tpm", self.default_tpm)),
+                requests_per_minute=int(limits.get("rpm", self.default_rpm))
+            )
+            self._budgets[deployment] = budget
+        return budget
+
+
+def _parse_header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    """Parse a numeric response header, ignoring missing or malformed values."""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Lazy-loaded process-wide scheduler shared by every LLMClient
+_llm_scheduler_instance = None
+
+def get_llm_scheduler() -> Optional[LLMRequestScheduler]:
+    """Get the shared LLM request scheduler, or None when scheduling is disabled."""
+    global _llm_scheduler_instance
+    if _llm_scheduler_instance is None:
+        from app.core.config import settings
+        if settings.azure_openai_tpm_limit <= 0 or settings.azure_openai_rpm_limit <= 0:
+            return None
+        try:
+            deployment_limits = json.loads(settings.azure_openai_rate_limits or "{}")
+        except json.JSONDecodeError:
+            logger.error("AZURE_OPENAI_RATE_LIMITS is not valid JSON - using default limits only")
+            deployment_limits = {}
+        _llm_scheduler_instance = LLMRequestScheduler(
+            default_tpm=settings.azure_openai_tpm_limit,
+            default_rpm=settings.azure_openai_rpm_limit,
+            deployment_limits=deployment_limits
+        )
+    return _llm_scheduler_instance
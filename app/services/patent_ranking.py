@@ -0,0 +1,323 @@
+"""
+Patent Ranking
+
+Local relevance scoring of search results against the user query:
+- lexical_score: query term/phrase coverage of title and abstract (0-1)
+- relevance_gate: drops or defers candidates with low coverage before their
+  claims are fetched
+- rank_patents: field-weighted BM25 over title, abstract and claims, vectorized
+  with NumPy, fused across the user query and its generated sub-queries with
+  reciprocal-rank fusion
+- collapse_near_duplicates: folds patent families (continuations, divisionals)
+  with near-identical abstracts and first claims into one representative
+- FamilyIndex: incremental lookup of the family representative a patent
+  belongs to
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.minhash import LSHIndex, MinHasher, estimated_jaccard, shingles
+from app.utils.text import content_terms, extract_key_phrases, stem, stem_tokens, tokenize
+
+# Relative weight of a query term found in the title vs the abstract vs the claims
+TITLE_WEIGHT = 2.0
+ABSTRACT_WEIGHT = 1.0
+CLAIMS_WEIGHT = 0.5
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# MinHash signature length and LSH bands (16 bands of 4 rows: candidates from ~0.5 similarity)
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+_minhasher = MinHasher(MINHASH_PERMUTATIONS)
+
+# Reciprocal-rank fusion constant, and the weight of the user query's own ranking
+# relative to each generated sub-query's
+RRF_K = 60
+QUERY_RRF_WEIGHT = 2.0
+
+# Bonus for each query phrase found verbatim (after stemming)
+PHRASE_BONUS = 1.0
+
+
+def lexical_score(query: str, patent: Dict[str, Any]) -> float:
+    """
+    Score a patent by the query terms and phrases in its title and abstract.
+
+    Args:
+        query: User query
+        patent: Patent record with patent_title / patent_abstract
+
+    Returns:
+        Score normalized to [0, 1]
+    """
+    terms = {stem(term) for term in content_terms(query)}
+    if not terms:
+        return 0.0
+    title = stem_tokens(patent.get("patent_title"))
+    abstract = stem_tokens(patent.get("patent_abstract"))
+    title_tokens, abstract_tokens = set(title), set(abstract)
+
+    score = sum(TITLE_WEIGHT * (term in title_tokens) + ABSTRACT_WEIGHT * (term in abstract_tokens)
+                for term in terms)
+    max_score = len(terms) * (TITLE_WEIGHT + ABSTRACT_WEIGHT)
+
+    phrases = [stem_tokens(phrase) for phrase in extract_key_phrases(query)]
+    for phrase in phrases:
+        if _contains_sequence(title, phrase) or _contains_sequence(abstract, phrase):
+            score += PHRASE_BONUS
+    max_score += PHRASE_BONUS * len(phrases)
+
+    return round(score / max_score, 4)
+
+
+class LexicalIndex:
+    """
+    Term statistics of a candidate set for vectorized BM25 scoring.
+
+    Fields are combined BM25F-style: a term's frequency and a document's
+    length are weighted sums over title, abstract and (optionally) claims.
+    Document frequencies are taken over the candidates themselves.
+    """
+
+    def __init__(self, patents: Sequence[Dict[str, Any]], include_claims: bool = False):
+        """
+        Index patents.
+
+        Args:
+            patents: Patent records with patent_title / patent_abstract (and claims)
+            include_claims: Also index the text of each patent's claims
+        """
+        self._documents: List[Counter] = []
+        lengths = []
+        for patent in patents:
+            counts: Counter = Counter()
+            length = 0.0
+            for text, weight in _weighted_fields(patent, include_claims):
+                tokens = stem_tokens(text)
+                for token in tokens:
+                    counts[token] += weight
+                length += weight * len(tokens)
+            self._documents.append(counts)
+            lengths.append(length)
+
+        lengths = np.asarray(lengths, dtype=float)
+        average = lengths.mean() if len(lengths) else 0.0
+        relative = lengths / average if average > 0 else np.ones_like(lengths)
+        self._length_norm = BM25_K1 * (1 - BM25_B + BM25_B * relative)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def score(self, text: str) -> np.ndarray:
+        """BM25 score of every indexed patent against the content terms of ``text``."""
+        terms = sorted({stem(term) for term in content_terms(text)})
+        if not terms or not self._documents:
+            return np.zeros(len(self._documents))
+        tf = np.array([[document.get(term, 0.0) for term in terms] for document in self._documents])
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((len(self._documents) - df + 0.5) / (df + 0.5))
+        saturated = tf * (BM25_K1 + 1) / (tf + self._length_norm[:, None])
+        return saturated @ idf
+
+
+def reciprocal_rank_fusion(rankings: Sequence[np.ndarray], weights: Sequence[float] = ()) -> np.ndarray:
+    """
+    Fuse score vectors over the same documents by reciprocal rank.
+
+    Each ranking contributes ``weight / (RRF_K + rank)`` to the documents it
+    scores above zero, so documents ranked well by several rankings rise.
+
+    Args:
+        rankings: Score vectors (higher is better), one per ranking
+        weights: Optional weight per ranking (default 1)
+
+    Returns:
+        Fused score per document
+    """
+    if not rankings:
+        return np.zeros(0)
+    fused = np.zeros(len(rankings[0]))
+    for i, scores in enumerate(rankings):
+        weight = weights[i] if i < len(weights) else 1.0
+        ranks = np.empty(len(scores))
+        ranks[np.argsort(-scores, kind="stable")] = np.arange(1, len(scores) + 1)
+        fused += np.where(scores > 0, weight / (RRF_K + ranks), 0.0)
+    return fused
+
+
+def rank_patents(query: str, patents: List[Dict[str, Any]], sub_queries: Sequence[str] = (),
+                 include_claims: bool = True) -> List[Dict[str, Any]]:
+    """
+    Order patents by relevance to the query.
+
+    BM25 rankings for the user query and for each sub-query text are fused
+    with reciprocal-rank fusion. Each patent is annotated with its
+    bm25_score (against the user query) and relevance_score (fused score
+    relative to the best patent, 0-1); ties keep their original order.
+
+    Args:
+        query: User query
+        patents: Candidate patents
+        sub_queries: Free text of the generated search queries
+        include_claims: Score the claims text too (patents without claims score on title/abstract)
+
+    Returns:
+        The patents, most relevant first
+    """
+    if not patents:
+        return []
+    index = LexicalIndex(patents, include_claims)
+    query_scores = index.score(query)
+    rankings = [query_scores] + [index.score(text) for text in sub_queries if text]
+    fused = reciprocal_rank_fusion(rankings, weights=[QUERY_RRF_WEIGHT])
+    best = fused.max()
+
+    for patent, bm25, score in zip(patents, query_scores, fused):
+        patent["bm25_score"] = round(float(bm25), 4)
+        patent["relevance_score"] = round(float(score / best), 4) if best > 0 else 0.0
+    order = sorted(range(len(patents)), key=lambda i: (-fused[i], -query_scores[i]))
+    return [patents[i] for i in order]
+
+
+def relevance_gate(query: str, patents: List[Dict[str, Any]], drop_below: float, defer_below: float,
+                   min_kept: int = 0) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split ranked candidates by how well their title and abstract cover the query.
+
+    Patents scoring below ``drop_below`` are dropped; kept patents scoring
+    below ``defer_below`` are marked ``claims_deferred`` so their claims are
+    not fetched. The first ``min_kept`` patents are never dropped, so an
+    unusual query vocabulary cannot empty the results.
+
+    Args:
+        query: User query (invention description)
+        patents: Candidates, most relevant first
+        drop_below: lexical_score under which a candidate is dropped
+        defer_below: lexical_score under which a kept candidate's claims are deferred
+        min_kept: Number of leading candidates exempt from dropping
+
+    Returns:
+        Tuple of (kept, dropped), each in the original order
+    """
+    kept, dropped = [], []
+    for i, patent in enumerate(patents):
+        score = lexical_score(query, patent)
+        if score < drop_below and i >= min_kept:
+            dropped.append(patent)
+            continue
+        if score < defer_below:
+            patent["claims_deferred"] = True
+        kept.append(patent)
+    return kept, dropped
+
+
+class FamilyIndex:
+    """Incremental near-duplicate lookup over patent family representatives."""
+
+    def __init__(self, threshold: float = 0.8):
+        """
+        Initialize an empty index.
+
+        Args:
+            threshold: Estimated Jaccard similarity at which two patents are one family
+        """
+        self.threshold = threshold
+        self._index = LSHIndex(MINHASH_PERMUTATIONS, LSH_BANDS)
+        self._signatures: List[Any] = []
+        self._heads: List[Dict[str, Any]] = []
+        # Signature of the patent last looked up, reused when it is added next
+        self._last: Optional[Tuple[Dict[str, Any], Any]] = None
+
+    def find(self, patent: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Get the first-added representative of the family ``patent`` belongs to.
+
+        Patents are compared by MinHash over 3-word shingles of the abstract
+        plus the first claim (when claims are attached); LSH banding finds
+        candidate pairs, which are kept if their estimated Jaccard similarity
+        reaches the threshold.
+
+        Returns:
+            The representative, or None if there is none (or ``patent`` has no abstract)
+        """
+        if not patent.get("patent_abstract"):
+            return None
+        signature = self._signature(patent)
+        matches = [family for family in self._index.candidates(signature)
+                   if estimated_jaccard(signature, self._signatures[family]) >= self.threshold]
+        return self._heads[min(matches)] if matches else None
+
+    def add(self, patent: Dict[str, Any]):
+        """Add a patent as the representative of its own family (ignored without an abstract)."""
+        if not patent.get("patent_abstract"):
+            return
+        signature = self._signature(patent)
+        self._index.insert(len(self._heads), signature)
+        self._signatures.append(signature)
+        self._heads.append(patent)
+
+    def _signature(self, patent: Dict[str, Any]) -> Any:
+        """Get the MinHash signature of a patent's family shingles."""
+        if self._last is None or self._last[0] is not patent:
+            self._last = (patent, _minhasher.signature(_family_shingles(patent)))
+        return self._last[1]
+
+
+def collapse_near_duplicates(patents: List[Dict[str, Any]],
+                             threshold: float = 0.8) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Fold near-duplicate patents into the first (highest-ranked) of their family.
+
+    Families are found with a FamilyIndex. Folded patents' IDs (and their own
+    siblings) are added once each to the representative's ``sibling_ids``, so
+    collapsing the same patents again is harmless. Patents without an
+    abstract are never folded.
+
+    Args:
+        patents: Patents, most relevant first
+        threshold: Estimated Jaccard similarity at which two patents are one family
+
+    Returns:
+        Tuple of (representatives in the original order, number of patents folded)
+    """
+    families = FamilyIndex(threshold)
+    representatives: List[Dict[str, Any]] = []
+    for patent in patents:
+        head = families.find(patent)
+        if head is not None:
+            siblings = head.setdefault("sibling_ids", [])
+            for sibling_id in [patent.get("patent_id")] + patent.get("sibling_ids", []):
+                if sibling_id not in siblings:
+                    siblings.append(sibling_id)
+            continue
+        families.add(patent)
+        representatives.append(patent)
+    return representatives, len(patents) - len(representatives)
+
+
+def _family_shingles(patent: Dict[str, Any]) -> set:
+    """Get the word shingles of a patent's abstract and first claim."""
+    claims = patent.get("claims") or []
+    first_claim = claims[0].get("text", "") if claims else ""
+    return shingles(tokenize(patent.get("patent_abstract"))) | shingles(tokenize(first_claim))
+
+
+def _weighted_fields(patent: Dict[str, Any], include_claims: bool) -> Iterator[Tuple[str, float]]:
+    """Yield the scored text fields of a patent with their weights."""
+    yield patent.get("patent_title") or "", TITLE_WEIGHT
+    yield patent.get("patent_abstract") or "", ABSTRACT_WEIGHT
+    if include_claims:
+        yield " ".join(claim.get("text", "") for claim in patent.get("claims") or []), CLAIMS_WEIGHT
+
+
+def _contains_sequence(tokens: List[str], sequence: List[str]) -> bool:
+    """Whether ``sequence`` occurs contiguously in ``tokens``."""
+    size = len(sequence)
+    return size > 0 and any(tokens[i:i + size] == sequence for i in range(len(tokens) - size + 1))
@@ -8,16 +8,112 @@ Core Flow:
 4. Generate comprehensive markdown report
 """
 
+import copy
 import json
+import math
 import asyncio
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Callable, Awaitable, AsyncIterator, Collection
 import httpx
 import structlog
-from app.core.config import settings
+from app.core.config import get_circuit_breaker_config, get_retry_policy_config, settings
+from app.core.exceptions import CircuitOpenError, DeadlineExceededError
+from app.services.claim_selection import format_claim, select_claims
+from app.services.claims_store import get_claims_store
+from app.services.patent_ranking import (
+    FamilyIndex, collapse_near_duplicates, lexical_score, rank_patents, relevance_gate
+)
+from app.services.report_prompt import assignee_name, inventor_name, pack_patents
+from app.services.patentsview_query import (
+    MAX_PAGE_SIZE, QueryCompileError, QueryCompiler, build_keyword_queries, canonical_key, fuse_queries,
+    matches_query, query_text, refinement_moves
+)
 from app.utils.prompt_loader import load_prompt_template
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.concurrency import BoundedExecutor
+from app.utils.deadline import bounded_timeout, deadline_scope, has_time, remaining_time, within_deadline
+from app.utils.pipeline import StageQueue, run_stages
+from app.utils.rate_limit import TokenBucket
+from app.utils.retry import RETRYABLE_STATUSES, RetryableStatusError, RetryPolicy, parse_retry_after
+from app.utils.single_flight import SingleFlight
+from app.utils.text import content_terms, normalized_query_key
+from app.utils.tokens import count_chat_tokens, truncate_to_tokens
+from app.utils.ttl_cache import TTLCache
 
 logger = structlog.get_logger(__name__)
 
+# "fast": rule-based queries, local ranking, stored claims only and a templated report (no LLM calls)
+# "deep": LLM query generation, claim summaries and report
+SEARCH_MODES = ("fast", "deep")
+
+# Minimum seconds left in a latency budget to run each optional deep-mode stage
+MIN_SECONDS_FOR_REFINEMENT = 8.0
+MIN_SECONDS_FOR_CLAIMS = 3.0
+MIN_SECONDS_FOR_SUMMARIES = 12.0
+MIN_SECONDS_FOR_LLM_REPORT = 10.0
+
+# Share of the remaining budget query generation may use before falling back to keyword queries
+QUERY_GENERATION_BUDGET_SHARE = 0.4
+
+# Number of top patents whose claims get an LLM summary
+SUMMARIZED_PATENTS = 5
+
+# Share of max_results that may be sent on to claims before the search completes
+EARLY_ADMIT_SHARE = 0.5
+
+# Upper bound on g_claim pages per batch, so a cursor that never advances cannot loop forever
+MAX_CLAIMS_PAGES_PER_BATCH = 20
+
+# Validated query sets keyed by the normalized user query
+_plan_cache = TTLCache(
+    max_entries=settings.query_plan_cache_max_entries,
+    ttl_seconds=settings.query_plan_cache_ttl_seconds
+)
+
+# Validates and repairs generated queries before they reach PatentsView
+_query_compiler = QueryCompiler("patent")
+
+# Coalesces identical in-flight PatentsView requests across concurrent searches
+_patentsview_flights = SingleFlight("patentsview")
+
+# Search responses keyed by canonical request payload, aligned with PatentsView's data refresh
+_search_cache = TTLCache(
+    max_entries=settings.patentsview_search_cache_max_entries,
+    ttl_seconds=settings.patentsview_search_cache_ttl_seconds
+)
+
+# Paces every outbound PatentsView request against the per-key rate limit
+_patentsview_pacer = TokenBucket(
+    capacity=settings.patentsview_requests_per_minute,
+    refill_rate=settings.patentsview_requests_per_minute / 60.0
+)
+
+# Fails PatentsView calls fast while it is returning 5xx, timing out or responding slowly
+_patentsview_breaker = CircuitBreaker(
+    "patentsview", **get_circuit_breaker_config(settings.patentsview_slow_call_seconds)
+)
+
+
+def _classify_patentsview_error(error: Exception) -> Tuple[bool, Optional[float]]:
+    """Retry 408/429/5xx responses, timeouts and dropped connections; nothing else."""
+    if isinstance(error, RetryableStatusError):
+        return True, error.retry_after
+    return isinstance(error, httpx.TransportError), None
+
+
+# Retries transient PatentsView failures under the process-wide retry budget
+_patentsview_retry = RetryPolicy("patentsview", _classify_patentsview_error, **get_retry_policy_config())
+
+
+
+def _stale_while_circuit_open(request_key: Tuple) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """Get an expired cached PatentsView response while the circuit is open (None otherwise)."""
+    if not _patentsview_breaker.is_open:
+        return None
+    page = _search_cache.get_stale(request_key)
+    if page is not None:
+        logger.warning("PatentsView circuit open - serving expired cached response")
+    return page
+
 
 class PatentSearchService:
     """Simplified patent search service with core functionality."""
@@ -31,13 +127,164 @@ class PatentSearchService:
         )
         self.api_key = settings.patentsview_api_key
         self.base_url = "https://search.patentsview.org/api/v1"
+        self.claims_store = get_claims_store()
+        
+        # Long-lived pooled HTTP client (created lazily, closed via aclose())
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._pool_counters = {"requests": 0, "new_connections": 0, "in_flight": 0, "peak_in_flight": 0}
+    
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the pooled PatentsView HTTP client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Get the shared keep-alive client, creating it on first use."""
+        if self._http_client is None or self._http_client.is_closed:
+            http2 = settings.patentsview_http2
+            if http2:
+                try:
+                    import h2  # noqa: F401 - required by httpx for HTTP/2
+                except ImportError:
+                    logger.warning("HTTP/2 requested for PatentsView but 'h2' is not installed - using HTTP/1.1")
+                    http2 = False
+            
+            headers = {"Content-Type": "application/json"}
+            if self.api_key:
+                headers["X-Api-Key"] = self.api_key
+            
+            self._http_client = httpx.AsyncClient(
+                http2=http2,
+                headers=headers,
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=settings.patentsview_max_connections,
+                    max_keepalive_connections=settings.patentsview_max_keepalive_connections,
+                    keepalive_expiry=settings.patentsview_keepalive_expiry
+                )
+            )
+            logger.info(f"PatentsView connection pool created (http2={http2}, "
+                        f"max_connections={settings.patentsview_max_connections})")
+        return self._http_client
+    
+    async def _post(self, url: str, payload: Dict[str, Any], timeout: float) -> httpx.Response:
+        """POST to PatentsView, retrying transient failures under the shared retry policy.
+        
+        A 429 also pauses the request pacer for the Retry-After delay. A response
+        still retryable after the last attempt is returned for the caller's
+        status handling.
+        """
+        async def attempt() -> httpx.Response:
+            response = await self._post_once(url, payload, timeout)
+            if response.status_code in RETRYABLE_STATUSES:
+                retry_after = parse_retry_after(response.headers)
+                if response.status_code == 429:
+                    _patentsview_pacer.penalize(
+                        retry_after if retry_after is not None else 60.0 / settings.patentsview_requests_per_minute
+                    )
+                raise RetryableStatusError(response.status_code, retry_after, response)
+            return response
+        
+        try:
+            return await _patentsview_retry.call(attempt)
+        except RetryableStatusError as e:
+            return e.response
+    
+    async def _post_once(self, url: str, payload: Dict[str, Any], timeout: float) -> httpx.Response:
+        """POST to PatentsView through the pooled client, tracking connection reuse.
+        
+        Pacing waits and the timeout are bounded by the request deadline, if any.
+        Calls go through the PatentsView circuit breaker: 5xx responses, timeouts
+        and connection errors count against it, and an open circuit raises
+        CircuitOpenError before anything is queued or sent.
+        """
+        client = self._get_http_client()
+        _patentsview_breaker.check()
+        await within_deadline(_patentsview_pacer.acquire())
+        call_timeout = bounded_timeout(timeout)
+        counters = self._pool_counters
+        counters["requests"] += 1
+        counters["in_flight"] += 1
+        counters["peak_in_flight"] = max(counters["peak_in_flight"], counters["in_flight"])
+        try:
+            with _patentsview_breaker.track() as call:
+                try:
+                    response = await client.post(url, json=payload, timeout=call_timeout,
+                                                 extensions={"trace": self._trace_connection})
+                except httpx.TimeoutException as e:
+                    if call_timeout < timeout:
+                        # Cut short by the request deadline, not PatentsView's fault
+                        raise DeadlineExceededError("Request deadline exceeded waiting for PatentsView") from e
+                    raise
+                if response.status_code >= 500:
+                    call.mark_failed()
+                return response
+        finally:
+            counters["in_flight"] -= 1
+    
+    async def _trace_connection(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace hook - counts newly established TCP connections."""
+        if event_name == "connection.connect_tcp.complete":
+            self._pool_counters["new_connections"] += 1
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get PatentsView connection pool statistics."""
+        counters = self._pool_counters
+        pool = getattr(getattr(self._http_client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        pending = list(getattr(pool, "_requests", []) or [])
+        return {
+            "http2_enabled": settings.patentsview_http2,
+            "max_connections": settings.patentsview_max_connections,
+            "connections_open": sum(1 for c in connections if not c.is_closed()),
+            "connections_idle": sum(1 for c in connections if c.is_idle()),
+            "requests_waiting": sum(1 for r in pending if getattr(r, "is_queued", lambda: False)()),
+            "requests_total": counters["requests"],
+            "requests_in_flight": counters["in_flight"],
+            "peak_in_flight": counters["peak_in_flight"],
+            "connections_created": counters["new_connections"],
+            "connections_reused": max(0, counters["requests"] - counters["new_connections"])
+        }
+    
+    def get_retry_stats(self) -> Dict[str, Any]:
+        """Get PatentsView retry statistics."""
+        return _patentsview_retry.get_stats()
+    
+    def get_circuit_breaker_stats(self) -> Dict[str, Any]:
+        """Get PatentsView circuit breaker state."""
+        return _patentsview_breaker.get_stats()
+    
+    def get_search_cache_stats(self) -> Dict[str, Any]:
+        """Get PatentsView search response cache statistics."""
+        return _search_cache.get_stats()
+    
+    def get_query_plan_cache_stats(self) -> Dict[str, Any]:
+        """Get query plan cache statistics."""
+        return _plan_cache.get_stats()
+    
+    def get_query_compiler_stats(self) -> Dict[str, Any]:
+        """Get PatentsView query compiler statistics."""
+        return _query_compiler.get_stats()
     
     async def search_patents(
         self, 
         query: str, 
         context: Optional[str] = None, 
         conversation_history: Optional[str] = None,
-        max_results: int = 20
+        max_results: int = 20,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        refresh_plan: bool = False,
+        mode: str = "deep",
+        budget_seconds: Optional[float] = None
     ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """
         Main patent search function.
@@ -47,70 +294,167 @@ class PatentSearchService:
             context: Optional context (kept for compatibility)
             conversation_history: Optional conversation history (kept for compatibility)
             max_results: Maximum number of patents to return
+            on_token: Optional callback receiving report text as it is generated
+            refresh_plan: Regenerate the search queries even if a cached plan exists
+            mode: "deep" for the LLM flow, "fast" for rule-based queries, stored claims
+                and a templated report
+            budget_seconds: Optional latency budget; every LLM and HTTP call is bounded by
+                it and optional stages are skipped or replaced when it runs low
             
         Returns:
             Tuple of (search_result_dict, search_queries_list)
         """
         if not query.strip():
             raise ValueError("Query cannot be empty")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Invalid search mode '{mode}'. Use one of: {', '.join(SEARCH_MODES)}")
+        fast = mode == "fast"
         
-        try:
-            logger.info(f"Starting patent search for: {query}")
-            
-            # Step 1: Generate search queries
-            logger.info("Step 1: Generating search queries...")
-            search_queries = await self._generate_queries(query)
-            logger.info(f"Step 1 completed: Generated {len(search_queries)} queries")
-            
-            # Step 2: Search for patents
-            logger.info("Step 2: Searching for patents...")
-            all_patents, query_results = await self._search_all_queries(search_queries)
-            logger.info(f"Step 2 completed: Found {len(all_patents)} total patents")
-            
-            # Step 3: Deduplicate and limit results
-            logger.info("Step 3: Deduplicating patents...")
-            unique_patents = self._deduplicate(all_patents)[:max_results]
-            logger.info(f"Step 3 completed: {len(unique_patents)} unique patents")
-            
-            # Step 4: Get claims for each patent
-            logger.info("Step 4: Fetching patent claims...")
-            patents_with_claims = await self._add_claims(unique_patents)
-            logger.info(f"Step 4 completed: Added claims to {len(patents_with_claims)} patents")
-            
-            # Step 5: Summarize claims using LLM
-            logger.info("Step 5: Summarizing patent claims...")
-            found_claims_summary = await self._summarize_claims(patents_with_claims)
-            logger.info(f"Step 5 completed: Generated claims summary of {len(found_claims_summary)} characters")
-            
-            # Step 6: Generate report
-            logger.info("Step 6: Generating report...")
-            report = await self._generate_report(query, query_results, patents_with_claims, found_claims_summary)
-            logger.info(f"Step 6 completed: Generated report of {len(report)} characters")
-            
-            search_result = {
-                "query": query,
-                "results_found": len(patents_with_claims),
-                "patents": patents_with_claims,
-                "report": report,
-                "search_summary": f"Found {len(patents_with_claims)} relevant patents using {len(search_queries)} search strategies",
-                "search_metadata": {
-                    "total_queries": len(search_queries),
-                    "total_patents_found": len(all_patents),
-                    "unique_patents": len(unique_patents)
+        with deadline_scope(budget_seconds):
+            try:
+                logger.info(f"Starting {mode} patent search for: {query}")
+                degraded: List[str] = []
+                
+                # Step 1: Generate search queries (or reuse the plan of an equivalent query)
+                logger.info("Step 1: Generating search queries...")
+                plan_cached = False
+                if fast:
+                    search_queries, skipped_results, compiler_summary = self._compile_queries(build_keyword_queries(query))
+                else:
+                    try:
+                        search_queries, skipped_results, compiler_summary, plan_cached = \
+                            await self._get_query_plan(query, refresh_plan)
+                    except ValueError as e:
+                        if remaining_time() is None:
+                            raise
+                        # Under a latency budget, keyword queries beat no answer
+                        logger.warning(f"Query generation failed within budget, using keyword queries: {e}")
+                        search_queries, skipped_results, compiler_summary = self._compile_queries(build_keyword_queries(query))
+                        degraded.append("keyword_queries")
+                logger.info(f"Step 1 completed: {'Reused' if plan_cached else 'Generated'} {len(search_queries)} queries "
+                            f"({compiler_summary['round_trips_saved']} PatentsView round trips saved by local validation)")
+                
+                # Count probes cost round trips, so fast mode fetches the queries as built
+                refinement_summary = None
+                if settings.patentsview_refine_queries and not fast:
+                    if has_time(MIN_SECONDS_FOR_REFINEMENT):
+                        logger.info("Step 1b: Refining queries with count probes...")
+                        search_queries, empty_results, refinement_summary = await self._refine_queries(query, search_queries)
+                        skipped_results.extend(empty_results)
+                        logger.info(f"Step 1b completed: {refinement_summary['in_band']}/{len(search_queries) + len(empty_results)} "
+                                    f"queries in target band after {refinement_summary['probes']} probes")
+                    else:
+                        degraded.append("query_refinement")
+                
+                # Steps 2-5: Search, deduplicate, fetch claims and summarize as overlapping stages
+                logger.info("Steps 2-5: Running search pipeline...")
+                patents_with_claims, query_results, found_claims_summary, pipeline_metadata = \
+                    await self._run_search_pipeline(query, search_queries, max_results,
+                                                    summarize=not fast, fetch_claims=not fast)
+                query_results.extend(skipped_results)
+                degraded.extend(pipeline_metadata["degraded"])
+                logger.info(f"Steps 2-5 completed: {len(patents_with_claims)} unique patents out of "
+                            f"{pipeline_metadata['total_patents_found']} found, claims summary of "
+                            f"{len(found_claims_summary)} characters")
+                
+                # Step 6: Generate report
+                logger.info("Step 6: Generating report...")
+                report, report_prompt = None, None
+                out_of_time = not has_time(MIN_SECONDS_FOR_LLM_REPORT)
+                if not fast and not out_of_time:
+                    try:
+                        report, report_prompt = await self._generate_report(query, query_results, patents_with_claims,
+                                                             found_claims_summary, on_token=on_token)
+                    except ValueError as e:
+                        if remaining_time() is None:
+                            raise
+                        # Only a deadline is the budget's fault; LLM errors and open circuits are not
+                        out_of_time = isinstance(e.__cause__, DeadlineExceededError) or \
+                            not has_time(MIN_SECONDS_FOR_LLM_REPORT)
+                        logger.warning(f"Report generation failed within budget, using templated report: {e}")
+                if report is None:
+                    notice = None
+                    if not fast and out_of_time:
+                        degraded.append("templated_report")
+                        notice = ("The latency budget ran out before AI analysis could complete; "
+                                  "showing a ranked summary of the search results.")
+                    elif not fast:
+                        degraded.append("llm_report")
+                        notice = ("AI analysis was unavailable for this search; "
+                                  "showing a ranked summary of the search results.")
+                    report = self._render_template_report(query, query_results, patents_with_claims, notice)
+                logger.info(f"Step 6 completed: Generated report of {len(report)} characters")
+                
+                if degraded:
+                    logger.warning(f"Patent search degraded: {', '.join(degraded)}")
+                
+                search_result = {
+                    "query": query,
+                    "results_found": len(patents_with_claims),
+                    "patents": patents_with_claims,
+                    "report": report,
+                    "search_summary": f"Found {len(patents_with_claims)} relevant patents using {len(search_queries)} search strategies",
+                    "search_metadata": {
+                        "mode": mode,
+                        "total_queries": len(search_queries),
+                        "total_patents_found": pipeline_metadata["total_patents_found"],
+                        "unique_patents": len(patents_with_claims),
+                        "search_mode": pipeline_metadata["search_mode"],
+                        "fused_search": pipeline_metadata["fused"],
+                        "fused_fallback": pipeline_metadata["fused_fallback"],
+                        "relevance_gate": pipeline_metadata["relevance_gate"],
+                        "families_collapsed": pipeline_metadata["families_collapsed"],
+                        "early_admitted": pipeline_metadata["early_admitted"],
+                        "report_prompt": report_prompt,
+                        "pipeline": pipeline_metadata["stages"],
+                        "query_plan_cached": plan_cached,
+                        "query_compiler": compiler_summary,
+                        "query_refinement": refinement_summary,
+                        "budget_seconds": budget_seconds,
+                        "degraded": degraded
+                    }
                 }
-            }
-            
-            return search_result, search_queries
+                
+                return search_result, search_queries
+                
+            except ValueError as e:
+                # Re-raise ValueError with specific error messages
+                logger.error(f"Patent search failed with specific error: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Patent search failed with unexpected error: {e}")
+                raise ValueError(f"Patent search failed: {str(e)}")
+    
+    async def _get_query_plan(self, query: str,
+                              refresh: bool = False) -> Tuple[List[Dict], List[Dict[str, Any]], Dict[str, Any], bool]:
+        """
+        Get the validated query set for a user query, memoized by its normalized form.
+        
+        Args:
+            query: User query
+            refresh: Skip the cached plan (and the LLM response cache) and regenerate it
             
-        except ValueError as e:
-            # Re-raise ValueError with specific error messages
-            logger.error(f"Patent search failed with specific error: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"Patent search failed with unexpected error: {e}")
-            raise ValueError(f"Patent search failed: {str(e)}")
+        Returns:
+            Tuple of (compiled_queries, rejected_query_results, compiler_summary, cached)
+        """
+        
+        plan_key = normalized_query_key(query)
+        if plan_key and not refresh:
+            plan = _plan_cache.get(plan_key)
+            if plan is not None:
+                logger.info(f"Query plan served from cache for key '{plan_key}'")
+                # Later steps annotate the queries, so each search gets its own copy
+                return (*copy.deepcopy(plan), True)
+        
+        remaining = remaining_time()
+        with deadline_scope(remaining * QUERY_GENERATION_BUDGET_SHARE if remaining is not None else None):
+            search_queries = await self._generate_queries(query, use_cache=not refresh)
+        plan = self._compile_queries(search_queries)
+        if plan_key:
+            _plan_cache.set(plan_key, copy.deepcopy(plan))
+        return (*plan, False)
     
-    async def _generate_queries(self, query: str) -> List[Dict[str, Any]]:
+    async def _generate_queries(self, query: str, use_cache: bool = True) -> List[Dict[str, Any]]:
         """Generate search queries using LLM with prompt template."""
         try:
             # Load the prompt template with parameters
@@ -121,11 +465,12 @@ class PatentSearchService:
                                         conversation_history="")
             logger.info(f"Prompt loaded successfully, length: {len(prompt)}")
             
-            response = self.llm_client.generate_text(
+            response = await self.llm_client.generate_text(
                 prompt=prompt,
                 system_message="You are a patent search expert. Think like a domain expert and analyze query specificity iteratively.",
                 max_tokens=2500,
-                temperature=0.3
+                temperature=0.3,
+                use_cache=use_cache
             )
             
             logger.info(f"LLM response: {response}")
@@ -162,91 +507,580 @@ class PatentSearchService:
             logger.error(f"LLM query generation failed: {e}")
             raise ValueError(f"Failed to generate search queries: {e}")
     
-    async def _search_all_queries(self, search_queries: List[Dict]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Execute all search queries and collect results."""
+    def _compile_queries(self, search_queries: List[Dict]) -> Tuple[List[Dict], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Validate and repair generated queries locally before dispatch.
         
-        all_patents = []
-        query_results = []
+        Queries that cannot be repaired are reported as failed query results
+        instead of being sent to PatentsView only to come back as a 400.
+        
+        Returns:
+            Tuple of (compiled_queries, rejected_query_results, compiler_summary)
+        """
+        
+        compiled_queries = []
+        rejected_results = []
+        repaired = 0
         
         for i, search_query in enumerate(search_queries):
             try:
-                query_data = search_query.get("search_query", {})
-                patents = await self._search_patents_api(query_data)
-                all_patents.extend(patents)
-                
-                # Track query results with counts
-                query_text = search_query.get("reasoning", f"Query {i+1}")
-                query_results.append({
-                    "query_text": query_text,
-                    "result_count": len(patents)
+                compiled = _query_compiler.compile(search_query.get("search_query", {}))
+            except QueryCompileError as e:
+                logger.warning(f"Query {i+1} rejected locally: {e}")
+                rejected_results.append({
+                    "query_text": f"Query {i+1} (rejected)",
+                    "result_count": 0,
+                    "error": f"Invalid PatentsView query: {e}"
+                })
+                continue
+            
+            if compiled.repairs:
+                logger.info(f"Query {i+1} repaired: {'; '.join(compiled.repairs)}")
+                search_query = {**search_query, "search_query": compiled.query, "repairs": compiled.repairs}
+            repaired += compiled.invalid
+            compiled_queries.append(search_query)
+        
+        if not compiled_queries:
+            raise ValueError("No valid search queries: every generated query was rejected by local validation")
+        
+        compiler_summary = {
+            "repaired": repaired,
+            "rejected": len(rejected_results),
+            "round_trips_saved": repaired + len(rejected_results)
+        }
+        return compiled_queries, rejected_results, compiler_summary
+    
+    async def _refine_queries(self, query: str,
+                              search_queries: List[Dict]) -> Tuple[List[Dict], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Steer each query into the target hit band with count-only probes.
+        
+        Each probe is a size-1 request for patent_id only that reads total_hits.
+        Queries outside the band are rewritten deterministically (see
+        refinement_moves) - narrowing adds terms from the user query - and a
+        rewrite is kept only if it lands closer to the band. Queries that still
+        match nothing are not fetched at all - unless that is every query, in
+        which case the queries are returned unrefined.
+        
+        Returns:
+            Tuple of (queries_to_fetch, empty_query_results, refinement_summary)
+        """
+        
+        low, high = settings.patentsview_target_hits_min, settings.patentsview_target_hits_max
+        extra_terms = content_terms(query)
+        
+        def distance(hits: int) -> float:
+            if low <= hits <= high:
+                return 0.0
+            bound = low if hits < low else high
+            return abs(math.log((hits + 1) / (bound + 1)))
+        
+        async def refine(search_query: Dict) -> Tuple[Dict, int]:
+            current = search_query.get("search_query", {})
+            hits = await self._probe_count(current)
+            probes, moves = 1, []
+            initial_hits = hits
+            
+            while distance(hits) > 0 and probes < settings.patentsview_refine_max_probes:
+                direction = "broaden" if hits < low else "narrow"
+                improved = False
+                for name, candidate in refinement_moves(current, direction, extra_terms):
+                    if probes >= settings.patentsview_refine_max_probes:
+                        break
+                    candidate_hits = await self._probe_count(candidate)
+                    probes += 1
+                    if distance(candidate_hits) < distance(hits):
+                        current, hits, improved = candidate, candidate_hits, True
+                        moves.append(name)
+                        break
+                if not improved:
+                    break
+            
+            refined = {**search_query, "search_query": current, "total_hits": hits}
+            if moves:
+                refined["refinement"] = {"initial_hits": initial_hits, "moves": moves}
+            return refined, probes
+        
+        executor = BoundedExecutor(settings.patentsview_max_concurrency)
+        results = await executor.map(refine, search_queries)
+        
+        refined_queries = []
+        empty_results = []
+        probes = 0
+        refined_count = 0
+        for i, (search_query, result) in enumerate(zip(search_queries, results)):
+            if isinstance(result, Exception):
+                # Probing is best effort - fetch the query as generated
+                logger.warning(f"Count probe for query {i+1} failed: {result}")
+                refined_queries.append(search_query)
+                continue
+            refined, query_probes = result
+            probes += query_probes
+            refined_count += "refinement" in refined
+            if refined["total_hits"] == 0:
+                logger.info(f"Query {i+1} matches no patents after refinement - skipping fetch")
+                empty_results.append({
+                    "query_text": refined.get("reasoning", f"Query {i+1}"),
+                    "result_count": 0
                 })
+                continue
+            refined_queries.append(refined)
+        
+        # Nothing to fetch is an empty result, not a failure: fall back to the
+        # queries as generated so the search still ends in a (sparse) report
+        unrefined_fallback = not refined_queries
+        if unrefined_fallback:
+            logger.warning("No query matches any patents after refinement - fetching the queries as generated")
+            refined_queries, empty_results = list(search_queries), []
+        
+        refinement_summary = {
+            "target_band": [low, high],
+            "probes": probes,
+            "refined": refined_count,
+            "in_band": sum(1 for q in refined_queries if low <= q.get("total_hits", -1) <= high),
+            "skipped_empty": len(empty_results),
+            "unrefined_fallback": unrefined_fallback
+        }
+        return refined_queries, empty_results, refinement_summary
+    
+    async def _probe_count(self, search_query: Dict) -> int:
+        """Get the total number of patents matching a query with a minimal size-1 request."""
+        
+        payload = {"q": search_query, "f": ["patent_id"], "o": {"size": 1}}
+        request_key = ("count", canonical_key(payload))
+        page = _search_cache.get(request_key) or _stale_while_circuit_open(request_key)
+        if page is None:
+            page = await self._shared_request_patents(request_key, payload)
+            _search_cache.set(request_key, page)
+        return page[1]
+    
+    async def _run_search_pipeline(self, query: str, search_queries: List[Dict], max_results: int = 20,
+                                   summarize: bool = True,
+                                   fetch_claims: bool = True) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str, Dict[str, Any]]:
+        """
+        Search, deduplicate and rank, fetch claims and summarize as connected stages.
+        
+        Unique candidates are pooled until PATENTSVIEW_RANK_CANDIDATES are in (at
+        which point the search stage stops requesting further pages) and ranked
+        locally by BM25 over title and abstract fused across the user query and
+        every sub-query. The ranking is refreshed after every page, and clear
+        high scorers - in the top half of ``max_results`` so far and covering at
+        least PATENTSVIEW_EARLY_ADMIT_SCORE of the query - go on to claims (and
+        their summaries start) while the search is still running. Once the
+        search ends, the rest of the top ``max_results`` follow. With all claims
+        in, the patents are re-ranked with the claims text and the top ones get
+        LLM claim summaries (reusing those already started), so that work goes
+        to the most relevant patents rather than the newest.
+        
+        With PATENTSVIEW_COLLAPSE_FAMILIES, near-duplicate patents (continuations,
+        divisionals) are folded into their highest-ranked member, by abstract
+        before claims are fetched and again by abstract + first claim after.
+        
+        With PATENTSVIEW_RELEVANCE_GATE, candidates whose title and abstract
+        barely cover the query are dropped before truncation, and weak ones
+        that are kept get stored claims only (no fetch, no summary).
+        
+        With PATENTSVIEW_FUSED_QUERIES the queries are sent as a single fused
+        _or request and each result is attributed to the sub-queries it matches
+        locally, keeping the per-query counts in query_results. If it fails, the
+        queries are sent separately instead; patents the fused pages had already
+        delivered are reported in fused_fallback rather than counted again in
+        total_patents_found.
+        
+        Claim summaries are skipped (and the summary is empty) when ``summarize`` is False,
+        and only stored claims are used (no g_claim requests) when ``fetch_claims`` is False.
+        Under a latency budget, summaries are skipped and only stored claims are
+        used once too little time is left; such stages are listed as degraded.
+        
+        Returns:
+            Tuple of (patents, query_results, found_claims_summary, pipeline_metadata)
+        """
+        
+        search_queue = StageQueue("search")
+        dedup_queue = StageQueue("dedup")
+        claims_queue = StageQueue("claims")
+        enough = asyncio.Event()
+        pool_size = max(max_results, settings.patentsview_rank_candidates)
+        sub_queries = [query_text(search_query.get("search_query", {})) for search_query in search_queries]
+        degraded: List[str] = []
+        total_found = 0
+        gate_stats: Optional[Dict[str, Any]] = None
+        early_ids: set = set()
+        folded_ids: set = set()
+        
+        fused_stats: Optional[Dict[str, Any]] = None
+        fused_fallback: Optional[Dict[str, Any]] = None
+        
+        def collapse_families(ranked: List[Dict], preferred: Collection[str] = ()) -> List[Dict]:
+            # Patents folded at both stages are counted once. A family with a member in
+            # ``preferred`` (already sent on) keeps that member as its representative.
+            heads_first = sorted(ranked, key=lambda patent: patent.get("patent_id") not in preferred)
+            representatives, _ = collapse_near_duplicates(heads_first, settings.patentsview_family_similarity)
+            kept_ids = {patent.get("patent_id") for patent in representatives}
+            folded_ids.update(patent.get("patent_id") for patent in ranked if patent.get("patent_id") not in kept_ids)
+            return [patent for patent in ranked if patent.get("patent_id") in kept_ids]
+        
+        async def search_fused() -> List[int]:
+            # One _or request for all sub-queries; results are attributed back locally
+            nonlocal fused_stats
+            sub_queries = [search_query.get("search_query", {}) for search_query in search_queries]
+            counts = [0] * len(sub_queries)
+            fused_stats = {"sub_queries": len(sub_queries), "pages": 0, "patents": 0, "unattributed": 0}
+            page_size = min(MAX_PAGE_SIZE, settings.patentsview_page_size * len(sub_queries))
+            async for page in self.iter_patent_pages(fuse_queries(sub_queries), page_size=page_size):
+                fused_stats["pages"] += 1
+                for patent in page:
+                    matched = [i for i, sub_query in enumerate(sub_queries) if matches_query(sub_query, patent)]
+                    if not matched:
+                        # Server-side text analysis matched something local stemming did not
+                        fused_stats["unattributed"] += 1
+                    for i in matched:
+                        counts[i] += 1
+                    fused_stats["patents"] += 1
+                    await search_queue.put(patent)
+                if enough.is_set():
+                    break
+            return counts
+        
+        async def search_stage() -> List[Any]:
+            nonlocal fused_stats, fused_fallback
+            
+            async def produce(search_query: Dict) -> int:
+                count = 0
+                if enough.is_set():
+                    return count
+                async for page in self.iter_patent_pages(search_query.get("search_query", {})):
+                    for patent in page:
+                        await search_queue.put(patent)
+                    count += len(page)
+                    if enough.is_set():
+                        break
+                return count
+            
+            try:
+                if settings.patentsview_fused_queries and len(search_queries) > 1:
+                    try:
+                        return await search_fused()
+                    except ValueError as e:
+                        logger.warning(f"Fused search failed, falling back to separate queries: {e}")
+                        # The separate queries fetch the fused pages' patents again, so those
+                        # are reported apart instead of being counted twice
+                        fused_fallback = {"pages": fused_stats["pages"], "patents": fused_stats["patents"],
+                                          "error": str(e)}
+                        fused_stats = None
+                executor = BoundedExecutor(settings.patentsview_max_concurrency)
+                return await executor.map(produce, search_queries)
+            finally:
+                await search_queue.close()
+        
+        async def dedup_stage():
+            nonlocal total_found, gate_stats
+            candidates: Dict[str, Dict] = {}
+            admitted: Dict[str, Dict] = {}
+            # Families of early admissions, so a near-duplicate on a later page is not sent on too
+            admitted_families = FamilyIndex(settings.patentsview_family_similarity)
+            early_limit = max(1, int(max_results * EARLY_ADMIT_SHARE)) if settings.patentsview_early_admit_score > 0 else 0
+            unranked = False
+            
+            async def admit(patent: Dict):
+                admitted[patent["patent_id"]] = patent
+                await dedup_queue.put(patent)
+            
+            try:
+                # Keep draining after the pool is full so total_found covers every fetched page
+                async for patent in search_queue:
+                    total_found += 1
+                    patent_id = patent.get("patent_id")
+                    if patent_id and patent_id not in candidates and len(candidates) < pool_size:
+                        candidates[patent_id] = patent
+                        unranked = True
+                        if len(candidates) >= pool_size:
+                            enough.set()
+                    if not unranked or not search_queue.empty() or len(admitted) >= early_limit:
+                        continue
+                    
+                    # A page has been drained: re-rank and send clear high scorers on now
+                    unranked = False
+                    ranked = rank_patents(query, list(candidates.values()), sub_queries, include_claims=False)
+                    for leader in ranked[:early_limit]:
+                        if len(admitted) >= early_limit:
+                            break
+                        if leader["patent_id"] in admitted or \
+                                lexical_score(query, leader) < settings.patentsview_early_admit_score:
+                            continue
+                        if settings.patentsview_collapse_families:
+                            if admitted_families.find(leader) is not None:
+                                continue
+                            admitted_families.add(leader)
+                        early_ids.add(leader["patent_id"])
+                        await admit(leader)
                 
-                logger.info(f"Query {i+1} returned {len(patents)} patents")
+                # Final ranking over the whole pool decides the remaining slots
+                ranked = rank_patents(query, list(candidates.values()), sub_queries, include_claims=False)
+                if settings.patentsview_collapse_families:
+                    # Family members would each cost a claim fetch and a summary slot
+                    ranked = collapse_families(ranked, preferred=admitted)
+                if settings.patentsview_relevance_gate:
+                    kept, dropped = relevance_gate(
+                        query, ranked,
+                        drop_below=settings.patentsview_gate_drop_score,
+                        defer_below=settings.patentsview_gate_defer_score,
+                        min_kept=min(max_results, settings.patentsview_gate_min_results)
+                    )
+                else:
+                    kept, dropped = ranked, []
+                for patent in [patent for patent in kept if patent["patent_id"] not in admitted][:max_results - len(admitted)]:
+                    await admit(patent)
                 
-            except Exception as e:
-                logger.warning(f"Query {i+1} failed: {e}")
+                if settings.patentsview_relevance_gate:
+                    fetched = sum(1 for patent in admitted.values() if not patent.get("claims_deferred"))
+                    gate_stats = {
+                        "candidates": len(ranked),
+                        "dropped": len(dropped),
+                        "deferred": len(admitted) - fetched,
+                        # Versus fetching claims for the top max_results without the gate
+                        "claim_fetches_avoided": max(0, min(len(ranked), max_results) - fetched)
+                    }
+                    logger.info(f"Relevance gate dropped {gate_stats['dropped']} and deferred "
+                                f"{gate_stats['deferred']} of {len(ranked)} candidates")
+                logger.info(f"Admitted {len(admitted)} of {len(candidates)} candidates "
+                            f"({len(early_ids)} before the search completed)")
+            finally:
+                await dedup_queue.close()
+        
+        async def claims_stage():
+            semaphore = asyncio.Semaphore(max(1, settings.patentsview_max_concurrency))
+            
+            async def attach_claims(batch: List[Dict]):
+                async with semaphore:
+                    # Low on budget: serve stored claims only instead of fetching more
+                    fetch_missing = fetch_claims and has_time(MIN_SECONDS_FOR_CLAIMS)
+                    if fetch_claims and not fetch_missing and "claims_fetch" not in degraded:
+                        degraded.append("claims_fetch")
+                    claims_by_patent = await self._fetch_claims_bulk(
+                        [patent.get("patent_id") for patent in batch if not patent.get("claims_deferred")],
+                        fetch_missing=fetch_missing
+                    )
+                    deferred = [patent.get("patent_id") for patent in batch if patent.get("claims_deferred")]
+                    if deferred:
+                        # Below the relevance gate: use stored claims, never fetch
+                        claims_by_patent.update(await self._fetch_claims_bulk(deferred, fetch_missing=False))
+                for patent in batch:
+                    patent_id = patent.get("patent_id")
+                    if patent_id not in claims_by_patent and not patent.get("claims_deferred"):
+                        logger.warning(f"Failed to fetch claims for {patent_id}")
+                    patent["claims"] = claims_by_patent.get(patent_id, [])
+                    await claims_queue.put(patent)
+            
+            tasks = []
+            try:
+                # Early admissions arrive a page at a time and the rest in one go, so each
+                # group is fetched in as few batches as possible
+                while True:
+                    batch = await dedup_queue.get_batch(max(1, settings.patentsview_claims_batch_size))
+                    if not batch:
+                        break
+                    tasks.append(asyncio.ensure_future(attach_claims(batch)))
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                await claims_queue.close()
+        
+        async def summary_stage() -> Tuple[List[Dict], str]:
+            patents: List[Dict] = []
+            started: Dict[str, "asyncio.Future[str]"] = {}
+            try:
+                async for patent in claims_queue:
+                    patents.append(patent)
+                    # Clear high scorers are summarized while the remaining claims are fetched
+                    if (summarize and patent.get("patent_id") in early_ids and patent.get("claims")
+                            and len(started) < SUMMARIZED_PATENTS and has_time(MIN_SECONDS_FOR_SUMMARIES)):
+                        started[patent["patent_id"]] = asyncio.ensure_future(self._summarize_patent_claims(patent, query))
+                
+                # Final order weighs the claims text too
+                patents = rank_patents(query, patents, sub_queries, include_claims=True)
+                if settings.patentsview_collapse_families:
+                    # First claims are known now, catching families whose abstracts were reworded
+                    patents = collapse_families(patents)
+                if not summarize or not patents:
+                    return patents, ""
+                
+                top_patents = [patent for patent in patents if not patent.get("claims_deferred")][:SUMMARIZED_PATENTS]
+                if not has_time(MIN_SECONDS_FOR_SUMMARIES):
+                    degraded.append("claim_summaries")
+                    # Summaries that already finished cost nothing more
+                    top_patents = [patent for patent in top_patents
+                                   if patent["patent_id"] in started and started[patent["patent_id"]].done()]
+                if not top_patents:
+                    return patents, ""
+                results = await asyncio.gather(
+                    *[started.pop(patent["patent_id"], None) or self._summarize_patent_claims(patent, query)
+                      for patent in top_patents],
+                    return_exceptions=True
+                )
+                return patents, self._combine_claim_summaries(top_patents, results, len(patents))
+            finally:
+                # Early summaries of patents that fell out of the top
+                for task in started.values():
+                    task.cancel()
+        
+        search_results, _, _, (patents, found_claims_summary) = await run_stages(
+            search_stage(), dedup_stage(), claims_stage(), summary_stage()
+        )
+        
+        query_results = []
+        for i, (search_query, result) in enumerate(zip(search_queries, search_results)):
+            if isinstance(result, Exception):
+                logger.warning(f"Query {i+1} failed: {result}")
                 query_results.append({
                     "query_text": f"Query {i+1} (failed)",
-                    "result_count": 0
+                    "result_count": 0,
+                    "error": str(result)
                 })
                 continue
+            
+            # Track query results with counts
+            reasoning = search_query.get("reasoning", f"Query {i+1}")
+            query_results.append({
+                "query_text": reasoning,
+                "result_count": result
+            })
+            
+            logger.info(f"Query {i+1} returned {result} patents")
         
-        return all_patents, query_results
+        pipeline_metadata = {
+            "total_patents_found": total_found - (fused_fallback["patents"] if fused_fallback else 0),
+            "search_mode": "fused" if fused_stats else "separate",
+            "degraded": degraded,
+            "fused": fused_stats,
+            "fused_fallback": fused_fallback,
+            "relevance_gate": gate_stats,
+            "families_collapsed": len(folded_ids),
+            "early_admitted": len(early_ids),
+            "stages": [queue.get_metrics() for queue in (search_queue, dedup_queue, claims_queue)]
+        }
+        return patents, query_results, found_claims_summary, pipeline_metadata
     
-    async def _search_patents_api(self, search_query: Dict) -> List[Dict[str, Any]]:
-        """Call PatentsView API to search patents."""
+    async def iter_patent_pages(self, search_query: Dict, page_size: Optional[int] = None,
+                                max_pages: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the results of a PatentsView query page by page.
         
-        url = f"{self.base_url}/patent/"
+        Pages are requested lazily with the ``after`` cursor, so consumers that
+        stop iterating early never fetch (or hold) the remaining pages.
+        
+        Args:
+            search_query: PatentsView query ("q" payload)
+            page_size: Patents per page (defaults to PATENTSVIEW_PAGE_SIZE)
+            max_pages: Maximum pages to fetch (defaults to PATENTSVIEW_MAX_PAGES_PER_QUERY)
+            
+        Yields:
+            Lists of patents in result order
+        """
+        page_size = page_size or settings.patentsview_page_size
+        max_pages = max_pages or settings.patentsview_max_pages_per_query
+        
+        after = None
+        for _ in range(max_pages):
+            patents, total_hits = await self._search_patents_page(search_query, page_size, after)
+            if patents:
+                yield patents
+            if len(patents) < page_size:
+                return
+            last = patents[-1]
+            after = [last.get("patent_date"), last.get("patent_id")]
+    
+    async def _search_patents_page(self, search_query: Dict, page_size: int,
+                                   after: Optional[List[Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch one page of PatentsView search results.
+        
+        Responses are cached by the canonical form of the full request payload,
+        and identical in-flight requests are shared. While the PatentsView
+        circuit is open, expired cache entries are served instead of failing.
+        
+        Returns:
+            Tuple of (patents, total_hits)
+        """
         
         payload = {
             "q": search_query,
             "f": ["patent_id", "patent_title", "patent_abstract", "patent_date", 
                   "inventors", "assignees", "cpc_current"],
-            "s": [{"patent_date": "desc"}],
-            "o": {"size": 10}  # Reduced from 20 to 10 for faster processing
+            # patent_id breaks date ties so the cursor is stable
+            "s": [{"patent_date": "desc"}, {"patent_id": "desc"}],
+            "o": {"size": page_size}
         }
+        if after is not None:
+            payload["o"]["after"] = after
+        
+        request_key = ("patent", canonical_key(payload))
+        page = _search_cache.get(request_key) or _stale_while_circuit_open(request_key)
+        if page is None:
+            page = await self._shared_request_patents(request_key, payload)
+            _search_cache.set(request_key, page)
+        else:
+            logger.info("PatentsView search served from cache")
+        
+        patents, total_hits = page
+        # Callers annotate patent dicts in place (e.g. claims), so each gets its own copies
+        return [dict(patent) for patent in patents], total_hits
+    
+    async def _shared_request_patents(self, request_key: Tuple, payload: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+        """Send a patent search request, sharing it with identical requests already in flight."""
+        try:
+            return await _patentsview_flights.do(request_key, lambda: self._request_patents(payload))
+        except DeadlineExceededError as e:
+            # This caller's deadline passed while the shared request was still running
+            raise ValueError(f"Deadline Exceeded: {e}")
+    
+    async def _request_patents(self, payload: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+        """Send a patent search request to the PatentsView API, returning (patents, total_hits)."""
         
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["X-Api-Key"] = self.api_key
+        url = f"{self.base_url}/patent/"
         
         logger.info(f"API call - URL: {url}")
         logger.info(f"API call - Payload: {payload}")
-        logger.info(f"API call - Headers: {headers}")
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                logger.info(f"API response status: {response.status_code}")
-                logger.info(f"API response text: {response.text[:500]}")
-                
-                # Handle specific HTTP status codes
-                if response.status_code == 400:
-                    raise ValueError(f"Bad Request: Invalid search query. API returned: {response.text}")
-                elif response.status_code == 401:
-                    raise ValueError(f"Unauthorized: Invalid API key. Please check your PatentsView API credentials.")
-                elif response.status_code == 403:
-                    raise ValueError(f"Forbidden: API access denied. Check your API key permissions.")
-                elif response.status_code == 429:
-                    raise ValueError(f"Rate Limited: Too many requests. Please wait before trying again.")
-                elif response.status_code == 500:
-                    raise ValueError(f"Server Error: PatentsView API is experiencing issues. Please try again later.")
-                elif response.status_code == 503:
-                    raise ValueError(f"Service Unavailable: PatentsView API is temporarily down. Please try again later.")
-                elif not response.is_success:
-                    raise ValueError(f"API Error {response.status_code}: {response.text}")
-                
-                data = response.json()
-                
-                # Handle API-specific errors
-                if data.get("error"):
-                    error_msg = data.get("error", "Unknown API error")
-                    if isinstance(error_msg, dict):
-                        error_msg = error_msg.get("message", str(error_msg))
-                    raise ValueError(f"PatentsView API Error: {error_msg}")
-                
-                return data.get("patents", [])
-                
+            response = await self._post(url, payload, timeout=60.0)
+            logger.info(f"API response status: {response.status_code}")
+            logger.info(f"API response text: {response.text[:500]}")
+            
+            # Handle specific HTTP status codes
+            if response.status_code == 400:
+                raise ValueError(f"Bad Request: Invalid search query. API returned: {response.text}")
+            elif response.status_code == 401:
+                raise ValueError(f"Unauthorized: Invalid API key. Please check your PatentsView API credentials.")
+            elif response.status_code == 403:
+                raise ValueError(f"Forbidden: API access denied. Check your API key permissions.")
+            elif response.status_code == 429:
+                raise ValueError(f"Rate Limited: Too many requests. Please wait before trying again.")
+            elif response.status_code == 500:
+                raise ValueError(f"Server Error: PatentsView API is experiencing issues. Please try again later.")
+            elif response.status_code == 503:
+                raise ValueError(f"Service Unavailable: PatentsView API is temporarily down. Please try again later.")
+            elif not response.is_success:
+                raise ValueError(f"API Error {response.status_code}: {response.text}")
+            
+            data = response.json()
+            
+            # Handle API-specific errors
+            if data.get("error"):
+                error_msg = data.get("error", "Unknown API error")
+                if isinstance(error_msg, dict):
+                    error_msg = error_msg.get("message", str(error_msg))
+                raise ValueError(f"PatentsView API Error: {error_msg}")
+            
+            patents = data.get("patents", []) or []
+            return patents, data.get("total_hits", len(patents))
+            
+        except DeadlineExceededError as e:
+            raise ValueError(f"Deadline Exceeded: {e}")
+        except CircuitOpenError as e:
+            raise ValueError(f"Service Unavailable: {e}")
         except httpx.TimeoutException:
             raise ValueError("Request Timeout: PatentsView API took too long to respond. Please try again.")
         except httpx.ConnectError:
@@ -258,88 +1092,31 @@ class PatentSearchService:
         except Exception as e:
             raise ValueError(f"Unexpected Error: {str(e)}")
     
-    def _deduplicate(self, patents: List[Dict]) -> List[Dict]:
-        """Remove duplicate patents by ID."""
-        
-        seen = set()
-        unique = []
+    async def _summarize_patent_claims(self, patent: Dict, query: Optional[str] = None) -> str:
+        """Summarize the claims of a single patent as a markdown section.
         
-        for patent in patents:
-            patent_id = patent.get("patent_id")
-            if patent_id and patent_id not in seen:
-                seen.add(patent_id)
-                unique.append(patent)
-        
-        return unique
-    
-    async def _add_claims(self, patents: List[Dict]) -> List[Dict]:
-        """Add claims data to each patent."""
-        
-        patents_with_claims = []
+        The claims sent are the ones most relevant to ``query``, packed into
+        CLAIM_SUMMARY_TOKEN_BUDGET tokens with the independent claims they depend on.
+        """
+        patent_id = patent.get("patent_id", "Unknown")
+        patent_title = patent.get("patent_title", "No title")
+        claims = patent.get("claims", [])
         
-        for patent in patents:
-            patent_id = patent.get("patent_id")
-            try:
-                claims = await self._fetch_claims(patent_id)
-                patent["claims"] = claims
-                patents_with_claims.append(patent)
-                
-            except Exception as e:
-                logger.warning(f"Failed to fetch claims for {patent_id}: {e}")
-                patent["claims"] = []
-                patents_with_claims.append(patent)
+        if not claims:
+            return f"**Patent {patent_id}: {patent_title}**\n- Claims: Not available\n"
         
-        return patents_with_claims
-    
-    async def _summarize_claims(self, patents: List[Dict]) -> str:
-        """Summarize claims for top patents using LLM with performance optimization."""
-        # Performance optimization: Only analyze top 5 most relevant patents
-        top_patents = patents[:5] if len(patents) > 5 else patents
+        selected_claims = select_claims(query, claims, settings.claim_summary_token_budget)
+        claims_text = [format_claim(claim) for claim in selected_claims]
         
-        claims_summaries = []
+        if not claims_text:
+            return f"**Patent {patent_id}: {patent_title}**\n- Claims: No valid claim text found\n"
         
-        # Process patents in parallel for better performance
-        import asyncio
+        focus = f"\nThe claims below are those of its {len(claims)} claims most relevant to: {query}\n" if query else ""
         
-        async def process_patent_claims(patent):
-            patent_id = patent.get("patent_id", "Unknown")
-            patent_title = patent.get("patent_title", "No title")
-            claims = patent.get("claims", [])
-            
-            if not claims:
-                return f"**Patent {patent_id}: {patent_title}**\n- Claims: Not available\n"
-            
-            # Prepare claims text for LLM analysis (limit to first 3 claims for performance)
-            claims_text = []
-            independent_claims = []
-            dependent_claims = []
-            
-            # Limit to first 3 claims to reduce token usage
-            limited_claims = claims[:3]
-            
-            for claim in limited_claims:
-                claim_number = claim.get("number", "")
-                claim_text = claim.get("text", "")
-                claim_type = claim.get("type", "unknown")
-                
-                if claim_text and claim_number and len(claim_text.strip()) > 10:
-                    # Truncate very long claims to reduce token usage
-                    truncated_text = claim_text[:500] + "..." if len(claim_text) > 500 else claim_text
-                    full_claim = f"Claim {claim_number} ({claim_type}): {truncated_text}"
-                    claims_text.append(full_claim)
-                    
-                    if claim_type == "independent":
-                        independent_claims.append(full_claim)
-                    else:
-                        dependent_claims.append(full_claim)
-            
-            if not claims_text:
-                return f"**Patent {patent_id}: {patent_title}**\n- Claims: No valid claim text found\n"
-            
-            # Simplified prompt for faster processing
-            claims_prompt = f"""
+        # Simplified prompt for faster processing
+        claims_prompt = f"""
 Analyze the patent claims for patent {patent_id} titled "{patent_title}".
-
+{focus}
 **CLAIMS TO ANALYZE:**
 {chr(10).join(claims_text)}
 
@@ -351,36 +1128,36 @@ Analyze the patent claims for patent {patent_id} titled "{patent_title}".
 
 Format as concise markdown.
 """
+        
+        try:
+            # Reduced token usage for faster processing
+            response = await self.llm_client.generate_text(
+                prompt=claims_prompt,
+                max_tokens=300,  # Further reduced from 600 to 300 for faster processing
+                temperature=0.3
+            )
             
-            try:
-                # Reduced token usage for faster processing
-                response = self.llm_client.generate_text(
-                    prompt=claims_prompt,
-                    max_tokens=300,  # Further reduced from 600 to 300 for faster processing
-                    temperature=0.3
-                )
-                
-                if response.get("success"):
-                    summary = response["text"]
-                    return f"**Patent {patent_id}: {patent_title}**\n{summary}\n"
-                else:
-                    # Fallback: basic claims listing
-                    return (f"**Patent {patent_id}: {patent_title}**\n" + 
-                           f"- Claims: {len(claims)} claims found\n" +
-                           f"- Independent Claims: {len([c for c in claims if c.get('type') == 'independent'])}\n" +
-                           f"- Dependent Claims: {len([c for c in claims if c.get('type') == 'dependent'])}\n")
-                    
-            except Exception as e:
-                logger.warning(f"Failed to summarize claims for patent {patent_id}: {e}")
+            if response.get("success"):
+                summary = response["text"]
+                return f"**Patent {patent_id}: {patent_title}**\n{summary}\n"
+            else:
                 # Fallback: basic claims listing
                 return (f"**Patent {patent_id}: {patent_title}**\n" + 
                        f"- Claims: {len(claims)} claims found\n" +
                        f"- Independent Claims: {len([c for c in claims if c.get('type') == 'independent'])}\n" +
                        f"- Dependent Claims: {len([c for c in claims if c.get('type') == 'dependent'])}\n")
-        
-        # Process patents in parallel
-        tasks = [process_patent_claims(patent) for patent in top_patents]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+                
+        except Exception as e:
+            logger.warning(f"Failed to summarize claims for patent {patent_id}: {e}")
+            # Fallback: basic claims listing
+            return (f"**Patent {patent_id}: {patent_title}**\n" + 
+                   f"- Claims: {len(claims)} claims found\n" +
+                   f"- Independent Claims: {len([c for c in claims if c.get('type') == 'independent'])}\n" +
+                   f"- Dependent Claims: {len([c for c in claims if c.get('type') == 'dependent'])}\n")
+    
+    def _combine_claim_summaries(self, top_patents: List[Dict], results: List[Any], total_patents: int) -> str:
+        """Combine per-patent claim summaries into one markdown string."""
+        claims_summaries = []
         
         # Handle results and exceptions
         for i, result in enumerate(results):
@@ -391,8 +1168,8 @@ Format as concise markdown.
                 claims_summaries.append(result)
         
         # Add summary for remaining patents if any
-        if len(patents) > 5:
-            remaining_count = len(patents) - 5
+        if total_patents > len(top_patents):
+            remaining_count = total_patents - len(top_patents)
             claims_summaries.append(f"**Additional Patents**: {remaining_count} more patents found with claims data (not analyzed for performance)\n")
         
         # Combine all summaries into a markdown string
@@ -401,129 +1178,192 @@ Format as concise markdown.
         logger.info(f"Generated claims summary for {len(top_patents)} patents (optimized for performance)")
         return found_claims_summary
     
-    async def _fetch_claims(self, patent_id: str) -> List[Dict]:
-        """Fetch claims for a specific patent."""
+    async def _fetch_claims_bulk(self, patent_ids: List[str], fetch_missing: bool = True) -> Dict[str, List[Dict]]:
+        """
+        Fetch claims for many patents with one g_claim query per batch of IDs.
+        
+        Batches run concurrently. Patents in a batch that failed are left out
+        of the result so callers can tell them apart from patents without claims.
+        
+        Args:
+            patent_ids: Patent IDs to fetch claims for
+            fetch_missing: Request claims missing from the local store (False serves stored claims only)
+            
+        Returns:
+            Mapping of patent_id to its parsed claims
+        """
+        ids = list(dict.fromkeys(patent_id for patent_id in patent_ids if patent_id))
+        if fetch_missing and _patentsview_breaker.is_open:
+            logger.warning("PatentsView circuit open - serving stored claims only")
+            fetch_missing = False
+        
+        # Granted claims never change - serve whatever we already have locally
+        stored = await self.claims_store.get_many(ids) if self.claims_store else {}
+        missing = [patent_id for patent_id in ids if patent_id not in stored] if fetch_missing else []
+        
+        batch_size = max(1, settings.patentsview_claims_batch_size)
+        batches = [tuple(missing[i:i + batch_size]) for i in range(0, len(missing), batch_size)]
+        
+        executor = BoundedExecutor(settings.patentsview_max_concurrency)
+        results = await executor.map(
+            lambda batch: _patentsview_flights.do(("g_claim", batch), lambda: self._request_claims_batch(batch)),
+            batches
+        )
+        
+        fetched = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to fetch claims for batch of {len(batch)} patents: {result}")
+                continue
+            for patent_id in batch:
+                fetched[patent_id] = list(result.get(patent_id, []))
+        
+        if self.claims_store and fetched:
+            await self.claims_store.put_many(fetched)
+        
+        claims_by_patent = {**stored, **fetched}
+        logger.info(f"Claims available for {len(claims_by_patent)}/{len(ids)} patents "
+                    f"({len(stored)} from local store, {len(batches)} batched requests)")
+        return claims_by_patent
+    
+    async def _request_claims_batch(self, patent_ids: Tuple[str, ...]) -> Dict[str, List[Dict]]:
+        """Page through the claims of a batch of patents and demultiplex them by patent_id."""
         
         url = f"{self.base_url}/g_claim/"
+        if len(patent_ids) == 1:
+            query = {"patent_id": patent_ids[0]}
+        else:
+            query = {"_or": [{"patent_id": patent_id} for patent_id in patent_ids]}
+        page_size = settings.patentsview_claims_page_size
         
-        payload = {
-            "q": {"patent_id": patent_id},
-            "f": ["claim_sequence", "claim_text", "claim_number", "claim_dependent"],
-            "o": {"size": 100},  # Increased from 50 to 100 for more claims
-            "s": [{"claim_sequence": "asc"}]
+        raw_claims: Dict[str, List[Dict]] = {patent_id: [] for patent_id in patent_ids}
+        after = None
+        for _ in range(MAX_CLAIMS_PAGES_PER_BATCH):
+            payload = {
+                "q": query,
+                "f": ["patent_id", "claim_sequence", "claim_text", "claim_number", "claim_dependent"],
+                "o": {"size": page_size},
+                "s": [{"patent_id": "asc"}, {"claim_sequence": "asc"}]
+            }
+            if after is not None:
+                payload["o"]["after"] = after
+            
+            claims_data = await self._request_claims_page(url, payload, patent_ids)
+            cursor = [claims_data[-1].get("patent_id"), claims_data[-1].get("claim_sequence")] if claims_data else None
+            if after is not None and cursor == after:
+                # The same page again - stop before counting its claims twice
+                logger.warning(f"Claims cursor for batch of {len(patent_ids)} patents did not advance - stopping")
+                break
+            for claim in claims_data:
+                raw_claims.setdefault(claim.get("patent_id"), []).append(claim)
+            
+            if len(claims_data) < page_size:
+                break
+            after = cursor
+        else:
+            logger.warning(f"Claims for batch of {len(patent_ids)} patents exceed {MAX_CLAIMS_PAGES_PER_BATCH} pages - "
+                           "keeping the claims fetched so far")
+        
+        return {
+            patent_id: self._parse_claims(patent_id, raw_claims.get(patent_id, []))
+            for patent_id in patent_ids
         }
+    
+    async def _request_claims_page(self, url: str, payload: Dict[str, Any],
+                                   patent_ids: Tuple[str, ...]) -> List[Dict]:
+        """Send one page request to the PatentsView claims API."""
         
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["X-Api-Key"] = self.api_key
+        label = f"'{patent_ids[0]}'" if len(patent_ids) == 1 else f"batch of {len(patent_ids)} patents"
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                
-                # Handle specific HTTP status codes
-                if response.status_code == 400:
-                    raise ValueError(f"Bad Request: Invalid patent ID '{patent_id}'. API returned: {response.text}")
-                elif response.status_code == 401:
-                    raise ValueError(f"Unauthorized: Invalid API key for claims API. Please check your PatentsView API credentials.")
-                elif response.status_code == 403:
-                    raise ValueError(f"Forbidden: API access denied for claims. Check your API key permissions.")
-                elif response.status_code == 404:
-                    raise ValueError(f"Not Found: No claims found for patent ID '{patent_id}'.")
-                elif response.status_code == 429:
-                    raise ValueError(f"Rate Limited: Too many claims requests. Please wait before trying again.")
-                elif response.status_code == 500:
-                    raise ValueError(f"Server Error: PatentsView claims API is experiencing issues. Please try again later.")
-                elif response.status_code == 503:
-                    raise ValueError(f"Service Unavailable: PatentsView claims API is temporarily down. Please try again later.")
-                elif not response.is_success:
-                    raise ValueError(f"Claims API Error {response.status_code}: {response.text}")
-                
-                data = response.json()
-                
-                # Handle API-specific errors
-                if data.get("error"):
-                    error_msg = data.get("error", "Unknown API error")
-                    if isinstance(error_msg, dict):
-                        error_msg = error_msg.get("message", str(error_msg))
-                    raise ValueError(f"PatentsView Claims API Error: {error_msg}")
-                
-                claims_data = data.get("g_claims", [])
-                
-                if not claims_data:
-                    logger.warning(f"No claims data found for patent {patent_id}")
-                    return []
-                
-                # Parse claims into simple format with validation
-                claims = []
-                for claim in claims_data:
-                    claim_text = claim.get("claim_text", "")
-                    claim_number = claim.get("claim_number", "")
-                    
-                    # Validate that we have meaningful claim text
-                    if not claim_text or len(claim_text.strip()) < 10:
-                        logger.warning(f"Invalid or truncated claim text for patent {patent_id}, claim {claim_number}")
-                        continue
-                    
-                    claims.append({
-                        "number": claim_number,
-                        "text": claim_text.strip(),  # Ensure clean text
-                        "type": "dependent" if claim.get("claim_dependent") else "independent",
-                        "sequence": claim.get("claim_sequence", 0)
-                    })
-                
-                logger.info(f"Successfully fetched {len(claims)} claims for patent {patent_id}")
-                return claims
-                
+            response = await self._post(url, payload, timeout=30.0)
+            
+            # Handle specific HTTP status codes
+            if response.status_code == 400:
+                raise ValueError(f"Bad Request: Invalid patent ID in {label}. API returned: {response.text}")
+            elif response.status_code == 401:
+                raise ValueError(f"Unauthorized: Invalid API key for claims API. Please check your PatentsView API credentials.")
+            elif response.status_code == 403:
+                raise ValueError(f"Forbidden: API access denied for claims. Check your API key permissions.")
+            elif response.status_code == 404:
+                raise ValueError(f"Not Found: No claims found for {label}.")
+            elif response.status_code == 429:
+                raise ValueError(f"Rate Limited: Too many claims requests. Please wait before trying again.")
+            elif response.status_code == 500:
+                raise ValueError(f"Server Error: PatentsView claims API is experiencing issues. Please try again later.")
+            elif response.status_code == 503:
+                raise ValueError(f"Service Unavailable: PatentsView claims API is temporarily down. Please try again later.")
+            elif not response.is_success:
+                raise ValueError(f"Claims API Error {response.status_code}: {response.text}")
+            
+            data = response.json()
+            
+            # Handle API-specific errors
+            if data.get("error"):
+                error_msg = data.get("error", "Unknown API error")
+                if isinstance(error_msg, dict):
+                    error_msg = error_msg.get("message", str(error_msg))
+                raise ValueError(f"PatentsView Claims API Error: {error_msg}")
+            
+            return data.get("g_claims", []) or []
+            
+        except DeadlineExceededError as e:
+            raise ValueError(f"Deadline Exceeded fetching claims for {label}: {e}")
+        except CircuitOpenError as e:
+            raise ValueError(f"Service Unavailable fetching claims for {label}: {e}")
         except httpx.TimeoutException:
-            raise ValueError(f"Request Timeout: Claims API took too long to respond for patent '{patent_id}'. Please try again.")
+            raise ValueError(f"Request Timeout: Claims API took too long to respond for {label}. Please try again.")
         except httpx.ConnectError:
-            raise ValueError(f"Connection Error: Cannot connect to PatentsView claims API for patent '{patent_id}'. Please check your internet connection.")
+            raise ValueError(f"Connection Error: Cannot connect to PatentsView claims API for {label}. Please check your internet connection.")
         except httpx.HTTPError as e:
-            raise ValueError(f"HTTP Error for patent '{patent_id}': {str(e)}")
+            raise ValueError(f"HTTP Error for {label}: {str(e)}")
         except json.JSONDecodeError:
-            raise ValueError(f"Invalid Response: PatentsView claims API returned invalid JSON for patent '{patent_id}'. Please try again.")
+            raise ValueError(f"Invalid Response: PatentsView claims API returned invalid JSON for {label}. Please try again.")
+        except ValueError:
+            raise
         except Exception as e:
-            raise ValueError(f"Unexpected Error fetching claims for patent '{patent_id}': {str(e)}")
+            raise ValueError(f"Unexpected Error fetching claims for {label}: {str(e)}")
     
-    async def _generate_report(self, query: str, query_results: List[Dict], 
-                             patents: List[Dict], found_claims_summary: str = "") -> str:
-        """Generate markdown report using LLM with prompt template."""
-        
-        # Prepare data for report with enhanced metadata
-        patent_summaries = []
-        for i, patent in enumerate(patents):
-            # Extract claims text for analysis
-            claims_text = []
-            for claim in patent.get("claims", []):
-                claim_text = claim.get("text", "")  # Fixed: was "claim_text"
-                claim_number = claim.get("number", "")  # Fixed: was "claim_number"
-                if claim_text and claim_number:
-                    claims_text.append(f"Claim {claim_number}: {claim_text}")
-            
-            # Extract classification codes
-            cpc_codes = patent.get("cpc_current", [])
-            
-            # Determine if this patent gets detailed analysis (top 3)
-            is_top_patent = i < 3
-            
-            # Create patent summary for Innovation Summary
-            patent_summary = {
-                "id": patent.get("patent_id", "Unknown"),
-                "title": patent.get("patent_title", "No title"),
-                "date": patent.get("patent_date", "Unknown"),
-                "abstract": patent.get("patent_abstract", "No abstract"),
-                "claims_count": len(patent.get("claims", [])),
-                "claims_text": claims_text,
-                "inventor": self._extract_inventor(patent.get("inventors", [])),
-                "assignee": self._extract_assignee(patent.get("assignees", [])),
-                "cpc_codes": cpc_codes,
-                "is_top_patent": is_top_patent,
-                "rank": i + 1
-            }
+    def _parse_claims(self, patent_id: str, claims_data: List[Dict]) -> List[Dict]:
+        """Parse raw g_claim records into simple claim dicts with validation."""
+        
+        if not claims_data:
+            logger.warning(f"No claims data found for patent {patent_id}")
+            return []
+        
+        claims = []
+        for claim in claims_data:
+            claim_text = claim.get("claim_text", "")
+            claim_number = claim.get("claim_number", "")
             
-            patent_summaries.append(patent_summary)
+            # Validate that we have meaningful claim text
+            if not claim_text or len(claim_text.strip()) < 10:
+                logger.warning(f"Invalid or truncated claim text for patent {patent_id}, claim {claim_number}")
+                continue
+            
+            claims.append({
+                "number": claim_number,
+                "text": claim_text.strip(),  # Ensure clean text
+                "type": "dependent" if claim.get("claim_dependent") else "independent",
+                "sequence": claim.get("claim_sequence", 0)
+            })
         
+        logger.info(f"Successfully fetched {len(claims)} claims for patent {patent_id}")
+        return claims
+    
+    async def _generate_report(self, query: str, query_results: List[Dict], 
+                             patents: List[Dict], found_claims_summary: str = "",
+                             on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> Tuple[str, Dict[str, Any]]:
+        """Generate markdown report using LLM with prompt template.
+        
+        The patents are packed into the REPORT_PROMPT_TOKEN_BUDGET input tokens
+        left after the system prompt, template, search queries and claims
+        summary, with priority by rank.
+        
+        Returns:
+            Tuple of (report, prompt_stats) with the token budget, the prompt's
+            actual token count and how many patents were detailed, listed or omitted
+        """
         try:
             # Load the system prompt template
             system_prompt = load_prompt_template("prior_art_search_system")
@@ -534,47 +1374,117 @@ Format as concise markdown.
                 query_info.append(f"  - {result['query_text']} → {result['result_count']} patents")
             query_summary = "\n".join(query_info)
             
-            # Prepare claims summary for the prompt
-            claims_context = f"\n\n**Detailed Claims Analysis:**\n{found_claims_summary}" if found_claims_summary else ""
+            # Prepare claims summary for the prompt; it may take at most a quarter of the budget
+            token_budget = settings.report_prompt_token_budget
+            claims_summary = truncate_to_tokens(found_claims_summary, token_budget // 4)
+            claims_context = f"\n\n**Detailed Claims Analysis:**\n{claims_summary}" if claims_summary else ""
             
-            # Load the user prompt template with parameters
-            user_prompt = load_prompt_template("prior_art_search_comprehensive",
-                                              user_query=query,
-                                              conversation_context=f"Search Queries Used (with result counts):\n{query_summary}\n\nPatents Found:\n{json.dumps(patent_summaries, indent=2)}{claims_context}",
-                                              document_reference="Patent Search Results")
+            def render(patents_text: str) -> str:
+                return load_prompt_template("prior_art_search_comprehensive",
+                                            user_query=query,
+                                            conversation_context=f"Search Queries Used (with result counts):\n{query_summary}\n\nPatents Found ({len(patents)}, by relevance):\n{patents_text}{claims_context}",
+                                            document_reference="Patent Search Results")
             
-            response = self.llm_client.generate_text(
+            # Pack the patents into whatever the fixed parts of the prompt leave over
+            fixed_tokens = count_chat_tokens(render(""), system_prompt)
+            patents_text, pack_stats = pack_patents(query, patents, token_budget - fixed_tokens)
+            user_prompt = render(patents_text)
+            prompt_stats = {
+                "token_budget": token_budget,
+                "prompt_tokens": count_chat_tokens(user_prompt, system_prompt),
+                **pack_stats
+            }
+            logger.info(f"Report prompt: {prompt_stats['prompt_tokens']}/{token_budget} tokens, "
+                        f"{pack_stats['patents_listed']}/{len(patents)} patents listed, "
+                        f"{pack_stats['patents_detailed']} with claims")
+            
+            response = await self.llm_client.generate_text(
                 prompt=user_prompt,
                 system_message=system_prompt,
                 max_tokens=4000,  # Increased back to 4000 with 300s timeout
-                temperature=0.3
+                temperature=0.3,
+                on_token=on_token
             )
             
             if response.get("success"):
-                return response["text"]
+                return response["text"], prompt_stats
             else:
                 raise Exception(f"LLM failed: {response.get('error')}")
                 
         except Exception as e:
             logger.error(f"Report generation failed: {e}")
-            raise ValueError(f"Failed to generate report: {e}")
+            raise ValueError(f"Failed to generate report: {e}") from e
+    
+    def _render_template_report(self, query: str, query_results: List[Dict], patents: List[Dict],
+                                notice: Optional[str] = None) -> str:
+        """Render a markdown report from the search results without an LLM."""
+        
+        lines = [
+            "# Prior Art Search Report",
+            "",
+            f"**Query**: {query}",
+            f"**Date**: {self._get_current_date()}",
+            f"**Patents Found**: {len(patents)}",
+            ""
+        ]
+        if notice:
+            lines += [f"> {notice}", ""]
+        
+        lines += ["## Search Strategy and Results", ""]
+        for result in query_results:
+            line = f"- {result['query_text']} → {result['result_count']} patents"
+            if result.get("error"):
+                line += f" ({result['error']})"
+            lines.append(line)
+        
+        if not patents:
+            lines += ["", "No matching patents were found. Try broader or alternative terms."]
+            return "\n".join(lines)
+        
+        lines += ["", "## Results", "", "| Rank | Patent | Title | Date | Assignee | Relevance |",
+                  "|---|---|---|---|---|---|"]
+        for i, patent in enumerate(patents, 1):
+            title = (patent.get("patent_title") or "No title").replace("|", "/")
+            assignee = self._extract_assignee(patent.get("assignees", [])).replace("|", "/")
+            score = patent.get("relevance_score")
+            lines.append(f"| {i} | {patent.get('patent_id', 'Unknown')} | {title} | "
+                         f"{patent.get('patent_date', 'Unknown')} | {assignee} | "
+                         f"{f'{score:.2f}' if score is not None else '-'} |")
+        
+        lines += ["", "## Top Patents", ""]
+        for patent in patents[:SUMMARIZED_PATENTS]:
+            abstract = patent.get("patent_abstract") or "No abstract"
+            if len(abstract) > 600:
+                abstract = abstract[:600] + "..."
+            lines += [
+                f"### Patent {patent.get('patent_id', 'Unknown')}: {patent.get('patent_title', 'No title')}",
+                f"- **Inventor**: {self._extract_inventor(patent.get('inventors', []))}",
+                f"- **Assignee**: {self._extract_assignee(patent.get('assignees', []))}",
+                f"- **Date**: {patent.get('patent_date', 'Unknown')}",
+                f"- **Abstract**: {abstract}"
+            ]
+            if patent.get("sibling_ids"):
+                lines.append(f"- **Same family**: {', '.join(patent['sibling_ids'])}")
+            claims = patent.get("claims", [])
+            independent = next((claim for claim in claims if claim.get("type") == "independent"), None)
+            if independent:
+                text = independent.get("text", "")
+                if len(text) > 600:
+                    text = text[:600] + "..."
+                lines.append(f"- **Claim {independent.get('number', '')}** ({len(claims)} claims total): {text}")
+            lines.append("")
+        
+        lines.append("*Generated from search results without AI analysis. "
+                     "Run a deep search for claim analysis, risk assessment and recommendations.*")
+        return "\n".join(lines)
     
     def _extract_inventor(self, inventors: List[Dict]) -> str:
         """Extract first inventor name."""
-        if not inventors:
-            return "Unknown"
-        
-        first = inventors[0]
-        first_name = first.get("inventor_name_first", "")
-        last_name = first.get("inventor_name_last", "")
-        return f"{first_name} {last_name}".strip() or "Unknown"
+        return inventor_name(inventors)
     
     def _extract_assignee(self, assignees: List[Dict]) -> str:
         """Extract first assignee organization."""
-        if not assignees:
-            return "Unknown"
-        
-        return assignees[0].get("assignee_organization", "Unknown")
+        return assignee_name(assignees)
     
     def _get_current_date(self) -> str:
         """Get current date string."""
@@ -0,0 +1,661 @@
+"""
+PatentsView Query Utilities
+
+Helpers for working with the PatentsView query DSL
+(https://search.patentsview.org/docs/docs/Search%20API/SearchAPIReference):
+canonicalization for cache keys, a schema-aware compiler that validates,
+normalizes and repairs LLM-generated queries before they are sent, a local
+evaluator used to attribute results of fused queries to their sub-queries, and
+deterministic rewrites that broaden or narrow a query.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.text import content_terms, extract_key_phrases, stem_tokens
+
+# Largest page size the search endpoints accept
+MAX_PAGE_SIZE = 1000
+
+# Logical operators whose operands are order-independent
+COMMUTATIVE_OPERATORS = {"_and", "_or"}
+
+# Full-text operators (matching is case-insensitive on the PatentsView side)
+TEXT_OPERATORS = {"_text_any", "_text_all", "_text_phrase"}
+
+# Operators combining sub-queries
+LOGICAL_OPERATORS = {"_and", "_or"}
+
+# Comparison operators
+RANGE_OPERATORS = {"_gt", "_gte", "_lt", "_lte"}
+
+# Field types
+TEXT = "text"
+STRING = "string"
+DATE = "date"
+NUMBER = "number"
+
+# Queryable fields per endpoint
+ENDPOINT_FIELDS: Dict[str, Dict[str, str]] = {
+    "patent": {
+        "patent_id": STRING,
+        "patent_title": TEXT,
+        "patent_abstract": TEXT,
+        "patent_date": DATE,
+        "patent_year": NUMBER,
+        "patent_type": STRING,
+        "patent_earliest_application_date": DATE,
+        "patent_num_times_cited_by_us_patents": NUMBER,
+        "assignees.assignee_organization": STRING,
+        "assignees.assignee_country": STRING,
+        "inventors.inventor_name_first": STRING,
+        "inventors.inventor_name_last": STRING,
+        "inventors.inventor_country": STRING,
+        "cpc_current.cpc_section_id": STRING,
+        "cpc_current.cpc_class_id": STRING,
+        "cpc_current.cpc_subclass_id": STRING,
+        "cpc_current.cpc_group_id": STRING
+    },
+    "g_claim": {
+        "patent_id": STRING,
+        "claim_sequence": NUMBER,
+        "claim_number": STRING,
+        "claim_text": TEXT,
+        "claim_dependent": STRING,
+        "exemplary": STRING
+    }
+}
+
+# Field types each field operator accepts
+OPERATOR_FIELD_TYPES = {
+    "_text_any": {TEXT},
+    "_text_all": {TEXT},
+    "_text_phrase": {TEXT},
+    "_contains": {STRING},
+    "_begins": {STRING},
+    "_eq": {STRING, DATE, NUMBER},
+    "_neq": {STRING, DATE, NUMBER},
+    "_gt": {STRING, DATE, NUMBER},
+    "_gte": {STRING, DATE, NUMBER},
+    "_lt": {STRING, DATE, NUMBER},
+    "_lte": {STRING, DATE, NUMBER}
+}
+
+# Misspelled or legacy operators and their PatentsView equivalents
+OPERATOR_ALIASES = {
+    "_text_and": "_text_all",
+    "_text_or": "_text_any",
+    "_text_exact": "_text_phrase",
+    "_phrase": "_text_phrase",
+    "_ge": "_gte",
+    "_le": "_lte",
+    "_ne": "_neq",
+    "_starts_with": "_begins"
+}
+
+# Replacement operator when an operator is used on a field type it does not support
+OPERATOR_REPAIRS = {
+    ("_contains", TEXT): "_text_all",
+    ("_eq", TEXT): "_text_phrase",
+    ("_begins", TEXT): "_text_phrase",
+    ("_text_any", STRING): "_contains",
+    ("_text_all", STRING): "_contains",
+    ("_text_phrase", STRING): "_contains"
+}
+
+# Legacy (pre-v1) and shorthand field names
+FIELD_ALIASES = {
+    "title": "patent_title",
+    "abstract": "patent_abstract",
+    "date": "patent_date",
+    "year": "patent_year",
+    "patent_number": "patent_id",
+    "assignee_organization": "assignees.assignee_organization",
+    "assignee_country": "assignees.assignee_country",
+    "inventor_first_name": "inventors.inventor_name_first",
+    "inventor_last_name": "inventors.inventor_name_last",
+    "inventor_name_first": "inventors.inventor_name_first",
+    "inventor_name_last": "inventors.inventor_name_last",
+    "cpc_section_id": "cpc_current.cpc_section_id",
+    "cpc_subclass_id": "cpc_current.cpc_subclass_id",
+    "cpc_group_id": "cpc_current.cpc_group_id",
+    "text": "claim_text"
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_FULL_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_YEAR_MONTH = re.compile(r"^(\d{4})-(\d{2})$")
+_YEAR = re.compile(r"^\d{4}$")
+
+
+def canonicalize_query(value: Any, _text: bool = False) -> Any:
+    """
+    Normalize a query (or full request payload) into a canonical form.
+
+    Dict keys are ordered, operands of _and/_or are sorted, and full-text
+    search strings are case-folded with collapsed whitespace, so semantically
+    equivalent LLM-generated queries compare equal.
+
+    Args:
+        value: Query fragment to normalize
+
+    Returns:
+        The canonical equivalent of ``value``
+    """
+    if isinstance(value, dict):
+        canonical = {}
+        for key in sorted(value):
+            item = value[key]
+            if key in COMMUTATIVE_OPERATORS and isinstance(item, list):
+                operands = [canonicalize_query(operand) for operand in item]
+                canonical[key] = sorted(operands, key=lambda operand: json.dumps(operand, sort_keys=True))
+            else:
+                canonical[key] = canonicalize_query(item, _text=_text or key in TEXT_OPERATORS)
+        return canonical
+    if isinstance(value, list):
+        return [canonicalize_query(item, _text=_text) for item in value]
+    if _text and isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip().lower()
+    return value
+
+
+def canonical_key(payload: Dict[str, Any]) -> str:
+    """Serialize a request payload canonically for use as a cache key."""
+    return json.dumps(canonicalize_query(payload), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class QueryCompileError(ValueError):
+    """Raised when a query cannot be repaired into a valid PatentsView query."""
+    pass
+
+
+class CompiledQuery:
+    """A validated PatentsView query and the repairs applied to produce it."""
+
+    def __init__(self, query: Dict[str, Any], repairs: List[str], invalid: bool):
+        self.query = query
+        self.repairs = repairs
+        # True when the original query would have been rejected by PatentsView
+        self.invalid = invalid
+
+
+def compile_query(query: Any, endpoint: str = "patent") -> CompiledQuery:
+    """
+    Validate, normalize and repair a query for a PatentsView endpoint.
+
+    Repairs include replacing legacy operators and field names, wrapping bare
+    full-text criteria in _text_all, coercing dates and numbers, dropping
+    invalid operands of _and/_or and unwrapping single-operand groups.
+
+    Args:
+        query: The "q" query object
+        endpoint: PatentsView endpoint the query is sent to
+
+    Returns:
+        The compiled query
+
+    Raises:
+        QueryCompileError: If the query cannot be repaired
+    """
+    if endpoint not in ENDPOINT_FIELDS:
+        raise QueryCompileError(f"Unknown PatentsView endpoint: {endpoint}")
+    compiler = _QueryCompiler(endpoint)
+    compiled = compiler.node(query, "q")
+    return CompiledQuery(compiled, compiler.repairs, compiler.invalid)
+
+
+class QueryCompiler:
+    """Compiles queries and counts the PatentsView round trips it saved."""
+
+    def __init__(self, endpoint: str = "patent"):
+        self.endpoint = endpoint
+
+        # Statistics
+        self.compiled = 0
+        self.normalized = 0
+        self.repaired = 0
+        self.rejected = 0
+
+    def compile(self, query: Any) -> CompiledQuery:
+        """Compile a query (see compile_query), recording the outcome."""
+        try:
+            result = compile_query(query, self.endpoint)
+        except QueryCompileError:
+            self.rejected += 1
+            raise
+        self.compiled += 1
+        if result.invalid:
+            self.repaired += 1
+        elif result.repairs:
+            self.normalized += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get compiler statistics."""
+        return {
+            "compiled": self.compiled,
+            "normalized": self.normalized,
+            "repaired": self.repaired,
+            "rejected": self.rejected,
+            # Each repaired or rejected query would otherwise have been a 400
+            "round_trips_saved": self.repaired + self.rejected
+        }
+
+
+class _QueryCompiler:
+    """Recursive compiler state for a single query."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.fields = ENDPOINT_FIELDS[endpoint]
+        self.repairs: List[str] = []
+        self.invalid = False
+
+    def repair(self, message: str, invalid: bool = True):
+        """Record a repair; ``invalid`` marks it as fixing a query PatentsView would reject."""
+        self.repairs.append(message)
+        self.invalid = self.invalid or invalid
+
+    def node(self, node: Any, path: str) -> Dict[str, Any]:
+        """Compile any query object."""
+        if not isinstance(node, dict) or not node:
+            raise QueryCompileError(f"{path}: expected a non-empty object, got {json.dumps(node)}")
+
+        if len(node) > 1:
+            self.repair(f"{path}: split object with {len(node)} criteria into _and", invalid=False)
+            return self.node({"_and": [{key: value} for key, value in node.items()]}, path)
+
+        key, value = next(iter(node.items()))
+        if key in LOGICAL_OPERATORS:
+            return self.logical(key, value, path)
+        if key == "_not":
+            return {"_not": self.node(value, f"{path}._not")}
+
+        operator = OPERATOR_ALIASES.get(key, key)
+        if operator != key:
+            self.repair(f"{path}: replaced unsupported operator {key} with {operator}")
+        if operator.startswith("_"):
+            if operator not in OPERATOR_FIELD_TYPES:
+                raise QueryCompileError(f"{path}: unknown operator {key}")
+            return self.criterion(operator, value, path)
+        # Implicit equality: {"field": value}
+        return self.criterion(None, node, path)
+
+    def logical(self, operator: str, operands: Any, path: str) -> Dict[str, Any]:
+        """Compile an _and/_or group."""
+        if isinstance(operands, dict):
+            self.repair(f"{path}: wrapped single {operator} operand in a list")
+            operands = [operands]
+        if not isinstance(operands, list):
+            raise QueryCompileError(f"{path}: {operator} expects a list of queries")
+
+        compiled = []
+        seen = set()
+        for i, operand in enumerate(operands):
+            try:
+                result = self.node(operand, f"{path}.{operator}[{i}]")
+            except QueryCompileError as e:
+                self.repair(f"dropped invalid operand: {e}")
+                continue
+            # Flatten nested groups of the same operator
+            members = result[operator] if list(result) == [operator] else [result]
+            if len(members) > 1 or members[0] is not result:
+                self.repair(f"{path}: flattened nested {operator}", invalid=False)
+            for member in members:
+                key = json.dumps(canonicalize_query(member), sort_keys=True)
+                if key in seen:
+                    self.repair(f"{path}: removed duplicate {operator} operand", invalid=False)
+                    continue
+                seen.add(key)
+                compiled.append(member)
+
+        if not compiled:
+            raise QueryCompileError(f"{path}: {operator} has no valid operands")
+        if len(compiled) == 1:
+            self.repair(f"{path}: unwrapped single-operand {operator}", invalid=False)
+            return compiled[0]
+        return {operator: compiled}
+
+    def criterion(self, operator: Optional[str], value: Any, path: str) -> Dict[str, Any]:
+        """Compile a field criterion; ``operator`` is None for implicit equality."""
+        if not isinstance(value, dict) or not value:
+            raise QueryCompileError(f"{path}: {operator} expects an object of field: value")
+        if len(value) > 1:
+            self.repair(f"{path}: split {operator or 'criterion'} over {len(value)} fields into _and", invalid=False)
+            if operator is None:
+                return self.node({"_and": [{field: operand} for field, operand in value.items()]}, path)
+            return self.node({"_and": [{operator: {field: operand}} for field, operand in value.items()]}, path)
+
+        field, operand = next(iter(value.items()))
+        field = self.field(field, path)
+        field_type = self.fields[field]
+
+        if operator is None:
+            if field_type != TEXT:
+                if isinstance(operand, list):
+                    return {field: [self.value(field, field_type, "_eq", item, path) for item in operand]}
+                return {field: self.value(field, field_type, "_eq", operand, path)}
+            operator = "_text_any" if isinstance(operand, list) else "_text_all"
+            self.repair(f"{path}: wrapped bare full-text criterion on {field} in {operator}")
+
+        if field_type not in OPERATOR_FIELD_TYPES[operator]:
+            replacement = OPERATOR_REPAIRS.get((operator, field_type))
+            if replacement is None:
+                raise QueryCompileError(f"{path}: {operator} is not supported on {field_type} field {field}")
+            self.repair(f"{path}: replaced {operator} with {replacement} for {field_type} field {field}")
+            operator = replacement
+
+        return {operator: {field: self.value(field, field_type, operator, operand, path)}}
+
+    def field(self, field: str, path: str) -> str:
+        """Resolve a field name for the endpoint."""
+        if field in self.fields:
+            return field
+        alias = FIELD_ALIASES.get(field)
+        if alias in self.fields:
+            self.repair(f"{path}: renamed field {field} to {alias}")
+            return alias
+        raise QueryCompileError(f"{path}: unknown field {field} for the {self.endpoint} endpoint")
+
+    def value(self, field: str, field_type: str, operator: str, value: Any, path: str) -> Any:
+        """Validate and coerce a criterion value."""
+        if field_type == TEXT:
+            if isinstance(value, list):
+                self.repair(f"{path}: joined list of search terms for {field}")
+                value = " ".join(str(item) for item in value)
+            if not isinstance(value, str):
+                raise QueryCompileError(f"{path}: {field} expects search text")
+            text = _WHITESPACE.sub(" ", value).strip()
+            if not text:
+                raise QueryCompileError(f"{path}: empty search text for {field}")
+            return text
+
+        if field_type == DATE:
+            text = str(value).strip() if isinstance(value, (str, int)) and not isinstance(value, bool) else ""
+            if _FULL_DATE.match(text):
+                return text
+            month = _YEAR_MONTH.match(text)
+            if month:
+                self.repair(f"{path}: expanded partial date {text} for {field}")
+                return f"{month.group(1)}-{month.group(2)}-01"
+            if _YEAR.match(text):
+                self.repair(f"{path}: expanded year {text} for {field}")
+                return f"{text}-12-31" if operator in ("_lte", "_gt") else f"{text}-01-01"
+            raise QueryCompileError(f"{path}: {field} expects a YYYY-MM-DD date, got {json.dumps(value)}")
+
+        if field_type == NUMBER:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value
+            try:
+                number = float(str(value).strip())
+            except ValueError:
+                raise QueryCompileError(f"{path}: {field} expects a number, got {json.dumps(value)}")
+            self.repair(f"{path}: converted {json.dumps(value)} to a number for {field}")
+            return int(number) if number.is_integer() else number
+
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.repair(f"{path}: converted {value} to a string for {field}")
+            return str(value)
+        if not isinstance(value, str) or not value.strip():
+            raise QueryCompileError(f"{path}: {field} expects a non-empty string, got {json.dumps(value)}")
+        return value.strip()
+
+
+def fuse_queries(queries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine several queries into one _or query matching the union of their results."""
+    operands = []
+    for query in queries:
+        operands.extend(query["_or"] if list(query) == ["_or"] else [query])
+    return operands[0] if len(operands) == 1 else {"_or": operands}
+
+
+def matches_query(query: Dict[str, Any], record: Dict[str, Any]) -> bool:
+    """
+    Evaluate a PatentsView query against a returned record locally.
+
+    Full-text criteria are matched on stemmed tokens, which approximates the
+    server-side analysis; fields missing from the record never match.
+
+    Args:
+        query: The "q" query object
+        record: A patent (or claim) record as returned by the API
+
+    Returns:
+        Whether the record satisfies the query
+    """
+    return all(_matches_criterion(key, value, record) for key, value in query.items())
+
+
+def _matches_criterion(key: str, value: Any, record: Dict[str, Any]) -> bool:
+    """Evaluate a single operator or implicit-equality criterion."""
+    if key == "_and":
+        return all(matches_query(operand, record) for operand in value)
+    if key == "_or":
+        return any(matches_query(operand, record) for operand in value)
+    if key == "_not":
+        return not matches_query(value, record)
+    if key in TEXT_OPERATORS:
+        return all(_matches_text(key, text, _field_values(record, field)) for field, text in value.items())
+    if key in OPERATOR_FIELD_TYPES:
+        return all(_matches_value(key, _field_values(record, field), operand) for field, operand in value.items())
+    # Implicit equality, optionally against a list of alternatives
+    operands = value if isinstance(value, list) else [value]
+    values = _field_values(record, key)
+    return any(_matches_value("_eq", values, operand) for operand in operands)
+
+
+def _field_values(record: Dict[str, Any], field: str) -> List[Any]:
+    """Collect the values of a (possibly nested, dotted) field from a record."""
+    values = [record]
+    for part in field.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, list):
+                next_values.extend(item.get(part) for item in value if isinstance(item, dict))
+            elif isinstance(value, dict):
+                next_values.append(value.get(part))
+        values = next_values
+    flattened = []
+    for value in values:
+        if isinstance(value, list):
+            flattened.extend(value)
+        elif value is not None:
+            flattened.append(value)
+    return flattened
+
+
+def _matches_text(operator: str, text: str, values: List[Any]) -> bool:
+    """Match a full-text criterion against field values."""
+    terms = stem_tokens(text)
+    if not terms:
+        return False
+    documents = [stem_tokens(str(value)) for value in values]
+    if operator == "_text_phrase":
+        size = len(terms)
+        return any(document[i:i + size] == terms
+                   for document in documents for i in range(len(document) - size + 1))
+    tokens = {token for document in documents for token in document}
+    if operator == "_text_any":
+        return any(term in tokens for term in terms)
+    return all(term in tokens for term in terms)
+
+
+def _matches_value(operator: str, values: List[Any], operand: Any) -> bool:
+    """Match a comparison, prefix or equality criterion against field values."""
+    if operator == "_neq":
+        return all(not _compare("_eq", value, operand) for value in values)
+    return any(_compare(operator, value, operand) for value in values)
+
+
+def _compare(operator: str, value: Any, operand: Any) -> bool:
+    """Compare one field value with an operand."""
+    if operator in ("_contains", "_begins", "_eq"):
+        value_text, operand_text = str(value).lower(), str(operand).lower()
+        if operator == "_contains":
+            return operand_text in value_text
+        if operator == "_begins":
+            return value_text.startswith(operand_text)
+        return value_text == operand_text
+
+    try:
+        left, right = float(value), float(operand)
+    except (TypeError, ValueError):
+        # Dates (YYYY-MM-DD) and other strings compare lexicographically
+        left, right = str(value), str(operand)
+    if operator == "_gt":
+        return left > right
+    if operator == "_gte":
+        return left >= right
+    if operator == "_lt":
+        return left < right
+    return left <= right
+
+
+def refinement_moves(query: Dict[str, Any], direction: str,
+                     extra_terms: List[str] = ()) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Get deterministic rewrites that broaden or narrow a query, in order of preference.
+
+    Broadening switches _text_phrase to _text_all, drops the last _and operand
+    and switches _text_all to _text_any; narrowing does the reverse and adds
+    _and terms taken from ``extra_terms``.
+
+    Args:
+        query: Compiled query to rewrite
+        direction: "broaden" or "narrow"
+        extra_terms: Candidate terms (e.g. from the user query) for narrowing
+
+    Returns:
+        List of (move_name, rewritten_query) for the moves that apply
+    """
+    if direction == "broaden":
+        candidates = [
+            ("phrase_to_all", _rewrite_first(query, _phrase_to_all)),
+            ("drop_and_term", _rewrite_first(query, _drop_and_operand)),
+            ("all_to_any", _rewrite_first(query, _all_to_any))
+        ]
+    else:
+        present = set(stem_tokens(" ".join(_text_values(query))))
+        candidates = [("any_to_all", _rewrite_first(query, _any_to_all))]
+        for term in extra_terms:
+            if not set(stem_tokens(term)) <= present:
+                candidates.append((f"add_term:{term}", _add_and_term(query, term)))
+        candidates.append(("all_to_phrase", _rewrite_first(query, _all_to_phrase)))
+    return [(name, candidate) for name, candidate in candidates if candidate is not None]
+
+
+def _rewrite_first(node: Dict[str, Any], rewrite) -> Optional[Dict[str, Any]]:
+    """Apply ``rewrite`` to the first node (pre-order) it accepts; None if it accepts none."""
+    replacement = rewrite(node)
+    if replacement is not None:
+        return replacement
+    for key, value in node.items():
+        # _not is not descended into - rewriting under it would invert the direction
+        if key in LOGICAL_OPERATORS and isinstance(value, list):
+            for i, operand in enumerate(value):
+                rewritten = _rewrite_first(operand, rewrite)
+                if rewritten is not None:
+                    return {key: value[:i] + [rewritten] + value[i + 1:]}
+    return None
+
+
+def _switch_text_operator(node: Dict[str, Any], source: str, target: str,
+                          multi_word: bool) -> Optional[Dict[str, Any]]:
+    """Switch a full-text criterion from one operator to another."""
+    if list(node) != [source]:
+        return None
+    if multi_word and not any(len(stem_tokens(text)) > 1 for text in node[source].values()):
+        return None
+    return {target: node[source]}
+
+
+def _phrase_to_all(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return _switch_text_operator(node, "_text_phrase", "_text_all", multi_word=False)
+
+
+def _all_to_any(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return _switch_text_operator(node, "_text_all", "_text_any", multi_word=True)
+
+
+def _any_to_all(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return _switch_text_operator(node, "_text_any", "_text_all", multi_word=True)
+
+
+def _all_to_phrase(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return _switch_text_operator(node, "_text_all", "_text_phrase", multi_word=True)
+
+
+def _drop_and_operand(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    operands = node.get("_and") if list(node) == ["_and"] else None
+    if not operands or len(operands) < 2:
+        return None
+    remaining = operands[:-1]
+    return remaining[0] if len(remaining) == 1 else {"_and": remaining}
+
+
+def _add_and_term(query: Dict[str, Any], term: str) -> Dict[str, Any]:
+    criterion = {"_text_all": {"patent_abstract": term}}
+    if list(query) == ["_and"]:
+        return {"_and": query["_and"] + [criterion]}
+    return {"_and": [query, criterion]}
+
+
+def query_text(query: Dict[str, Any]) -> str:
+    """Get the full-text search strings of a query as free text (e.g. for local relevance scoring)."""
+    return " ".join(_text_values(query))
+
+
+def _text_values(node: Any) -> List[str]:
+    """Collect the search strings of every full-text criterion in a query."""
+    if isinstance(node, list):
+        return [text for item in node for text in _text_values(item)]
+    if not isinstance(node, dict):
+        return []
+    texts = []
+    for key, value in node.items():
+        if key in TEXT_OPERATORS and isinstance(value, dict):
+            texts.extend(str(text) for text in value.values())
+        else:
+            texts.extend(_text_values(value))
+    return texts
+
+
+def build_keyword_queries(text: str, max_terms: int = 5) -> List[Dict[str, Any]]:
+    """
+    Build search queries from a user query without an LLM.
+
+    Uses the content terms and multi-word phrases of the text: an exact-phrase
+    query for the leading phrase, an all-terms abstract query and a title query.
+
+    Args:
+        text: User query
+        max_terms: Maximum number of content terms used
+
+    Returns:
+        Search queries in the same shape _generate_queries returns them
+
+    Raises:
+        QueryCompileError: If the text has no usable terms
+    """
+    terms = content_terms(text)[:max_terms]
+    if not terms:
+        raise QueryCompileError(f"No searchable terms in query: {text}")
+    phrases = extract_key_phrases(text)
+
+    queries = []
+    if phrases:
+        queries.append({
+            "search_query": {"_text_phrase": {"patent_abstract": phrases[0]}},
+            "reasoning": f"Exact phrase \"{phrases[0]}\" in abstract"
+        })
+    queries.append({
+        "search_query": {"_text_all": {"patent_abstract": " ".join(terms)}},
+        "reasoning": f"All key terms in abstract: {', '.join(terms)}"
+    })
+    title_terms = " ".join(terms[:2])
+    queries.append({
+        "search_query": {"_text_all": {"patent_title": title_terms}},
+        "reasoning": f"Leading terms in title: {title_terms}"
+    })
+    return queries
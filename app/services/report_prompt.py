@@ -0,0 +1,159 @@
+"""
+Report Prompt Packing
+
+Serializes the ranked patents for the prior art report prompt so that it fits
+a fixed input token budget. Every patent gets one row of a compact markdown
+table; detail blocks (abstract and claims) follow in rank order while the
+budget lasts. The top patents carry the claims most relevant to the query,
+lower-ranked ones only their independent claims, and patents that no longer
+fit are left out, lowest rank first. Tokens are counted locally.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from app.services.claim_selection import format_claim, select_claims
+from app.utils.tokens import count_tokens, truncate_to_tokens
+
+# Patents analysed claim by claim in the report ("Claim Analysis (Top 3 Patents Only)")
+DETAILED_PATENTS = 3
+
+# Claim tokens per top patent / per lower-ranked patent (independent claims only)
+TOP_CLAIM_TOKENS = 600
+OTHER_CLAIM_TOKENS = 150
+
+# Abstract tokens per top patent / per lower-ranked patent
+TOP_ABSTRACT_TOKENS = 300
+OTHER_ABSTRACT_TOKENS = 120
+
+# CPC groups listed per patent in the table
+MAX_CPC_CODES = 3
+
+TABLE_HEADER = ("| # | Patent | Title | Date | Assignee | Inventor | CPC | Claims |\n"
+                "|---|---|---|---|---|---|---|---|")
+
+
+def inventor_name(inventors: List[Dict]) -> str:
+    """Get the name of the first inventor, or "Unknown"."""
+    if not inventors:
+        return "Unknown"
+    first = inventors[0]
+    return f"{first.get('inventor_name_first', '')} {first.get('inventor_name_last', '')}".strip() or "Unknown"
+
+
+def assignee_name(assignees: List[Dict]) -> str:
+    """Get the organization of the first assignee, or "Unknown"."""
+    if not assignees:
+        return "Unknown"
+    return assignees[0].get("assignee_organization", "Unknown")
+
+
+def _cell(value: Any) -> str:
+    """Make a value safe for a markdown table cell."""
+    return str(value).replace("|", "/").replace("\n", " ").strip() or "-"
+
+
+def _cpc_codes(patent: Dict[str, Any]) -> str:
+    """Get the distinct CPC groups (or subclasses) of a patent, comma separated."""
+    codes: Dict[str, None] = {}
+    for cpc in patent.get("cpc_current") or []:
+        code = (cpc.get("cpc_group_id") or cpc.get("cpc_subclass_id")) if isinstance(cpc, dict) else cpc
+        if code:
+            codes[str(code)] = None
+    return ", ".join(list(codes)[:MAX_CPC_CODES]) or "-"
+
+
+def patent_row(rank: int, patent: Dict[str, Any]) -> str:
+    """Render the table row of a patent."""
+    return (f"| {rank} | {_cell(patent.get('patent_id', 'Unknown'))} | {_cell(patent.get('patent_title', 'No title'))} | "
+            f"{_cell(patent.get('patent_date', 'Unknown'))} | {_cell(assignee_name(patent.get('assignees', [])))} | "
+            f"{_cell(inventor_name(patent.get('inventors', [])))} | {_cell(_cpc_codes(patent))} | "
+            f"{len(patent.get('claims', []))} |")
+
+
+def patent_detail(rank: int, patent: Dict[str, Any], query: str, with_claims: bool = True) -> str:
+    """
+    Render the detail block of a patent.
+
+    Args:
+        rank: 1-based rank of the patent
+        patent: Patent with abstract and (optionally) claims
+        query: User query the claims are selected for
+        with_claims: Include claims (top patents: the most relevant ones,
+            others: independent claims only)
+
+    Returns:
+        Markdown block headed by the patent's rank and ID
+    """
+    top = rank <= DETAILED_PATENTS
+    abstract = truncate_to_tokens(patent.get("patent_abstract") or "No abstract",
+                                  TOP_ABSTRACT_TOKENS if top else OTHER_ABSTRACT_TOKENS)
+    lines = [f"#{rank} {patent.get('patent_id', 'Unknown')}" + (" (top patent)" if top else ""),
+             f"Abstract: {abstract}"]
+    if patent.get("sibling_ids"):
+        lines.append(f"Same family: {', '.join(patent['sibling_ids'])}")
+    claims = patent.get("claims", [])
+    if with_claims and claims:
+        if top:
+            selected = select_claims(query, claims, TOP_CLAIM_TOKENS)
+        else:
+            independent = [claim for claim in claims if claim.get("type") == "independent"]
+            selected = select_claims(None, independent or claims[:1], OTHER_CLAIM_TOKENS)
+        lines += [format_claim(claim) for claim in selected]
+    return "\n".join(lines)
+
+
+def pack_patents(query: str, patents: List[Dict[str, Any]], token_budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Serialize ranked patents into at most ``token_budget`` tokens.
+
+    Table rows are placed first (rank order) so the report can mention every
+    patent that fits, then detail blocks in rank order. A detail block that
+    does not fit is retried without claims; packing stops at the first patent
+    whose block does not fit either.
+
+    Args:
+        query: User query (selects the claims of the top patents)
+        patents: Patents in rank order
+        token_budget: Tokens available for the serialized patents
+
+    Returns:
+        Tuple of (text, stats) with the number of patents listed in the table,
+        and how many of them were detailed with claims, detailed without
+        claims or listed only (no detail block), and how many were omitted
+        altogether; the last four add up to the number of patents
+    """
+    remaining = token_budget - count_tokens(TABLE_HEADER) - 1
+
+    rows: List[str] = []
+    for rank, patent in enumerate(patents, 1):
+        row = patent_row(rank, patent)
+        cost = count_tokens(row) + 1  # Joining newline
+        if cost > remaining:
+            break
+        rows.append(row)
+        remaining -= cost
+
+    details: List[str] = []
+    with_claims = 0
+    for rank, patent in enumerate(patents[:len(rows)], 1):
+        block = patent_detail(rank, patent, query)
+        cost = count_tokens(block) + 2  # Blank separator line
+        if cost > remaining:
+            block = patent_detail(rank, patent, query, with_claims=False)
+            cost = count_tokens(block) + 2
+            if cost > remaining:
+                break
+        else:
+            with_claims += 1
+        details.append(block)
+        remaining -= cost
+
+    text = "\n\n".join(["\n".join([TABLE_HEADER] + rows)] + details) if rows else ""
+    stats = {
+        "patents_listed": len(rows),
+        "patents_detailed": with_claims,
+        "patents_without_claims": len(details) - with_claims,
+        "patents_listed_only": len(rows) - len(details),
+        "patents_omitted": len(patents) - len(rows)
+    }
+    return text, stats
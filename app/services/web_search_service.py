@@ -14,8 +14,17 @@ from urllib.parse import quote_plus, urlparse
 import logging
 import os
 
+from app.core.config import get_circuit_breaker_config, settings
+from app.core.exceptions import CircuitOpenError
+from app.utils.circuit_breaker import CircuitBreaker
+
 logger = logging.getLogger(__name__)
 
+# Skips Google Custom Search calls while it is failing or timing out
+_google_breaker = CircuitBreaker(
+    "google_cse", **get_circuit_breaker_config(settings.google_search_slow_call_seconds)
+)
+
 
 class WebSearchService:
     """Real web search service with multiple search engines."""
@@ -66,16 +75,22 @@ class WebSearchService:
             if not self.session:
                 return []
             
-            async with self.session.get(api_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    results = self._parse_google_results(data, include_abstracts)
-                    logger.info(f"Google search completed for query: {query}, found {len(results)} results")
-                    return results
-                else:
-                    logger.warning(f"Google API returned status {response.status}")
-                    return []
+            with _google_breaker.track() as call:
+                async with self.session.get(api_url, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        results = self._parse_google_results(data, include_abstracts)
+                        logger.info(f"Google search completed for query: {query}, found {len(results)} results")
+                        return results
+                    else:
+                        if response.status >= 500:
+                            call.mark_failed()
+                        logger.warning(f"Google API returned status {response.status}")
+                        return []
                     
+        except CircuitOpenError as e:
+            logger.warning(f"Google search skipped for query '{query}': {str(e)}")
+            return []
         except Exception as e:
             logger.error(f"Google search failed for query '{query}': {str(e)}")
             return []
@@ -127,6 +142,7 @@ class WebSearchService:
             "google_api_key_length": len(self.google_api_key) if self.google_api_key else 0,
             "google_engine_id_length": len(self.google_engine_id) if self.google_engine_id else 0,
             "session_active": self.session is not None,
+            "circuit_breaker": _google_breaker.get_stats(),
             "status": "active"
         }
 
@@ -0,0 +1,228 @@
+"""
+Per-backend circuit breakers.
+
+A breaker watches the outcome of recent calls to one upstream service. When
+too many of them fail or are too slow it opens, and calls fail immediately
+with CircuitOpenError instead of waiting out timeouts against a service that
+is down. After a cool-down it lets a few probe calls through (half-open) and
+closes again once they succeed.
+"""
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from app.core.exceptions import CircuitOpenError, DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Every breaker created in the process, by name (reported by /health)
+_breakers: Dict[str, "CircuitBreaker"] = {}
+
+
+class _Call:
+    """Outcome of one tracked call; callers mark failures the breaker cannot see as exceptions."""
+
+    def __init__(self, started_at: float, probe: bool):
+        self.started_at = started_at
+        self.probe = probe
+        self.failed = False
+
+    def mark_failed(self):
+        """Count the call as a failure (e.g. a 5xx response returned without raising)."""
+        self.failed = True
+
+
+class CircuitBreaker:
+    """Failure-rate and latency circuit breaker with half-open probing."""
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5, slow_call_seconds: float = 30.0,
+                 window_size: int = 20, min_calls: int = 5, open_seconds: float = 30.0,
+                 half_open_probes: int = 1,
+                 is_failure: Optional[Callable[[Exception], bool]] = None):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Backend name (used in errors, logs and stats)
+            failure_rate_threshold: Share of failed or slow calls in the window that opens the circuit
+            slow_call_seconds: Calls taking at least this long count against the backend
+            window_size: Number of most recent calls considered
+            min_calls: Calls required in the window before the circuit can open
+            open_seconds: Time the circuit stays open before probing
+            half_open_probes: Successful probes required to close the circuit again
+            is_failure: Decides whether an exception counts against the backend
+                (defaults to every exception); others are not recorded
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.is_failure = is_failure or (lambda error: True)
+
+        self._state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, window_size))  # True = failed or slow
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        # Statistics
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+        _breakers[name] = self
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the cool-down has passed."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected outright."""
+        return self.state == OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through (0 unless open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def check(self):
+        """
+        Fail fast if the circuit is open, e.g. before queueing for a rate limit.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self.is_open:
+            self.rejected += 1
+            raise self._open_error()
+
+    @contextmanager
+    def track(self) -> Iterator[_Call]:
+        """
+        Guard one call to the backend.
+
+        Exceptions raised inside the block are recorded (if ``is_failure`` says
+        they count) and re-raised. Deadline and cancellation exits are not held
+        against the backend.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all probe slots taken
+        """
+        call = self._admit()
+        try:
+            yield call
+        except DeadlineExceededError:
+            self._release(call)
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self._record(call, failed=True)
+            else:
+                self._release(call)
+            raise
+        except BaseException:
+            self._release(call)
+            raise
+        else:
+            self._record(call, failed=call.failed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and statistics."""
+        window = len(self._outcomes)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "window_calls": window,
+            "window_failure_rate": sum(self._outcomes) / window if window else 0.0,
+            "calls": self.calls,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened
+        }
+
+    def _admit(self) -> _Call:
+        """Let a call through or reject it, claiming a probe slot when half-open."""
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probes_in_flight >= self.half_open_probes):
+            self.rejected += 1
+            raise self._open_error()
+        probe = state == HALF_OPEN
+        if probe:
+            self._probes_in_flight += 1
+        return _Call(time.monotonic(), probe)
+
+    def _open_error(self) -> CircuitOpenError:
+        """Build the error raised for a rejected call."""
+        return CircuitOpenError(
+            f"{self.name} circuit is open after repeated failures - retry in {self.retry_after():.0f}s"
+        )
+
+    def _release(self, call: _Call):
+        """Finish a call without recording an outcome."""
+        if call.probe and self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _record(self, call: _Call, failed: bool):
+        """Record a finished call and apply any state transition it causes."""
+        self._release(call)
+        slow = time.monotonic() - call.started_at >= self.slow_call_seconds
+        self.calls += 1
+        self.failures += failed
+        self.slow_calls += slow and not failed
+        bad = failed or slow
+
+        if call.probe:
+            if self._state != HALF_OPEN:
+                return
+            if bad:
+                self._transition(OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED)
+            return
+
+        if self._state != CLOSED:
+            return
+        self._outcomes.append(bad)
+        window = len(self._outcomes)
+        if window >= self.min_calls and sum(self._outcomes) / window >= self.failure_rate_threshold:
+            self._transition(OPEN)
+
+    def _transition(self, state: str):
+        """Enter a new state, resetting the bookkeeping that belongs to it."""
+        previous, self._state = self._state, state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(f"Circuit '{self.name}' opened ({previous} -> open) for {self.open_seconds:.0f}s")
+        elif state == CLOSED:
+            self._outcomes.clear()
+            logger.info(f"Circuit '{self.name}' closed after successful probes")
+        else:
+            logger.info(f"Circuit '{self.name}' half-open - probing")
+
+
+def get_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the state and statistics of every circuit breaker created so far, by backend name."""
+    return {name: breaker.get_stats() for name, breaker in _breakers.items()}
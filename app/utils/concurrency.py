@@ -0,0 +1,31 @@
+"""
+Bounded concurrent fan-out helpers.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BoundedExecutor:
+    """Run coroutines over many items concurrently with a cap on parallelism."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def map(self, fn: Callable[[T], Awaitable[R]], items: Iterable[T]) -> List[Union[R, BaseException]]:
+        """
+        Apply ``fn`` to every item with at most ``max_concurrency`` calls in flight.
+
+        Results are returned in input order. A failing item yields its exception
+        in place of a result instead of aborting the others, so callers can
+        attribute errors to the item that caused them.
+        """
+        async def run(item: T) -> R:
+            async with self._semaphore:
+                return await fn(item)
+
+        return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
@@ -0,0 +1,101 @@
+"""
+Request deadlines.
+
+A latency budget set at the service entry point becomes an absolute deadline
+held in a context variable, so every LLM and HTTP call made on behalf of the
+request - including calls in tasks it spawns - can bound its timeout by the
+time left instead of a fixed constant.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from app.core.exceptions import DeadlineExceededError
+
+T = TypeVar("T")
+
+# Absolute deadline (time.monotonic()) of the current request, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(budget_seconds: Optional[float]) -> Iterator[None]:
+    """
+    Run the enclosed block under a deadline ``budget_seconds`` from now.
+
+    An enclosing deadline that expires earlier is kept. A budget of None
+    leaves the current deadline (or its absence) unchanged.
+    """
+    if budget_seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + max(0.0, budget_seconds)
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """
+    Run the enclosed block without any deadline.
+
+    For starting work shared by several requests (tasks copy the context they
+    are created in): each request bounds only its own wait for the result.
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None without a deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def has_time(seconds: float) -> bool:
+    """Whether at least ``seconds`` remain (always True without a deadline)."""
+    remaining = remaining_time()
+    return remaining is None or remaining >= seconds
+
+
+def bounded_timeout(default: float) -> float:
+    """
+    Get a call timeout: ``default`` capped by the time left.
+
+    Raises:
+        DeadlineExceededError: If the deadline has already passed
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    if remaining <= 0:
+        raise DeadlineExceededError("Request deadline exceeded")
+    return min(default, remaining)
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Await something that has no timeout of its own (e.g. a rate-limit queue) within the deadline.
+
+    Raises:
+        DeadlineExceededError: If the deadline passes first
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError:
+        raise DeadlineExceededError("Request deadline exceeded while waiting") from None
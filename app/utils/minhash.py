@@ -0,0 +1,100 @@
+"""
+MinHash signatures and LSH banding for near-duplicate detection.
+
+Texts are reduced to sets of word shingles; a MinHash signature estimates the
+Jaccard similarity of two sets by the share of equal positions, and banding
+the signatures into an LSH index finds likely-similar pairs without comparing
+every pair. Hashing is vectorized with NumPy and deterministic across processes.
+"""
+
+import zlib
+from typing import Dict, Hashable, Iterable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+# Largest Mersenne prime below 2**64 used by the universal hash family
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(tokens: Sequence[str], size: int = 3) -> Set[str]:
+    """Get the set of ``size``-word shingles of a token sequence (the tokens themselves if shorter)."""
+    if len(tokens) < size:
+        return set(tokens)
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHasher:
+    """Computes fixed-length MinHash signatures with a seeded family of hash permutations."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """
+        Initialize the hash family.
+
+        Args:
+            num_perm: Signature length (more is more accurate and slower)
+            seed: Seed of the permutation parameters (signatures only compare within a seed)
+        """
+        self.num_perm = num_perm
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+        self._b = generator.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+
+    def signature(self, items: Iterable[str]) -> np.ndarray:
+        """
+        Get the MinHash signature of a set of strings.
+
+        Returns:
+            uint64 array of length ``num_perm`` (all max values for an empty set)
+        """
+        hashes = np.fromiter((zlib.crc32(item.encode("utf-8")) for item in items), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # Arithmetic wraps modulo 2**64, which keeps the family well mixed
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+
+def estimated_jaccard(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two sets from their signatures."""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing over MinHash signatures."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        """
+        Initialize the index.
+
+        With b bands of r rows, pairs with Jaccard similarity s become
+        candidates with probability 1 - (1 - s**r)**b (about 0.5 at
+        s = (1/b)**(1/r); 16 bands of 4 rows put that near 0.5).
+
+        Args:
+            num_perm: Signature length (must be divisible by ``bands``)
+            bands: Number of bands
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(bands)]
+
+    def insert(self, key: Hashable, signature: np.ndarray):
+        """Add a signature under ``key``."""
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            bucket.setdefault(band, []).append(key)
+
+    def candidates(self, signature: np.ndarray) -> List[Hashable]:
+        """Get the keys sharing at least one band with ``signature``."""
+        found: Dict[Hashable, None] = {}
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            for key in bucket.get(band, ()):
+                found[key] = None
+        return list(found)
+
+    def _band_keys(self, signature: np.ndarray) -> Tuple[bytes, ...]:
+        """Split a signature into hashable band keys."""
+        return tuple(signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands))
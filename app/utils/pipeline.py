@@ -0,0 +1,114 @@
+"""
+Producer/consumer pipeline helpers.
+
+Stages are connected by StageQueues that record queue-depth metrics, and
+run_stages() runs stage coroutines concurrently, cancelling the rest as soon
+as one of them fails.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, List
+
+# Marks the end of a stream
+_CLOSED = object()
+
+
+class StageQueue:
+    """Unbounded async queue between two pipeline stages, with depth metrics."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+        self._created = time.monotonic()
+        self._first_item_at = None
+
+        # Metrics
+        self.items = 0
+        self.max_depth = 0
+        self._depth_total = 0
+
+    async def put(self, item: Any):
+        """Hand an item to the downstream stage."""
+        if self._first_item_at is None:
+            self._first_item_at = time.monotonic()
+        self.items += 1
+        await self._queue.put(item)
+        depth = self._queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_total += depth
+
+    async def close(self):
+        """Signal that no more items will be produced."""
+        if not self._closed:
+            self._closed = True
+            await self._queue.put(_CLOSED)
+
+    async def get(self) -> Any:
+        """Get the next item, or the closing sentinel (see is_closed_marker)."""
+        item = await self._queue.get()
+        if item is _CLOSED:
+            # Keep the sentinel available for any other consumer
+            self._queue.put_nowait(_CLOSED)
+        return item
+
+    async def get_batch(self, max_items: int) -> List[Any]:
+        """
+        Wait for at least one item, then drain up to ``max_items`` already queued.
+
+        Returns an empty list once the queue is closed and drained.
+        """
+        first = await self.get()
+        if first is _CLOSED:
+            return []
+        batch = [first]
+        while len(batch) < max_items and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is _CLOSED:
+                self._queue.put_nowait(_CLOSED)
+                break
+            batch.append(item)
+        return batch
+
+    def empty(self) -> bool:
+        """Whether nothing is queued right now (e.g. the producer's last page has been drained)."""
+        return self._queue.empty()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        item = await self.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue-depth metrics for this stage boundary."""
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "max_depth": self.max_depth,
+            "mean_depth": round(self._depth_total / self.items, 2) if self.items else 0.0,
+            "first_item_after_s": round(self._first_item_at - self._created, 3) if self._first_item_at else None
+        }
+
+
+async def run_stages(*stages: Awaitable[Any]) -> List[Any]:
+    """
+    Run pipeline stages concurrently and return their results in order.
+
+    If any stage fails, the remaining stages are cancelled and the error is raised.
+    """
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
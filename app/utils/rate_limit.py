@@ -0,0 +1,76 @@
+"""
+Async token-bucket rate limiting.
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket that makes callers wait (instead of failing) when empty.
+
+    Waiters are served in FIFO order. The level may go negative after a
+    penalty, which delays every subsequent acquisition until it refills.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float):
+        """
+        Initialize the bucket.
+
+        Args:
+            capacity: Maximum number of tokens the bucket holds
+            refill_rate: Tokens added per second
+        """
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self._level = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def level(self) -> float:
+        """Current number of available tokens."""
+        self._refill()
+        return self._level
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, waiting until enough are available.
+
+        Args:
+            amount: Tokens to take (clamped to the bucket capacity)
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(float(amount), self.capacity)
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return time.monotonic() - start
+                await asyncio.sleep((amount - self._level) / self.refill_rate)
+
+    def refund(self, amount: float):
+        """Return unused tokens to the bucket."""
+        self._refill()
+        self._level = min(self.capacity, self._level + amount)
+
+    def limit_to(self, level: float):
+        """Lower the level to an externally observed value (never raises it)."""
+        self._refill()
+        self._level = min(self._level, float(level))
+
+    def penalize(self, seconds: float):
+        """Block acquisitions for roughly ``seconds`` by draining the bucket below zero."""
+        self._refill()
+        self._level = min(self._level, -seconds * self.refill_rate)
+
+    def _refill(self):
+        """Add tokens for the time elapsed since the last update."""
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.refill_rate)
+        self._updated = now
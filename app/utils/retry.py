@@ -0,0 +1,262 @@
+"""
+Shared async retry policy.
+
+Failures are classified per backend (only transient ones - 408/429/5xx,
+timeouts, dropped connections - are retried), waits honour ``Retry-After``
+and otherwise use exponential backoff with full jitter, and every retry must
+be covered by a process-wide retry budget that caps retries to a fraction of
+recent traffic, so an upstream incident does not turn into a retry storm.
+Waits never outlast the request deadline.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Mapping, Optional, Tuple, TypeVar
+
+from app.core.exceptions import DeadlineExceededError
+from app.utils.deadline import has_time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, throttling and transient server errors
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Every retry policy created in the process, by name (reported by /health)
+_policies: Dict[str, "RetryPolicy"] = {}
+
+
+class RetryableStatusError(Exception):
+    """A response with a retryable status, raised so the policy can retry it."""
+
+    def __init__(self, status_code: int, retry_after: Optional[float] = None, response: Any = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.response = response
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Get the server-requested retry delay in seconds from response headers.
+
+    Understands ``retry-after-ms`` (Azure OpenAI) and ``Retry-After`` given
+    either in seconds or as an HTTP date.
+    """
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    Process-wide cap on retries as a fraction of requests.
+
+    Over a sliding window, retries are allowed while they stay below ``ratio``
+    of the requests made (with a small floor so low traffic can still retry).
+    """
+
+    def __init__(self, ratio: float = 0.1, min_retries_per_second: float = 1.0,
+                 window_seconds: float = 10.0):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Retries allowed per request in the window
+            min_retries_per_second: Retries always allowed regardless of traffic
+            window_seconds: Length of the sliding window
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window_seconds = window_seconds
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+        # Statistics
+        self.requests = 0
+        self.retries = 0
+        self.exhausted = 0
+
+    def record_request(self):
+        """Count a first attempt."""
+        self._requests.append(time.monotonic())
+        self.requests += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget, or return False if it is exhausted."""
+        self._prune()
+        allowed = max(self.min_retries_per_second * self.window_seconds, self.ratio * len(self._requests))
+        if len(self._retries) >= allowed:
+            self.exhausted += 1
+            return False
+        self._retries.append(time.monotonic())
+        self.retries += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get budget statistics."""
+        self._prune()
+        return {
+            "ratio": self.ratio,
+            "window_seconds": self.window_seconds,
+            "window_requests": len(self._requests),
+            "window_retries": len(self._retries),
+            "requests": self.requests,
+            "retries": self.retries,
+            "exhausted": self.exhausted
+        }
+
+    def _prune(self):
+        """Drop events that left the window."""
+        cutoff = time.monotonic() - self.window_seconds
+        for events in (self._requests, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+
+class RetryPolicy:
+    """Retries transient failures of one backend with jittered backoff under a shared budget."""
+
+    def __init__(self, name: str, classify: Callable[[Exception], Tuple[bool, Optional[float]]],
+                 budget: Optional[RetryBudget] = None, max_attempts: int = 3,
+                 base_delay: float = 1.0, max_delay: float = 20.0, max_retry_after: float = 60.0):
+        """
+        Initialize the policy.
+
+        Args:
+            name: Backend name (used in logs and stats)
+            classify: Maps an error to (retryable, server-requested delay or None)
+            budget: Retry budget shared with other policies (defaults to the process-wide one)
+            max_attempts: Attempts per call, including the first
+            base_delay: Backoff cap for the first retry; doubles with each attempt
+            max_delay: Upper bound of the backoff cap
+            max_retry_after: Longer server-requested delays are not waited for
+        """
+        self.name = name
+        self.classify = classify
+        self.budget = budget if budget is not None else get_retry_budget()
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+        # Statistics
+        self.calls = 0
+        self.retries = 0
+        self.not_retryable = 0
+        self.exhausted_attempts = 0
+        self.budget_denied = 0
+
+        _policies[name] = self
+
+    async def call(self, fn: Callable[[], Awaitable[T]], max_attempts: Optional[int] = None) -> T:
+        """
+        Run ``fn``, retrying transient failures.
+
+        Args:
+            fn: Zero-argument coroutine factory performing one attempt
+            max_attempts: Override of the policy's attempts per call
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            The last attempt's error once it is not retryable, attempts or the
+            retry budget are exhausted, or the server asks for too long a wait.
+            DeadlineExceededError: If the request deadline passes before the next attempt
+        """
+        attempts = max(1, max_attempts or self.max_attempts)
+        self.calls += 1
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            try:
+                return await fn()
+            except Exception as error:
+                attempt += 1
+                retryable, retry_after = self.classify(error)
+                if not retryable or (retry_after is not None and retry_after > self.max_retry_after):
+                    self.not_retryable += 1
+                    raise
+                if attempt >= attempts:
+                    self.exhausted_attempts += 1
+                    raise
+                delay = self.backoff(attempt, retry_after)
+                if not has_time(delay):
+                    raise DeadlineExceededError(f"No time left in the request deadline to retry: {error}") from error
+                if not self.budget.try_spend():
+                    self.budget_denied += 1
+                    logger.warning(f"[{self.name}] retry budget exhausted - not retrying: {error}")
+                    raise
+                self.retries += 1
+                logger.warning(f"[{self.name}] attempt {attempt}/{attempts} failed, retrying in {delay:.1f}s: {error}")
+                await asyncio.sleep(delay)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before retry number ``attempt`` (1-based).
+
+        Full jitter: uniform between 0 and the exponential cap. A server-requested
+        delay is a lower bound.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retry statistics."""
+        return {
+            "name": self.name,
+            "max_attempts": self.max_attempts,
+            "calls": self.calls,
+            "retries": self.retries,
+            "not_retryable": self.not_retryable,
+            "exhausted_attempts": self.exhausted_attempts,
+            "budget_denied": self.budget_denied
+        }
+
+
+# Lazy-loaded process-wide retry budget shared by every policy
+_retry_budget_instance = None
+
+def get_retry_budget() -> RetryBudget:
+    """Get the shared retry budget, creating it from settings on first use."""
+    global _retry_budget_instance
+    if _retry_budget_instance is None:
+        from app.core.config import settings
+        _retry_budget_instance = RetryBudget(
+            ratio=settings.retry_budget_ratio,
+            min_retries_per_second=settings.retry_budget_min_per_second,
+            window_seconds=settings.retry_budget_window_seconds
+        )
+    return _retry_budget_instance
+
+
+def get_retry_stats() -> Dict[str, Any]:
+    """Get the shared budget and every retry policy created so far."""
+    return {
+        "budget": get_retry_budget().get_stats(),
+        "policies": {name: policy.get_stats() for name, policy in _policies.items()}
+    }
@@ -0,0 +1,100 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call: the first
+caller (the leader) starts the work, later callers (followers) await its result
+instead of issuing a duplicate request. The shared call runs without a request
+deadline; every caller waits for it only as long as its own deadline allows.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.utils.deadline import no_deadline, within_deadline
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """A shared in-flight call and the number of callers waiting on it."""
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce identical concurrent async calls into a single execution."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, _Flight] = {}
+
+        # Statistics
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` once per key among concurrent callers.
+
+        The work runs in its own task, so cancelling any single caller (including
+        the one that started it) does not cancel it for the others; it is only
+        cancelled once every caller has gone away. Failures propagate to every
+        waiting caller and are not remembered - the next call starts afresh.
+
+        The work does not inherit the leader's deadline, so a follower with a
+        longer budget (or none) is not cut short by the leader's; each caller
+        stops waiting at its own deadline instead.
+
+        Args:
+            key: Normalized identity of the outbound request
+            fn: Zero-argument coroutine factory performing the request
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            DeadlineExceededError: If the caller's deadline passes before the result is in
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            with no_deadline():
+                flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _, k=key, f=flight: self._forget(k, f))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+            logger.debug(f"[{self.name}] coalesced request onto in-flight call ({self.coalesced} total)")
+
+        flight.waiters += 1
+        try:
+            return await within_deadline(asyncio.shield(flight.task))
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller was cancelled - abandon the work and let new callers start over
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._flights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics."""
+        return {
+            "name": self.name,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights)
+        }
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        """Drop a finished or abandoned flight (if it is still the current one for its key)."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
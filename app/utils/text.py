@@ -0,0 +1,101 @@
+"""
+Lightweight text normalization for local matching.
+
+Tokenization, a conservative suffix-stripping stemmer close enough to
+PatentsView's full-text analysis to evaluate text criteria locally, and
+stopword filtering.
+"""
+
+import re
+from typing import List, Optional
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    if not text:
+        return []
+    return _TOKEN.findall(text.lower())
+
+
+def stem(token: str) -> str:
+    """
+    Reduce a token to a crude stem so inflections compare equal.
+
+    Handles plurals and the common -ing/-ed/-e endings
+    ("networks" -> "network", "encoding"/"encoded"/"encode" -> "encod").
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        token = token[:-3] + "y"
+    elif token.endswith("sses"):
+        token = token[:-2]
+    elif token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+
+    if token.endswith("ing") and len(token) > 5:
+        token = token[:-3]
+    elif token.endswith("ed") and len(token) > 4:
+        token = token[:-2]
+
+    if token.endswith("e") and len(token) > 4:
+        token = token[:-1]
+    return token
+
+
+def stem_tokens(text: Optional[str]) -> List[str]:
+    """Tokenize and stem text."""
+    return [stem(token) for token in tokenize(text)]
+
+
+# Common English and patent boilerplate words that carry no search signal
+STOPWORDS = frozenset("""
+a about above after again against all also an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having how i if in into is it its itself just more most my no nor not of off on once only or other
+our out over own same should so some such than that the their them then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your
+using use based method methods system systems apparatus device devices thereof wherein said
+""".split())
+
+
+def content_terms(text: Optional[str]) -> List[str]:
+    """Get the distinct non-stopword tokens of text, in order of first appearance."""
+    terms = []
+    for token in tokenize(text):
+        if token not in STOPWORDS and len(token) > 1 and token not in terms:
+            terms.append(token)
+    return terms
+
+
+def normalized_query_key(text: Optional[str]) -> str:
+    """
+    Normalize a user query for memoization.
+
+    Case-folds, drops stopwords, stems and sorts the terms, so "5G handovers"
+    and "handover in 5G" share a key.
+    """
+    return " ".join(sorted({stem(term) for term in content_terms(text)}))
+
+
+def extract_key_phrases(text: Optional[str], max_words: int = 4) -> List[str]:
+    """
+    Extract multi-word key phrases: runs of adjacent non-stopword tokens.
+
+    "5G handover using machine learning" -> ["5g handover", "machine learning"].
+    Longer runs are truncated to ``max_words`` tokens.
+    """
+    phrases, run = [], []
+    for token in tokenize(text) + [""]:
+        if token and token not in STOPWORDS:
+            run.append(token)
+            continue
+        if len(run) > 1:
+            phrase = " ".join(run[:max_words])
+            if phrase not in phrases:
+                phrases.append(phrase)
+        run = []
+    return phrases
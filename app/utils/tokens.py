@@ -0,0 +1,92 @@
+"""
+Local token counting.
+
+Uses tiktoken when it is installed and falls back to a character-based
+estimate otherwise, so callers never need a network round trip to size a prompt.
+"""
+
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+# Average characters per token for English prose with GPT-4 class tokenizers
+CHARS_PER_TOKEN = 4
+
+# Per-message framing overhead of the chat completions format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Marks an encoding that could not be loaded, so the load is not retried on every count
+_UNAVAILABLE = object()
+
+_encoding = None
+
+
+def _get_encoding():
+    """Get the cached tiktoken encoding, or None when tiktoken is unavailable."""
+    global _encoding
+    if _encoding is None:
+        if tiktoken is None:
+            _encoding = _UNAVAILABLE
+        else:
+            try:
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                # e.g. offline without a cached encoding file - warn once and estimate from then on
+                logger.warning(f"Failed to load tiktoken encoding, using estimates: {e}")
+                _encoding = _UNAVAILABLE
+    return None if _encoding is _UNAVAILABLE else _encoding
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Exact token count with tiktoken, otherwise a conservative estimate
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def count_chat_tokens(prompt: str, system_message: Optional[str] = None) -> int:
+    """Count the prompt tokens of a chat completion request."""
+    tokens = count_tokens(prompt) + MESSAGE_OVERHEAD_TOKENS
+    if system_message:
+        tokens += count_tokens(system_message) + MESSAGE_OVERHEAD_TOKENS
+    return tokens
+
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int, suffix: str = "...") -> str:
+    """
+    Shorten text to at most ``max_tokens`` tokens (including ``suffix`` when cut).
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token limit
+        suffix: Marker appended to shortened text
+
+    Returns:
+        The text unchanged if it fits, otherwise its longest fitting prefix plus the suffix
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    keep = max(0, max_tokens - count_tokens(suffix))
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:keep]).rstrip() + suffix
+    return text[:keep * CHARS_PER_TOKEN].rstrip() + suffix
@@ -22,7 +22,8 @@ Usage:
 import asyncio
 import logging
 import json
-from typing import Optional, Dict, Any, List
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, Literal
 from fastmcp import FastMCP, Context
 from pydantic import BaseModel, Field
 from typing import Annotated
@@ -39,6 +40,21 @@ from app.services.web_search_service import WebSearchService
 from app.services.patent_search_service import PatentSearchService
 from app.services.claim_drafting_service import ClaimDraftingService
 from app.services.claim_analysis_service import ClaimAnalysisService
+from app.services.llm_client import close_llm_clients
+
+# Shared patent search service - owns the pooled PatentsView HTTP client
+patent_service = PatentSearchService()
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """Release pooled connections when the server shuts down."""
+    try:
+        yield
+    finally:
+        await patent_service.aclose()
+        await close_llm_clients()
+
 
 # Create FastMCP server with debug logging
 mcp = FastMCP(
@@ -54,13 +70,64 @@ mcp = FastMCP(
     4. Claim Analysis - Analyze patent claims for quality and compliance
     
     All tools are powered by Azure OpenAI and real-time API integrations.
-    """
+    """,
+    lifespan=lifespan
 )
 
 # Note: FastMCP doesn't support before_request middleware
 # We'll add logging to individual tool functions instead
 
 
+# ============================================================================
+# Streaming Helpers
+# ============================================================================
+
+class StreamForwarder:
+    """
+    Forwards LLM text deltas to the MCP client while generation is running.
+    
+    Deltas are buffered and flushed at line boundaries (or when the buffer grows
+    large) as log notifications carrying the partial markdown, together with a
+    progress notification counting generated tokens against max_tokens.
+    """
+    
+    def __init__(self, ctx: Context, expected_tokens: int, min_chars: int = 80, flush_chars: int = 400):
+        self.ctx = ctx
+        self.expected_tokens = expected_tokens
+        self.min_chars = min_chars
+        self.flush_chars = flush_chars
+        self.tokens_received = 0
+        self._buffer = ""
+        self._failed = False
+    
+    async def __call__(self, delta: str):
+        self.tokens_received += 1
+        self._buffer += delta
+        if ("\n" in delta and len(self._buffer) >= self.min_chars) or len(self._buffer) >= self.flush_chars:
+            await self.flush()
+    
+    async def flush(self):
+        """Send buffered text and progress to the client."""
+        if not self._buffer or self._failed:
+            return
+        chunk, self._buffer = self._buffer, ""
+        try:
+            await self.ctx.report_progress(
+                progress=min(self.tokens_received, self.expected_tokens),
+                total=self.expected_tokens
+            )
+            await self.ctx.info(chunk)
+        except Exception as e:
+            # Never let a notification failure abort the generation itself
+            logger.warning(f"Failed to stream partial output to client: {e}")
+            self._failed = True
+
+
+def make_stream_forwarder(ctx: Optional[Context], expected_tokens: int) -> Optional[StreamForwarder]:
+    """Create a forwarder when the client supports notifications."""
+    return StreamForwarder(ctx, expected_tokens) if ctx else None
+
+
 # ============================================================================
 # Tool 1: Web Search Tool
 # ============================================================================
@@ -126,6 +193,9 @@ async def web_search(
 async def prior_art_search(
     query: Annotated[str, Field(description="Search query describing the invention or technology", min_length=3, max_length=1000)],
     context: Annotated[Optional[str], Field(None, description="Additional context from document or conversation")] = None,
+    mode: Annotated[Literal["fast", "deep"], Field("deep", description="fast: keyword queries, stored claims only and a templated report - no LLM calls or claims fetch, so latency is that of the PatentsView searches (seconds when cached); deep: full AI analysis")] = "deep",
+    refresh: Annotated[bool, Field(False, description="Regenerate the search queries instead of reusing a cached plan")] = False,
+    budget_seconds: Annotated[Optional[float], Field(None, description="Optional latency budget in seconds; slower stages degrade to fit it", ge=1)] = None,
     ctx: Context = None
 ) -> str:
     """
@@ -137,21 +207,30 @@ async def prior_art_search(
     3. Retrieves patent details including claims
     4. Generates a comprehensive markdown report
     
+    In fast mode the queries are built from the keywords of the query, results
+    are ranked locally and the report is templated, with no LLM calls.
+    
     Returns detailed prior art analysis report.
     """
     if ctx:
         await ctx.info(f"Starting prior art search for: {query}")
     
     try:
-        # Use existing service (PatentSearchService doesn't use async context manager)
-        patent_service = PatentSearchService()
+        # Use the shared service so PatentsView connections are reused across calls
+        forwarder = make_stream_forwarder(ctx, expected_tokens=4000)
         
         search_result, generated_queries = await patent_service.search_patents(
             query=query,
             context=context,
             conversation_history=None,
-            max_results=20
+            max_results=20,
+            on_token=forwarder,
+            refresh_plan=refresh,
+            mode=mode,
+            budget_seconds=budget_seconds
         )
+        if forwarder:
+            await forwarder.flush()
         
         if ctx:
             await ctx.info(f"Prior art search completed - found {search_result['results_found']} patents")
@@ -177,6 +256,7 @@ async def prior_art_search(
 async def claim_drafting(
     user_query: Annotated[str, Field(description="Description of the invention or feature to draft claims for", min_length=10)],
     context: Annotated[Optional[str], Field(None, description="Additional context from document")] = None,
+    budget_seconds: Annotated[Optional[float], Field(None, description="Optional latency budget in seconds; slower stages degrade to fit it", ge=1)] = None,
     ctx: Context = None
 ) -> str:
     """
@@ -195,12 +275,17 @@ async def claim_drafting(
     
     try:
         # Use existing service with async context manager
+        forwarder = make_stream_forwarder(ctx, expected_tokens=4000)
         async with ClaimDraftingService() as drafting_service:
                 draft_result = await drafting_service.draft_claims(
                     user_query=user_query,
                     conversation_context=None,
-                    document_reference=context
+                    document_reference=context,
+                    on_token=forwarder,
+                    budget_seconds=budget_seconds
                 )
+        if forwarder:
+            await forwarder.flush()
         
         if ctx:
             await ctx.info("Claim drafting completed successfully")
@@ -227,6 +312,7 @@ class Claim(BaseModel):
 async def claim_analysis(
     claims: Annotated[List[Claim], Field(description="List of claims to analyze", min_length=1)],
     context: Annotated[Optional[str], Field(None, description="Additional context for analysis")] = None,
+    budget_seconds: Annotated[Optional[float], Field(None, description="Optional latency budget in seconds; slower stages degrade to fit it", ge=1)] = None,
     ctx: Context = None
 ) -> str:
     """
@@ -250,11 +336,16 @@ async def claim_analysis(
             # Convert Pydantic models to dict format expected by service
             claims_list = [{"claim_text": claim.claim_text} for claim in claims]
             
+            forwarder = make_stream_forwarder(ctx, expected_tokens=4000)
             analysis_result = await analysis_service.analyze_claims(
                 claims=claims_list,
                 analysis_type="comprehensive",
-                focus_areas=[]
+                focus_areas=[],
+                on_token=forwarder,
+                budget_seconds=budget_seconds
             )
+            if forwarder:
+                await forwarder.flush()
         
         if ctx:
             await ctx.info("Claim analysis completed successfully")
@@ -0,0 +1,16 @@
+"""
+Shared test setup.
+
+Settings are read from the environment when app.core.config is imported, so
+local persistence (LLM cache, claims store) is disabled here before any test
+module imports the application.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["CLAIMS_STORE_PATH"] = ""
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,129 @@
+"""Tests for circuit breaker state transitions."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.exceptions import CircuitOpenError, DeadlineExceededError
+from app.utils import circuit_breaker as breaker_module
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class _Clock:
+    """Manually advanced stand-in for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(breaker_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def _fail(breaker, error=None):
+    with pytest.raises(type(error or RuntimeError())):
+        with breaker.track():
+            raise error or RuntimeError("upstream failed")
+
+
+def _succeed(breaker):
+    with breaker.track():
+        pass
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    options = dict(failure_rate_threshold=0.5, window_size=4, min_calls=4, open_seconds=30.0)
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_opens_at_failure_rate_once_min_calls_reached(clock):
+    breaker = _breaker()
+    _succeed(breaker)
+    _fail(breaker)
+    _fail(breaker)
+    assert breaker.state == CLOSED  # Below min_calls
+
+    _succeed(breaker)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+
+
+def test_open_circuit_rejects_calls(clock):
+    breaker = _breaker(min_calls=1)
+    _fail(breaker)
+
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    with pytest.raises(CircuitOpenError):
+        _succeed(breaker)
+    assert breaker.rejected == 2
+    assert breaker.retry_after() == 30.0
+
+
+def test_half_open_after_cool_down_and_probe_success_closes(clock):
+    breaker = _breaker(min_calls=1)
+    _fail(breaker)
+
+    clock.now += 29.9
+    assert breaker.state == OPEN
+    clock.now += 0.1
+    assert breaker.state == HALF_OPEN
+
+    _succeed(breaker)
+    assert breaker.state == CLOSED
+    assert breaker.get_stats()["window_calls"] == 0
+
+
+def test_probe_failure_reopens(clock):
+    breaker = _breaker(min_calls=1)
+    _fail(breaker)
+    clock.now += 30
+
+    _fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+    assert breaker.retry_after() == 30.0
+
+
+def test_half_open_admits_limited_probes(clock):
+    breaker = _breaker(min_calls=1, half_open_probes=2)
+    _fail(breaker)
+    clock.now += 30
+
+    with breaker.track():
+        with breaker.track():
+            with pytest.raises(CircuitOpenError):
+                _succeed(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_ignored_errors_and_deadlines_are_not_recorded(clock):
+    breaker = _breaker(min_calls=1, is_failure=lambda error: not isinstance(error, ValueError))
+    _fail(breaker, ValueError("bad request"))
+    _fail(breaker, DeadlineExceededError("caller gave up"))
+
+    assert breaker.state == CLOSED
+    assert breaker.calls == 0
+
+    _fail(breaker)
+    assert breaker.state == OPEN
+
+
+def test_marked_and_slow_calls_count_as_failures(clock):
+    breaker = _breaker(slow_call_seconds=5.0)
+    with breaker.track() as call:
+        call.mark_failed()
+    for _ in range(2):
+        with breaker.track():
+            clock.now += 5.0
+    _succeed(breaker)
+
+    assert breaker.state == OPEN
+    assert (breaker.failures, breaker.slow_calls) == (1, 2)
@@ -0,0 +1,78 @@
+"""Tests for query-relevant claim selection within a token budget."""
+
+from app.services.claim_selection import format_claim, parse_claim_structure, select_claims
+from app.utils.tokens import count_tokens
+
+QUERY = "battery coolant loop with a plate heat exchanger"
+
+CLAIMS = [
+    {"number": "1", "type": "independent",
+     "text": "A seat assembly comprising a frame and upholstery fastened to the frame."},
+    {"number": "2", "type": "dependent", "text": "The seat assembly of claim 1, wherein the frame is steel."},
+    {"number": "3", "type": "independent",
+     "text": "A battery pack comprising cells and a coolant loop with a plate heat exchanger bonded to the cells."},
+    {"number": "4", "type": "dependent", "text": "The battery pack of claim 3, wherein the coolant is dielectric."},
+    {"number": "5", "type": "dependent",
+     "text": "The battery pack of claim 4, wherein the plate heat exchanger is aluminium."},
+    {"number": "6", "type": "dependent", "text": "The method as claimed in claim 99, further comprising a pump."},
+]
+
+
+def _numbers(claims):
+    return [claim["number"] for claim in claims]
+
+
+def test_parse_claim_structure():
+    structured = {claim["number"]: claim for claim in parse_claim_structure(CLAIMS)}
+
+    assert (structured["1"]["depends_on"], structured["1"]["root"]) == (None, "1")
+    assert (structured["4"]["depends_on"], structured["4"]["root"]) == ("3", "3")
+    assert (structured["5"]["depends_on"], structured["5"]["root"]) == ("4", "3")
+    # A reference to a claim that does not exist is not a dependency
+    assert (structured["6"]["depends_on"], structured["6"]["root"]) == (None, "6")
+    assert "depends_on" not in CLAIMS[0]
+
+
+def test_anchors_on_most_relevant_independent_claim():
+    selected = select_claims(QUERY, CLAIMS, 1000)
+
+    assert "3" in _numbers(selected)
+    assert "1" not in _numbers(selected)  # Off-topic independent claim
+    assert _numbers(selected) == sorted(_numbers(selected), key=int)
+
+
+def test_dependent_claim_comes_with_its_independent_claim():
+    # Room for the anchor (claim 3) and claim 5, but not for claim 4 in between
+    root, dependent = (next(claim for claim in parse_claim_structure(CLAIMS) if claim["number"] == number)
+                       for number in ("3", "5"))
+    budget = count_tokens(format_claim(root)) + count_tokens(format_claim(dependent)) + 2
+
+    selected = select_claims(QUERY, CLAIMS, budget)
+
+    assert _numbers(selected) == ["3", "5"]
+    for claim in selected:
+        assert claim["root"] in _numbers(selected)
+
+
+def test_token_budget_is_honoured():
+    for budget in (60, 120, 250):
+        selected = select_claims(QUERY, CLAIMS, budget)
+        assert sum(count_tokens(format_claim(claim)) for claim in selected) <= budget
+
+
+def test_long_anchor_is_shortened_to_fit():
+    long_claims = [{"number": "1", "type": "independent",
+                    "text": "A battery pack comprising " + "a coolant loop and a plate heat exchanger, " * 100}]
+
+    selected = select_claims(QUERY, long_claims, 80)
+
+    assert _numbers(selected) == ["1"]
+    assert selected[0]["text"].endswith("...")
+    assert count_tokens(format_claim(selected[0])) <= 80
+
+
+def test_without_query_claims_are_taken_in_order():
+    selected = select_claims(None, CLAIMS[:2], 1000)
+
+    assert _numbers(selected) == ["1", "2"]
+    assert select_claims(QUERY, [], 1000) == []
@@ -0,0 +1,126 @@
+"""Tests for the two-tier LLM response cache."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_cache as llm_cache_module
+from app.services.llm_cache import LLMResponseCache
+
+
+def _value(text: str):
+    return {"content": text, "usage": {"total_tokens": 10}}
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_700_000_000.0)
+    monkeypatch.setattr(llm_cache_module, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+# Keys
+
+def test_key_covers_every_request_parameter():
+    base = LLMResponseCache.make_key("gpt", "system", "prompt", 500, 0.2)
+
+    assert LLMResponseCache.make_key("gpt", "system", "prompt", 500, 0.2) == base
+    assert LLMResponseCache.make_key("gpt", "system", "prompt", 1000, 0.2) != base
+    assert LLMResponseCache.make_key("gpt", "system", "prompt", 500, 0.3) != base
+    assert LLMResponseCache.make_key("gpt", "other", "prompt", 500, 0.2) != base
+    assert LLMResponseCache.make_key("mini", "system", "prompt", 500, 0.2) != base
+
+
+def test_key_rounds_temperature():
+    assert LLMResponseCache.make_key("gpt", None, "prompt", 500, 0.2) == \
+        LLMResponseCache.make_key("gpt", None, "prompt", 500, 0.20000001)
+    assert LLMResponseCache.make_key("gpt", None, "prompt", 500, 0) == \
+        LLMResponseCache.make_key("gpt", None, "prompt", 500, 0.0)
+
+
+# Memory tier
+
+@pytest.mark.asyncio
+async def test_memory_tier_evicts_least_recently_used_by_bytes():
+    entry_size = _size(_value("a"))
+    cache = LLMResponseCache(max_bytes=2 * entry_size, db_path=None)
+
+    await cache.set("a", _value("a"))
+    await cache.set("b", _value("b"))
+    assert await cache.get("a") == _value("a")  # "b" is now least recently used
+    await cache.set("c", _value("c"))
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == _value("a")
+    assert await cache.get("c") == _value("c")
+    stats = cache.get_stats()
+    assert (stats["evictions"], stats["memory_entries"], stats["memory_bytes"]) == (1, 2, 2 * entry_size)
+
+
+@pytest.mark.asyncio
+async def test_entries_larger_than_the_budget_are_not_kept_in_memory():
+    cache = LLMResponseCache(max_bytes=10, db_path=None)
+
+    await cache.set("big", _value("x" * 100))
+
+    assert await cache.get("big") is None
+    assert cache.get_stats()["memory_bytes"] == 0
+
+
+def test_only_sampled_outputs_expire():
+    cache = LLMResponseCache(db_path=None, ttl_seconds=60.0)
+
+    assert cache.ttl_for(0.0) is None
+    assert cache.ttl_for(0.7) == 60.0
+
+
+@pytest.mark.asyncio
+async def test_sampled_entries_expire_after_ttl(clock):
+    cache = LLMResponseCache(db_path=None, ttl_seconds=60.0)
+    await cache.set("sampled", _value("s"), ttl=cache.ttl_for(0.7))
+    await cache.set("deterministic", _value("d"), ttl=cache.ttl_for(0.0))
+
+    clock.now += 59
+    assert await cache.get("sampled") == _value("s")
+    clock.now += 2
+    assert await cache.get("sampled") is None
+    assert await cache.get("deterministic") == _value("d")
+    assert cache.get_stats()["memory_entries"] == 1
+
+
+# Disk tier
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart_and_promotes_to_memory(tmp_path):
+    db_path = str(tmp_path / "llm_cache.db")
+    cache = LLMResponseCache(db_path=db_path)
+    await cache.set("key", _value("persisted"))
+    cache.close()
+
+    restarted = LLMResponseCache(db_path=db_path)
+    assert restarted.get_stats()["memory_entries"] == 0
+    assert await restarted.get("key") == _value("persisted")
+    assert await restarted.get("key") == _value("persisted")
+
+    stats = restarted.get_stats()
+    assert (stats["hits"], stats["disk_hits"], stats["memory_entries"]) == (2, 1, 1)
+    restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_disk_entries_are_not_served(tmp_path, clock):
+    db_path = str(tmp_path / "llm_cache.db")
+    cache = LLMResponseCache(db_path=db_path, ttl_seconds=60.0)
+    await cache.set("key", _value("sampled"), ttl=60.0)
+    cache.close()
+
+    clock.now += 120
+    restarted = LLMResponseCache(db_path=db_path, ttl_seconds=60.0)
+    assert await restarted.get("key") is None
+    assert restarted.get_stats()["misses"] == 1
+    restarted.close()
@@ -0,0 +1,65 @@
+"""Tests for MinHash/LSH near-duplicate detection and family collapsing."""
+
+import pytest
+
+from app.services.patent_ranking import collapse_near_duplicates
+from app.utils.minhash import LSHIndex, MinHasher, estimated_jaccard, shingles
+
+ABSTRACT = ("A battery thermal management system circulates a dielectric coolant through a loop and a plate "
+            "heat exchanger bonded to the battery cells, and a controller adjusts the pump speed in response "
+            "to the measured cell temperature.")
+
+
+def _words(text):
+    return text.lower().split()
+
+
+def test_shingles():
+    assert shingles(["a", "b", "c", "d"]) == {"a b c", "b c d"}
+    assert shingles(["a", "b"]) == {"a", "b"}
+
+
+def test_signatures_are_deterministic_and_estimate_jaccard():
+    hasher = MinHasher(num_perm=128)
+    first = shingles([f"w{i}" for i in range(100)], size=1)
+    second = shingles([f"w{i}" for i in range(50, 150)], size=1)  # Jaccard 1/3
+
+    assert estimated_jaccard(hasher.signature(first), MinHasher(num_perm=128).signature(first)) == 1.0
+    assert estimated_jaccard(hasher.signature(first), hasher.signature(second)) == pytest.approx(1 / 3, abs=0.15)
+    assert estimated_jaccard(hasher.signature(first), hasher.signature({"unrelated"})) < 0.1
+
+
+def test_lsh_index_finds_similar_signatures():
+    hasher = MinHasher(num_perm=64)
+    index = LSHIndex(num_perm=64, bands=16)
+    index.insert("original", hasher.signature(shingles(_words(ABSTRACT))))
+    index.insert("other", hasher.signature(shingles(_words("A fastener attaches upholstery fabric to a seat."))))
+
+    near_copy = hasher.signature(shingles(_words(ABSTRACT.replace("measured", "sensed"))))
+    assert index.candidates(near_copy) == ["original"]
+
+
+def test_lsh_index_rejects_uneven_bands():
+    with pytest.raises(ValueError):
+        LSHIndex(num_perm=64, bands=10)
+
+
+def test_collapse_near_duplicates_folds_into_first_of_family():
+    patents = [
+        {"patent_id": "1", "patent_abstract": ABSTRACT},
+        {"patent_id": "2", "patent_abstract": "A fastener attaches upholstery fabric to a vehicle seat frame."},
+        {"patent_id": "3", "patent_abstract": ABSTRACT.replace("measured", "sensed")},
+        {"patent_id": "4", "patent_abstract": ""},
+        {"patent_id": "5", "patent_abstract": ABSTRACT, "sibling_ids": ["6"]},
+    ]
+
+    representatives, folded = collapse_near_duplicates(patents)
+
+    assert [patent["patent_id"] for patent in representatives] == ["1", "2", "4"]
+    assert folded == 2
+    assert representatives[0]["sibling_ids"] == ["3", "5", "6"]
+    assert "sibling_ids" not in representatives[1]
+
+    # Collapsing again does not repeat siblings
+    collapse_near_duplicates(representatives + [patents[2]])
+    assert representatives[0]["sibling_ids"] == ["3", "5", "6"]
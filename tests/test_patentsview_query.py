@@ -0,0 +1,152 @@
+"""Tests for the PatentsView query compiler, local evaluator and query fusion."""
+
+import pytest
+
+from app.services.patentsview_query import (
+    QueryCompileError, QueryCompiler, compile_query, fuse_queries, matches_query
+)
+
+RECORD = {
+    "patent_id": "11000001",
+    "patent_title": "Neural network accelerator",
+    "patent_abstract": "A hardware accelerator executes convolutional neural networks using systolic arrays.",
+    "patent_date": "2021-06-15",
+    "patent_year": 2021,
+    "assignees": [{"assignee_organization": "Acme Semiconductor Inc."}],
+    "cpc_current": [{"cpc_group_id": "G06N3/063"}]
+}
+
+
+# Repair
+
+def test_legacy_operator_and_field_are_repaired():
+    result = compile_query({"_text_and": {"title": "neural network"}})
+
+    assert result.query == {"_text_all": {"patent_title": "neural network"}}
+    assert result.invalid
+    assert len(result.repairs) == 2
+
+
+def test_bare_text_criterion_is_wrapped():
+    assert compile_query({"patent_abstract": "neural network"}).query == \
+        {"_text_all": {"patent_abstract": "neural network"}}
+    assert compile_query({"patent_abstract": ["neural", "network"]}).query == \
+        {"_text_any": {"patent_abstract": "neural network"}}
+
+
+def test_operator_unsupported_on_field_type_is_replaced():
+    result = compile_query({"_contains": {"patent_abstract": "accelerator"}})
+
+    assert result.query == {"_text_all": {"patent_abstract": "accelerator"}}
+    assert compile_query({"_text_any": {"assignees.assignee_organization": "Acme"}}).query == \
+        {"_contains": {"assignees.assignee_organization": "Acme"}}
+
+
+def test_dates_and_numbers_are_coerced():
+    assert compile_query({"_gte": {"patent_date": "2020"}}).query == {"_gte": {"patent_date": "2020-01-01"}}
+    assert compile_query({"_lte": {"patent_date": "2020"}}).query == {"_lte": {"patent_date": "2020-12-31"}}
+    assert compile_query({"_gte": {"patent_date": "2020-03"}}).query == {"_gte": {"patent_date": "2020-03-01"}}
+    assert compile_query({"patent_year": "2021"}).query == {"patent_year": 2021}
+
+
+def test_multiple_criteria_are_split_without_marking_invalid():
+    result = compile_query({"patent_year": 2021, "_text_all": {"patent_title": "accelerator"}})
+
+    assert result.query == {"_and": [{"patent_year": 2021}, {"_text_all": {"patent_title": "accelerator"}}]}
+    assert not result.invalid
+
+
+def test_groups_are_flattened_deduplicated_and_unwrapped():
+    criterion = {"_text_all": {"patent_title": "accelerator"}}
+    result = compile_query({"_and": [{"_and": [criterion, {"patent_year": 2021}]}, criterion]})
+
+    assert result.query == {"_and": [criterion, {"patent_year": 2021}]}
+    assert compile_query({"_or": [criterion]}).query == criterion
+    assert not result.invalid
+
+
+def test_invalid_operands_are_dropped():
+    criterion = {"_text_all": {"patent_title": "accelerator"}}
+    result = compile_query({"_or": [criterion, {"_text_all": {"no_such_field": "x"}}]})
+
+    assert result.query == criterion
+    assert result.invalid
+
+
+# Rejection
+
+@pytest.mark.parametrize("query", [
+    {},
+    "neural network",
+    {"_regex": {"patent_title": "neural.*"}},
+    {"_text_all": {"no_such_field": "x"}},
+    {"_gte": {"patent_date": "last year"}},
+    {"_text_all": {"patent_title": "   "}},
+    {"_or": [{"_text_all": {"no_such_field": "x"}}, {"patent_year": "recent"}]},
+    {"_lt": {"patent_abstract": "accelerator"}},
+])
+def test_unrepairable_queries_are_rejected(query):
+    with pytest.raises(QueryCompileError):
+        compile_query(query)
+
+
+def test_unknown_endpoint_is_rejected():
+    with pytest.raises(QueryCompileError):
+        compile_query({"patent_id": "1"}, endpoint="no_such_endpoint")
+
+
+def test_compiler_counts_round_trips_saved():
+    compiler = QueryCompiler("patent")
+    compiler.compile({"_text_all": {"patent_title": "accelerator"}})
+    compiler.compile({"patent_year": 2021, "patent_type": "utility"})
+    compiler.compile({"_text_and": {"patent_title": "accelerator"}})
+    with pytest.raises(QueryCompileError):
+        compiler.compile({"_regex": {"patent_title": "x"}})
+
+    stats = compiler.get_stats()
+    assert (stats["compiled"], stats["normalized"], stats["repaired"], stats["rejected"]) == (3, 1, 1, 1)
+    assert stats["round_trips_saved"] == 2
+
+
+# Local evaluation and fused-result attribution
+
+@pytest.mark.parametrize("query, expected", [
+    ({"_text_all": {"patent_abstract": "neural network"}}, True),
+    ({"_text_all": {"patent_abstract": "neural transformer"}}, False),
+    ({"_text_any": {"patent_abstract": "transformer systolic"}}, True),
+    ({"_text_phrase": {"patent_abstract": "systolic arrays"}}, True),
+    ({"_text_phrase": {"patent_abstract": "arrays systolic"}}, False),
+    ({"_gte": {"patent_date": "2021-01-01"}}, True),
+    ({"_lt": {"patent_year": 2021}}, False),
+    ({"_contains": {"assignees.assignee_organization": "acme"}}, True),
+    ({"_begins": {"cpc_current.cpc_group_id": "G06N"}}, True),
+    ({"_not": {"_text_any": {"patent_title": "battery"}}}, True),
+    ({"_and": [{"patent_year": 2021}, {"_text_all": {"patent_title": "battery"}}]}, False),
+    ({"_or": [{"patent_year": 2020}, {"_text_all": {"patent_title": "accelerator"}}]}, True),
+    ({"_text_all": {"claims.claim_text": "accelerator"}}, False),
+])
+def test_matches_query(query, expected):
+    assert matches_query(query, RECORD) is expected
+
+
+def test_fuse_queries_flattens_or_operands():
+    first = {"_text_all": {"patent_title": "accelerator"}}
+    second = {"_or": [{"patent_year": 2020}, {"patent_year": 2021}]}
+
+    assert fuse_queries([first]) == first
+    assert fuse_queries([first, second]) == {"_or": [first, {"patent_year": 2020}, {"patent_year": 2021}]}
+
+
+def test_fused_results_are_attributed_to_matching_sub_queries():
+    sub_queries = [
+        {"_text_all": {"patent_abstract": "neural network"}},
+        {"_text_all": {"patent_title": "battery"}},
+        {"_and": [{"_gte": {"patent_date": "2020-01-01"}}, {"_text_any": {"patent_title": "accelerator"}}]},
+    ]
+    other = {**RECORD, "patent_id": "11000002", "patent_title": "Battery charger",
+             "patent_abstract": "A charger for lithium batteries.", "patent_date": "2019-02-01"}
+
+    fused = fuse_queries(sub_queries)
+    assert matches_query(fused, RECORD) and matches_query(fused, other)
+    assert [i for i, sub_query in enumerate(sub_queries) if matches_query(sub_query, RECORD)] == [0, 2]
+    assert [i for i, sub_query in enumerate(sub_queries) if matches_query(sub_query, other)] == [1]
@@ -0,0 +1,174 @@
+"""Tests for the async token bucket and the LLM request scheduler."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services.llm_scheduler import LLMRequestScheduler
+from app.utils import rate_limit as rate_limit_module
+from app.utils.rate_limit import TokenBucket
+
+
+class _Clock:
+    """Fake monotonic clock; sleeping advances it instead of waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limit_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(rate_limit_module, "asyncio", SimpleNamespace(sleep=clock.sleep, Lock=asyncio.Lock))
+    return clock
+
+
+# TokenBucket
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_refill(clock):
+    bucket = TokenBucket(capacity=10, refill_rate=2)
+
+    assert await bucket.acquire(8) == 0
+    assert bucket.level == 2
+    assert await bucket.acquire(6) == pytest.approx(2.0)
+    assert bucket.level == pytest.approx(0)
+
+
+@pytest.mark.asyncio
+async def test_acquire_is_clamped_to_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_rate=1)
+
+    assert await bucket.acquire(50) == 0
+    assert bucket.level == 0
+
+
+@pytest.mark.asyncio
+async def test_level_refills_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_rate=1)
+    await bucket.acquire(10)
+
+    clock.now += 4
+    assert bucket.level == pytest.approx(4)
+    clock.now += 60
+    assert bucket.level == 10
+
+
+@pytest.mark.asyncio
+async def test_refund_is_capped_at_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_rate=1)
+    await bucket.acquire(6)
+
+    bucket.refund(4)
+    assert bucket.level == 8
+    bucket.refund(100)
+    assert bucket.level == 10
+
+
+def test_limit_to_only_lowers(clock):
+    bucket = TokenBucket(capacity=10, refill_rate=1)
+
+    bucket.limit_to(3)
+    assert bucket.level == 3
+    bucket.limit_to(7)
+    assert bucket.level == 3
+
+
+@pytest.mark.asyncio
+async def test_penalize_blocks_acquisitions(clock):
+    bucket = TokenBucket(capacity=10, refill_rate=2)
+
+    bucket.penalize(5)
+    assert bucket.level == -10
+    assert await bucket.acquire(1) == pytest.approx(5.5)
+
+
+# LLMRequestScheduler
+
+@pytest.mark.asyncio
+async def test_scheduler_reserves_tokens_and_requests(clock):
+    scheduler = LLMRequestScheduler(default_tpm=6000, default_rpm=60,
+                                    deployment_limits={"large": {"tpm": 60000, "rpm": 600}})
+
+    reservation = await scheduler.acquire("gpt", 1000)
+    await scheduler.acquire("large", 1000)
+
+    stats = scheduler.get_stats()
+    assert (stats["gpt"]["available_tokens"], stats["gpt"]["available_requests"]) == (5000, 59)
+    assert stats["large"]["tokens_per_minute"] == 60000
+    assert reservation.wait_seconds == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_queues_when_over_budget(clock):
+    scheduler = LLMRequestScheduler(default_tpm=6000, default_rpm=60)
+    await scheduler.acquire("gpt", 6000)
+
+    reservation = await scheduler.acquire("gpt", 3000)
+
+    assert reservation.wait_seconds == pytest.approx(30.0)
+    assert scheduler.get_stats()["gpt"]["queued"] == 1
+
+
+@pytest.mark.asyncio
+async def test_response_refunds_unused_estimate(clock):
+    scheduler = LLMRequestScheduler(default_tpm=6000, default_rpm=60)
+    reservation = await scheduler.acquire("gpt", 4000)
+
+    scheduler.record_response(reservation, actual_tokens=1500)
+
+    assert scheduler.get_stats()["gpt"]["available_tokens"] == 4500
+
+
+@pytest.mark.asyncio
+async def test_response_headers_lower_the_local_view(clock):
+    scheduler = LLMRequestScheduler(default_tpm=6000, default_rpm=60)
+    reservation = await scheduler.acquire("gpt", 1000)
+
+    # Other workers share the deployment: Azure reports less than the local view
+    scheduler.record_response(reservation, 1000, httpx.Headers({
+        "x-ratelimit-remaining-tokens": "1200", "x-ratelimit-remaining-requests": "10"
+    }))
+    stats = scheduler.get_stats()["gpt"]
+    assert (stats["available_tokens"], stats["available_requests"], stats["header_corrections"]) == (1200, 10, 2)
+
+    # Higher or malformed values never raise it
+    scheduler.record_response(reservation, 1000, httpx.Headers({
+        "x-ratelimit-remaining-tokens": "5000", "x-ratelimit-remaining-requests": "many"
+    }))
+    stats = scheduler.get_stats()["gpt"]
+    assert (stats["available_tokens"], stats["available_requests"], stats["header_corrections"]) == (1200, 10, 2)
+
+
+@pytest.mark.asyncio
+async def test_throttle_pauses_admissions(clock):
+    scheduler = LLMRequestScheduler(default_tpm=6000, default_rpm=60)
+    reservation = await scheduler.acquire("gpt", 1000)
+
+    scheduler.record_throttle(reservation, retry_after=10.0)
+    next_reservation = await scheduler.acquire("gpt", 100)
+
+    assert next_reservation.wait_seconds >= 10.0
+    assert scheduler.get_stats()["gpt"]["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_throttle_without_retry_after_pauses_for_the_request_share(clock):
+    scheduler = LLMRequestScheduler(default_tpm=6000, default_rpm=60)
+    reservation = await scheduler.acquire("gpt", 3000)
+
+    scheduler.record_throttle(reservation)
+
+    # 3000 of 6000 tokens per minute: half a minute
+    assert await scheduler._get_budget("gpt").requests.acquire(0) == pytest.approx(30.0)
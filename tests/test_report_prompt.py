@@ -0,0 +1,89 @@
+"""Tests for packing ranked patents into the report prompt's token budget."""
+
+import re
+
+from app.services.report_prompt import TABLE_HEADER, pack_patents, patent_detail, patent_row
+from app.utils.tokens import count_tokens
+
+QUERY = "battery coolant loop"
+
+
+def _patent(rank):
+    return {
+        "patent_id": f"1100{rank:04d}",
+        "patent_title": f"Battery coolant loop variant {rank}",
+        "patent_abstract": " ".join(["A battery thermal management system circulates coolant through a loop."] * 6),
+        "patent_date": "2023-05-02",
+        "claims": [
+            {"number": "1", "type": "independent", "dependent": None,
+             "text": "A battery pack comprising: " + " ".join(["a coolant loop bonded to the cells;"] * 12)},
+            {"number": "2", "type": "dependent", "dependent": "1",
+             "text": "The battery pack of claim 1, wherein the coolant loop includes a plate heat exchanger."},
+        ]
+    }
+
+
+PATENTS = [_patent(rank) for rank in range(1, 9)]
+
+
+def _cost(parts, separator):
+    return sum(count_tokens(part) + separator for part in parts)
+
+
+def _stats_add_up(stats):
+    return (stats["patents_detailed"] + stats["patents_without_claims"] + stats["patents_listed_only"]
+            + stats["patents_omitted"]) == len(PATENTS)
+
+
+def test_everything_fits_a_large_budget():
+    text, stats = pack_patents(QUERY, PATENTS, 100_000)
+
+    assert stats["patents_listed"] == stats["patents_detailed"] == len(PATENTS)
+    assert stats["patents_listed_only"] == stats["patents_omitted"] == 0
+    assert count_tokens(text) <= 100_000
+
+
+def test_small_budget_is_respected_in_rank_order():
+    rows = [patent_row(rank, patent) for rank, patent in enumerate(PATENTS, 1)]
+    # Every row, the first detail block with claims and a little to spare
+    budget = count_tokens(TABLE_HEADER) + 1 + _cost(rows, 1) + _cost([patent_detail(1, PATENTS[0], QUERY)], 2) + 5
+
+    text, stats = pack_patents(QUERY, PATENTS, budget)
+
+    assert count_tokens(text) <= budget
+    assert stats["patents_listed"] == len(PATENTS)
+    assert stats["patents_detailed"] == 1
+    assert _stats_add_up(stats)
+    ranks = [int(rank) for rank in re.findall(r"^\| (\d+) \|", text, re.M)]
+    assert ranks == sorted(ranks) == list(range(1, len(PATENTS) + 1))
+    details = [int(rank) for rank in re.findall(r"^#(\d+) ", text, re.M)]
+    assert details == list(range(1, len(details) + 1))
+
+
+def test_detail_falls_back_to_no_claims():
+    rows = [patent_row(rank, patent) for rank, patent in enumerate(PATENTS, 1)]
+    first = patent_detail(1, PATENTS[0], QUERY)
+    second = patent_detail(2, PATENTS[1], QUERY, with_claims=False)
+    assert count_tokens(patent_detail(2, PATENTS[1], QUERY)) > count_tokens(second) + 5
+    budget = count_tokens(TABLE_HEADER) + 1 + _cost(rows, 1) + _cost([first, second], 2) + 5
+
+    text, stats = pack_patents(QUERY, PATENTS, budget)
+
+    assert count_tokens(text) <= budget
+    assert (stats["patents_detailed"], stats["patents_without_claims"]) == (1, 1)
+    assert stats["patents_listed_only"] == len(PATENTS) - 2
+    assert _stats_add_up(stats)
+    assert first in text and second in text
+
+
+def test_rows_that_do_not_fit_are_omitted_lowest_rank_first():
+    rows = [patent_row(rank, patent) for rank, patent in enumerate(PATENTS, 1)]
+    budget = count_tokens(TABLE_HEADER) + 1 + _cost(rows[:3], 1)
+
+    text, stats = pack_patents(QUERY, PATENTS, budget)
+
+    assert count_tokens(text) <= budget
+    assert stats["patents_listed"] == 3
+    assert stats["patents_omitted"] == len(PATENTS) - 3
+    assert _stats_add_up(stats)
+    assert PATENTS[2]["patent_id"] in text and PATENTS[3]["patent_id"] not in text
@@ -0,0 +1,181 @@
+"""Tests for the shared retry policy, retry budget and Retry-After parsing."""
+
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core.exceptions import DeadlineExceededError
+from app.utils import retry as retry_module
+from app.utils.deadline import deadline_scope
+from app.utils.retry import RetryableStatusError, RetryBudget, RetryPolicy, parse_retry_after
+
+
+def _classify(error):
+    if isinstance(error, RetryableStatusError):
+        return True, error.retry_after
+    return False, None
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry waits instead of sleeping."""
+    waits = []
+
+    async def sleep(delay):
+        waits.append(delay)
+
+    monkeypatch.setattr(retry_module, "asyncio", SimpleNamespace(sleep=sleep))
+    return waits
+
+
+def _policy(budget=None, **kwargs):
+    return RetryPolicy("test", _classify, budget=budget or RetryBudget(min_retries_per_second=100), **kwargs)
+
+
+def _failing(*errors, result="ok"):
+    """Coroutine factory raising ``errors`` in turn, then returning ``result``."""
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return attempt, calls
+
+
+# RetryPolicy
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(sleeps):
+    policy = _policy(base_delay=0.5, max_delay=1.0)
+    attempt, calls = _failing(RetryableStatusError(503), RetryableStatusError(502))
+
+    assert await policy.call(attempt) == "ok"
+    assert len(calls) == 3
+    assert policy.retries == 2
+    assert all(0 <= wait <= 1.0 for wait in sleeps)
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_error_is_raised_at_once(sleeps):
+    policy = _policy()
+    attempt, calls = _failing(ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        await policy.call(attempt)
+    assert len(calls) == 1
+    assert policy.not_retryable == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_attempts_are_bounded(sleeps):
+    policy = _policy(max_attempts=2)
+    attempt, calls = _failing(*[RetryableStatusError(500)] * 3)
+
+    with pytest.raises(RetryableStatusError):
+        await policy.call(attempt)
+    assert len(calls) == 2
+    assert policy.exhausted_attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_a_lower_bound(sleeps):
+    policy = _policy(base_delay=0.1, max_delay=0.1)
+    attempt, _ = _failing(RetryableStatusError(429, retry_after=5.0))
+
+    assert await policy.call(attempt) == "ok"
+    assert sleeps == [5.0]
+
+
+@pytest.mark.asyncio
+async def test_retry_after_above_limit_is_not_waited_for(sleeps):
+    policy = _policy(max_retry_after=30.0)
+    attempt, calls = _failing(RetryableStatusError(429, retry_after=120.0))
+
+    with pytest.raises(RetryableStatusError):
+        await policy.call(attempt)
+    assert len(calls) == 1
+    assert policy.not_retryable == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_drained_budget_stops_retries(sleeps):
+    policy = _policy(budget=RetryBudget(ratio=0.0, min_retries_per_second=0.0))
+    attempt, calls = _failing(RetryableStatusError(503))
+
+    with pytest.raises(RetryableStatusError):
+        await policy.call(attempt)
+    assert len(calls) == 1
+    assert policy.budget_denied == 1
+    assert policy.budget.exhausted == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_that_would_outlast_the_deadline_is_not_attempted(sleeps):
+    policy = _policy()
+    attempt, calls = _failing(RetryableStatusError(503, retry_after=2.0))
+
+    with deadline_scope(0.5):
+        with pytest.raises(DeadlineExceededError):
+            await policy.call(attempt)
+    assert len(calls) == 1
+    assert sleeps == []
+    assert policy.budget.retries == 0
+
+
+# RetryBudget
+
+def test_budget_allows_a_ratio_of_recent_requests(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(retry_module, "time", SimpleNamespace(monotonic=lambda: clock.now, time=time.time))
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0.0, window_seconds=10.0)
+    for _ in range(4):
+        budget.record_request()
+
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+    clock.now += 11  # Requests and retries have left the window
+    assert not budget.try_spend()
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_spend()
+    assert budget.get_stats()["window_retries"] == 1
+
+
+def test_budget_floor_allows_retries_at_low_traffic():
+    budget = RetryBudget(ratio=0.1, min_retries_per_second=0.2, window_seconds=10.0)
+
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+# parse_retry_after
+
+def test_parse_retry_after_seconds_and_milliseconds():
+    assert parse_retry_after(httpx.Headers({"Retry-After": "3"})) == 3.0
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "1500", "Retry-After": "3"})) == 1.5
+    assert parse_retry_after(httpx.Headers({"Retry-After": "-4"})) == 0.0
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    delay = parse_retry_after(httpx.Headers({"Retry-After": format_datetime(when, usegmt=True)}))
+
+    assert 28 <= delay <= 30
+    past = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert parse_retry_after(httpx.Headers({"Retry-After": format_datetime(past, usegmt=True)})) == 0.0
+
+
+def test_parse_retry_after_missing_or_invalid():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(httpx.Headers({})) is None
+    assert parse_retry_after(httpx.Headers({"Retry-After": "soon"})) is None
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "soon", "Retry-After": "2"})) == 2.0
@@ -0,0 +1,372 @@
+"""
+Search pipeline tests against a mocked PatentsView transport.
+
+The fake API answers /patent/ by evaluating the query locally (matches_query)
+over a small fixture set, with PatentsView's sort order and ``after`` cursor,
+and /g_claim/ from fixture claims.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import DeadlineExceededError, LLMError
+from app.services import patent_search_service as search_module
+from app.services.patent_search_service import PatentSearchService
+from app.services.patentsview_query import matches_query
+from app.utils.rate_limit import TokenBucket
+
+PATENTS = [
+    {"patent_id": "11000001", "patent_title": "Battery pack coolant loop with plate heat exchanger",
+     "patent_abstract": "A battery thermal management system circulates coolant through a loop and a "
+                        "plate heat exchanger bonded to the battery cells.",
+     "patent_date": "2023-05-02"},
+    {"patent_id": "11000002", "patent_title": "Immersion cooling of battery cells",
+     "patent_abstract": "Battery cells are immersed in a dielectric coolant that is pumped through a "
+                        "radiator to remove heat.",
+     "patent_date": "2022-11-15"},
+    {"patent_id": "11000003", "patent_title": "Cabin air conditioning for an electric vehicle",
+     "patent_abstract": "An air conditioning unit cools the passenger cabin of an electric vehicle "
+                        "using a heat pump.",
+     "patent_date": "2021-03-09"},
+    {"patent_id": "11000004", "patent_title": "Coolant pump control",
+     "patent_abstract": "A controller adjusts the speed of a coolant pump in response to the battery "
+                        "temperature.",
+     "patent_date": "2020-07-21"},
+    {"patent_id": "11000005", "patent_title": "Seat upholstery fastener",
+     "patent_abstract": "A fastener attaches upholstery fabric to a vehicle seat frame.",
+     "patent_date": "2019-01-08"},
+]
+
+CLAIMS = {
+    patent["patent_id"]: [
+        {"patent_id": patent["patent_id"], "claim_sequence": 0, "claim_number": "1", "claim_dependent": None,
+         "claim_text": f"An apparatus comprising: {patent['patent_abstract'].lower()}"},
+        {"patent_id": patent["patent_id"], "claim_sequence": 1, "claim_number": "2", "claim_dependent": "1",
+         "claim_text": "The apparatus of claim 1, further comprising a temperature sensor."},
+    ]
+    for patent in PATENTS
+}
+
+SEARCH_QUERIES = [
+    {"search_query": {"_text_all": {"patent_abstract": "battery coolant"}}, "reasoning": "Battery coolant"},
+    {"search_query": {"_text_any": {"patent_title": "coolant loop"}}, "reasoning": "Coolant loop in title"},
+]
+
+
+def _claim_ids(query):
+    """Get the patent IDs requested by a g_claim query."""
+    if "_or" in query:
+        return [operand["patent_id"] for operand in query["_or"]]
+    return [query["patent_id"]]
+
+
+def _handler(requests, hold=None, patents=PATENTS):
+    """
+    Build a MockTransport handler serving the fixtures and recording request payloads.
+
+    ``hold`` is an optional (query, event) pair: searches for that query are
+    answered only once the event is set. ``patents`` replaces the searched fixtures.
+    """
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        requests.append((request.url.path, payload))
+        if hold is not None and payload["q"] == hold[0]:
+            await hold[1].wait()
+        options = payload.get("o", {})
+        if request.url.path.endswith("/g_claim/"):
+            claims = [claim for patent_id in _claim_ids(payload["q"]) for claim in CLAIMS.get(patent_id, [])]
+            return httpx.Response(200, json={"g_claims": claims, "count": len(claims)})
+
+        hits = sorted((patent for patent in patents if matches_query(payload["q"], patent)),
+                      key=lambda patent: (patent["patent_date"], patent["patent_id"]), reverse=True)
+        if options.get("after"):
+            after = tuple(options["after"])
+            hits = [patent for patent in hits if (patent["patent_date"], patent["patent_id"]) < after]
+        page = hits[:options.get("size", 25)]
+        return httpx.Response(200, json={"patents": page, "count": len(page), "total_hits": len(hits)})
+
+    return handle
+
+
+@pytest.fixture
+def requests():
+    return []
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def service(requests, monkeypatch):
+    search_module._search_cache.clear()
+    # The fake API has no rate limit; the shared pacer would throttle a growing suite
+    monkeypatch.setattr(search_module, "_patentsview_pacer", TokenBucket(capacity=1000, refill_rate=1000))
+    service = PatentSearchService()
+    service.claims_store = None
+    service._http_client = _mock_client(_handler(requests))
+    return service
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ranks_matches_and_attaches_claims(service):
+    patents, query_results, summary, metadata = await service._run_search_pipeline(
+        "battery coolant loop", SEARCH_QUERIES, max_results=10, summarize=False
+    )
+
+    ids = [patent["patent_id"] for patent in patents]
+    assert ids[0] == "11000001"
+    assert "11000005" not in ids
+    assert all(len(patent["claims"]) == 2 for patent in patents)
+    assert patents[0]["claims"][1]["type"] == "dependent"
+    assert summary == ""
+
+    assert [result["query_text"] for result in query_results] == ["Battery coolant", "Coolant loop in title"]
+    assert [result["result_count"] for result in query_results] == [3, 2]
+    assert metadata["search_mode"] == "fused"
+    assert metadata["fused"]["unattributed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pipeline_separate_queries(service, requests, monkeypatch):
+    monkeypatch.setattr(settings, "patentsview_fused_queries", False)
+
+    patents, query_results, _, metadata = await service._run_search_pipeline(
+        "battery coolant loop", SEARCH_QUERIES, max_results=10, summarize=False
+    )
+
+    assert metadata["search_mode"] == "separate"
+    assert [result["result_count"] for result in query_results] == [3, 2]
+    assert sum(1 for path, _ in requests if path.endswith("/patent/")) == 2
+    assert {patent["patent_id"] for patent in patents} == {"11000001", "11000002", "11000004"}
+
+
+@pytest.mark.asyncio
+async def test_pipeline_fused_failure_is_not_counted_twice(service, requests, monkeypatch):
+    # Two patents per fused page; the fused search fails on its second page
+    monkeypatch.setattr(settings, "patentsview_page_size", 1)
+    serve = _handler(requests)
+
+    async def fail_fused_page_two(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        if "_or" in payload["q"] and payload.get("o", {}).get("after"):
+            requests.append((request.url.path, payload))
+            return httpx.Response(400, text="bad cursor")
+        return await serve(request)
+
+    service._http_client = _mock_client(fail_fused_page_two)
+    patents, query_results, _, metadata = await service._run_search_pipeline(
+        "battery coolant loop", SEARCH_QUERIES, max_results=10, summarize=False
+    )
+
+    assert metadata["search_mode"] == "separate"
+    assert metadata["fused_fallback"]["pages"] == 1
+    assert metadata["fused_fallback"]["patents"] == 2
+    assert [result["result_count"] for result in query_results] == [3, 2]
+    assert metadata["total_patents_found"] == 5
+    assert {patent["patent_id"] for patent in patents} == {"11000001", "11000002", "11000004"}
+
+
+@pytest.mark.asyncio
+async def test_pipeline_truncates_to_max_results(service):
+    patents, _, _, _ = await service._run_search_pipeline(
+        "battery coolant loop", SEARCH_QUERIES, max_results=1, summarize=False
+    )
+
+    assert [patent["patent_id"] for patent in patents] == ["11000001"]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_streams_clear_high_scorers(service, requests, monkeypatch):
+    # The second query is only answered once a claim summary has started, which
+    # deadlocks (and times out) unless claims and summaries overlap the search
+    monkeypatch.setattr(settings, "patentsview_fused_queries", False)
+    summary_started = asyncio.Event()
+    summarized = []
+
+    async def summarize(patent, query=None):
+        summarized.append(patent["patent_id"])
+        summary_started.set()
+        return f"**Patent {patent['patent_id']}**\n"
+
+    monkeypatch.setattr(service, "_summarize_patent_claims", summarize)
+    service._http_client = _mock_client(_handler(requests, hold=(SEARCH_QUERIES[1]["search_query"], summary_started)))
+
+    patents, _, summary, metadata = await asyncio.wait_for(
+        service._run_search_pipeline("battery coolant loop", SEARCH_QUERIES, max_results=10), timeout=5
+    )
+
+    assert metadata["early_admitted"] >= 1
+    assert patents[0]["patent_id"] == "11000001"
+    assert "**Patent 11000001**" in summary
+    assert sorted(summarized) == sorted(set(summarized))  # Early summaries are reused, not repeated
+    assert metadata["stages"][1]["items"] == len(patents)
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_of_early_admission_is_folded_into_it(service, requests, monkeypatch):
+    # One patent per page: the continuation (older, so on a later page) must not
+    # take a second claim fetch once its family has been sent on early
+    monkeypatch.setattr(settings, "patentsview_fused_queries", False)
+    monkeypatch.setattr(settings, "patentsview_page_size", 1)
+    continuation = {**PATENTS[0], "patent_id": "11000006", "patent_title": "Battery coolant loop",
+                    "patent_date": "2018-04-10"}
+    service._http_client = _mock_client(_handler(requests, patents=PATENTS + [continuation]))
+
+    patents, _, _, metadata = await service._run_search_pipeline(
+        "battery coolant loop", SEARCH_QUERIES, max_results=10, summarize=False
+    )
+
+    claim_requests = [patent_id for path, payload in requests if path.endswith("/g_claim/")
+                      for patent_id in _claim_ids(payload["q"])]
+    assert metadata["early_admitted"] >= 1
+    assert "11000006" not in claim_requests
+    assert "11000006" not in [patent["patent_id"] for patent in patents]
+    assert next(patent for patent in patents if patent["patent_id"] == "11000001")["sibling_ids"] == ["11000006"]
+    assert metadata["families_collapsed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refinement_skips_queries_that_match_nothing(service):
+    queries = service._compile_queries([
+        *SEARCH_QUERIES, {"search_query": {"_text_phrase": {"patent_title": "rotor blade"}}, "reasoning": "Rotor"}
+    ])[0]
+
+    refined, empty_results, summary = await service._refine_queries("battery coolant loop", queries)
+
+    assert len(refined) == 2
+    assert empty_results == [{"query_text": "Rotor", "result_count": 0}]
+    assert (summary["skipped_empty"], summary["unrefined_fallback"]) == (1, False)
+
+
+@pytest.mark.asyncio
+async def test_refinement_falls_back_when_no_query_matches(service, requests):
+    service._http_client = _mock_client(_handler(requests, patents=[]))
+    queries = service._compile_queries(SEARCH_QUERIES)[0]
+
+    refined, empty_results, summary = await service._refine_queries("battery coolant loop", queries)
+
+    assert refined == queries
+    assert empty_results == []
+    assert summary["unrefined_fallback"]
+
+
+@pytest.mark.asyncio
+async def test_search_without_matches_returns_empty_result(service, requests, monkeypatch):
+    service._http_client = _mock_client(_handler(requests, patents=[]))
+
+    async def query_plan(query, refresh=False):
+        return (*service._compile_queries(SEARCH_QUERIES), False)
+
+    async def generate_report(query, query_results, patents, claims_summary, on_token=None):
+        return "# Prior Art Search Report\n\nNo relevant patents found.", None
+
+    monkeypatch.setattr(service, "_get_query_plan", query_plan)
+    monkeypatch.setattr(service, "_generate_report", generate_report)
+
+    result, _ = await service.search_patents("battery coolant loop")
+
+    assert result["results_found"] == 0
+    assert result["search_metadata"]["query_refinement"]["unrefined_fallback"]
+    assert result["report"].startswith("# Prior Art Search Report")
+
+
+@pytest.mark.asyncio
+async def test_fast_search_renders_template_report(service, requests, monkeypatch):
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("fast mode must not call the LLM")
+
+    monkeypatch.setattr(service.llm_client, "generate_text", no_llm)
+
+    result, search_queries = await service.search_patents("battery coolant loop", mode="fast")
+
+    assert search_queries
+    assert result["results_found"] == len(result["patents"]) > 0
+    assert result["report"].startswith("# Prior Art Search Report")
+    assert result["search_metadata"]["report_prompt"] is None
+    assert result["search_metadata"]["degraded"] == []
+    # Only the searches themselves go to PatentsView: no count probes, no claims fetch
+    assert {path for path, _ in requests} == {"/api/v1/patent/"}
+    assert all(payload["o"]["size"] > 1 for _, payload in requests)
+
+
+def _failing_report(service, monkeypatch, error):
+    """Run deep searches with the given queries and summaries, and a report that raises ``error``."""
+    monkeypatch.setattr(settings, "patentsview_refine_queries", False)
+
+    async def query_plan(query, refresh=False):
+        return (*service._compile_queries(SEARCH_QUERIES), False)
+
+    async def summarize(patent, query=None):
+        return f"**Patent {patent['patent_id']}**\n"
+
+    async def generate_report(*args, **kwargs):
+        raise ValueError(f"Failed to generate report: {error}") from error
+
+    monkeypatch.setattr(service, "_get_query_plan", query_plan)
+    monkeypatch.setattr(service, "_summarize_patent_claims", summarize)
+    monkeypatch.setattr(service, "_generate_report", generate_report)
+
+
+@pytest.mark.asyncio
+async def test_report_failure_within_budget_is_not_blamed_on_time(service, monkeypatch):
+    _failing_report(service, monkeypatch, LLMError("Azure OpenAI circuit is open"))
+
+    result, _ = await service.search_patents("battery coolant loop", budget_seconds=60)
+
+    assert "AI analysis was unavailable" in result["report"]
+    assert "latency budget" not in result["report"]
+    assert "llm_report" in result["search_metadata"]["degraded"]
+    assert "templated_report" not in result["search_metadata"]["degraded"]
+
+
+@pytest.mark.asyncio
+async def test_report_deadline_is_reported_as_budget(service, monkeypatch):
+    _failing_report(service, monkeypatch, DeadlineExceededError("Request deadline exceeded"))
+
+    result, _ = await service.search_patents("battery coolant loop", budget_seconds=60)
+
+    assert "The latency budget ran out" in result["report"]
+    assert "templated_report" in result["search_metadata"]["degraded"]
+
+
+@pytest.mark.asyncio
+async def test_claims_cursor_that_does_not_advance_stops(service, monkeypatch):
+    monkeypatch.setattr(settings, "patentsview_claims_page_size", 2)
+    requests = []
+
+    def stuck(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"g_claims": CLAIMS["11000001"]})
+
+    service._http_client = _mock_client(stuck)
+    claims = await service._request_claims_batch(("11000001",))
+
+    assert len(requests) == 2
+    assert [claim["number"] for claim in claims["11000001"]] == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_claims_pages_are_bounded(service, monkeypatch):
+    monkeypatch.setattr(settings, "patentsview_claims_page_size", 1)
+    requests = []
+
+    def endless(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        requests.append(payload)
+        sequence = payload["o"].get("after", ["11000001", -1])[1] + 1
+        return httpx.Response(200, json={"g_claims": [
+            {"patent_id": "11000001", "claim_sequence": sequence, "claim_number": str(sequence + 1),
+             "claim_dependent": None, "claim_text": f"An apparatus according to embodiment {sequence}."}
+        ]})
+
+    service._http_client = _mock_client(endless)
+    claims = await service._request_claims_batch(("11000001",))
+
+    assert len(requests) == search_module.MAX_CLAIMS_PAGES_PER_BATCH
+    assert len(claims["11000001"]) == search_module.MAX_CLAIMS_PAGES_PER_BATCH
@@ -0,0 +1,160 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import DeadlineExceededError
+from app.utils.deadline import deadline_scope, remaining_time
+from app.utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_shared_call_does_not_inherit_leader_deadline():
+    flights = SingleFlight("test")
+    seen = []
+
+    async def work():
+        seen.append(remaining_time())
+        return "done"
+
+    with deadline_scope(10.0):
+        assert await flights.do("key", work) == "done"
+    assert seen == [None]
+
+
+@pytest.mark.asyncio
+async def test_follower_outlives_leader_deadline():
+    flights = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    async def leader():
+        with deadline_scope(0.05):
+            return await flights.do("key", work)
+
+    leader_task = asyncio.ensure_future(leader())
+    await asyncio.sleep(0)
+    follower_task = asyncio.ensure_future(flights.do("key", work))
+    await asyncio.sleep(0.1)
+    release.set()
+
+    with pytest.raises(DeadlineExceededError):
+        await leader_task
+    assert await follower_task == "done"
+    assert flights.executions == 1
+    assert flights.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_call_cancelled_once_every_caller_deadline_passed():
+    flights = SingleFlight("test")
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with deadline_scope(0.05):
+        with pytest.raises(DeadlineExceededError):
+            await flights.do("key", work)
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert flights.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight("test")
+    release = asyncio.Event()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await release.wait()
+        return "done"
+
+    tasks = [asyncio.ensure_future(flights.do("key", work)) for _ in range(3)]
+    other = asyncio.ensure_future(flights.do("other", work))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks, other) == ["done"] * 4
+    assert len(calls) == 2
+    assert (flights.executions, flights.coalesced, flights.in_flight()) == (2, 2, 0)
+
+
+@pytest.mark.asyncio
+async def test_error_propagates_to_every_waiter_and_is_not_remembered():
+    flights = SingleFlight("test")
+    release = asyncio.Event()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    tasks = [asyncio.ensure_future(flights.do("key", failing)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(calls) == 1
+
+    async def succeeding():
+        return "done"
+
+    assert await flights.do("key", succeeding) == "done"
+    assert flights.executions == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelling_leader_does_not_cancel_shared_call():
+    flights = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    leader_task = asyncio.ensure_future(flights.do("key", work))
+    await asyncio.sleep(0)
+    follower_task = asyncio.ensure_future(flights.do("key", work))
+    await asyncio.sleep(0)
+    leader_task.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await leader_task
+    assert await follower_task == "done"
+    assert flights.executions == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_call_cancelled_once_every_caller_leaves():
+    flights = SingleFlight("test")
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    tasks = [asyncio.ensure_future(flights.do("key", work)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert flights.in_flight() == 0
@@ -0,0 +1,38 @@
+"""Tests for local token counting."""
+
+import logging
+
+from app.utils import tokens
+
+
+class _BrokenTiktoken:
+    """Stands in for tiktoken when its encoding file cannot be downloaded."""
+
+    def __init__(self):
+        self.loads = 0
+
+    def get_encoding(self, name):
+        self.loads += 1
+        raise OSError("network unreachable")
+
+
+def test_failed_encoding_load_is_cached(monkeypatch, caplog):
+    broken = _BrokenTiktoken()
+    monkeypatch.setattr(tokens, "tiktoken", broken)
+    monkeypatch.setattr(tokens, "_encoding", None)
+
+    with caplog.at_level(logging.WARNING, logger=tokens.__name__):
+        counts = [tokens.count_tokens("a prior art search prompt") for _ in range(100)]
+
+    assert broken.loads == 1
+    assert len(caplog.records) == 1
+    assert counts[0] == (len("a prior art search prompt") + tokens.CHARS_PER_TOKEN - 1) // tokens.CHARS_PER_TOKEN
+
+
+def test_truncate_to_tokens_fits_limit():
+    text = "word " * 500
+    shortened = tokens.truncate_to_tokens(text, 50)
+
+    assert shortened.endswith("...")
+    assert tokens.count_tokens(shortened) <= 50
+    assert tokens.truncate_to_tokens("short", 50) == "short"